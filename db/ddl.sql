@@ -146,4 +146,512 @@ DROP TRIGGER IF EXISTS trg_refresh_product_metrics ON price_history;
 CREATE TRIGGER trg_refresh_product_metrics
 AFTER INSERT ON price_history
 FOR EACH ROW
-EXECUTE FUNCTION update_product_price_metrics();
\ No newline at end of file
+EXECUTE FUNCTION update_product_price_metrics();
+
+
+ALTER TABLE products
+ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+
+
+CREATE TABLE IF NOT EXISTS domain_extraction_stats (
+    domain TEXT PRIMARY KEY,
+    preferred_strategy TEXT,
+    consecutive_failures INT NOT NULL DEFAULT 0,
+    demoted_until TIMESTAMPTZ,
+    strategy_stats JSONB NOT NULL DEFAULT '{}'::jsonb,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+
+
+CREATE TABLE IF NOT EXISTS product_watch (
+    product_id UUID PRIMARY KEY REFERENCES products(product_id) ON DELETE CASCADE,
+    next_check_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_checked_at TIMESTAMPTZ,
+    check_interval INTERVAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_product_watch_next_check ON product_watch (next_check_at);
+
+CREATE INDEX IF NOT EXISTS idx_alerts_active_product ON price_alerts (product_id) WHERE is_active = TRUE;
+
+INSERT INTO product_watch (product_id)
+SELECT DISTINCT product_id FROM price_alerts WHERE is_active = TRUE
+ON CONFLICT (product_id) DO NOTHING;
+
+
+ALTER TABLE product_watch
+ADD COLUMN IF NOT EXISTS lease_owner TEXT,
+ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ;
+
+
+
+ALTER TABLE products
+ADD COLUMN IF NOT EXISTS lowest_price_30d_at TIMESTAMPTZ;
+
+UPDATE products p
+SET lowest_price_30d_at = h.scraped_at
+FROM (
+    SELECT DISTINCT ON (product_id) product_id, scraped_at
+    FROM price_history
+    WHERE scraped_at >= NOW() - INTERVAL '30 days'
+    ORDER BY product_id, price_amount, scraped_at DESC
+) h
+WHERE p.product_id = h.product_id
+  AND p.lowest_price_30d_at IS NULL;
+
+CREATE OR REPLACE FUNCTION refresh_product_price_metrics()
+RETURNS TRIGGER AS $$
+BEGIN
+    WITH latest AS (
+        SELECT DISTINCT ON (product_id) product_id, price_amount
+        FROM new_prices
+        ORDER BY product_id, scraped_at DESC, history_id DESC
+    ),
+    batch_min AS (
+        SELECT DISTINCT ON (product_id) product_id, price_amount AS min_price, scraped_at AS min_at
+        FROM new_prices
+        ORDER BY product_id, price_amount, scraped_at DESC
+    ),
+    stale AS (
+        SELECT p.product_id
+        FROM products p
+        JOIN batch_min b ON b.product_id = p.product_id
+        WHERE p.lowest_price_30d IS NULL
+           OR p.lowest_price_30d_at IS NULL
+           OR p.lowest_price_30d_at < NOW() - INTERVAL '30 days'
+    ),
+    recomputed AS (
+        SELECT DISTINCT ON (h.product_id) h.product_id, h.price_amount AS min_price, h.scraped_at AS min_at
+        FROM price_history h
+        JOIN stale s ON s.product_id = h.product_id
+        WHERE h.scraped_at >= NOW() - INTERVAL '30 days'
+        ORDER BY h.product_id, h.price_amount, h.scraped_at DESC
+    )
+    UPDATE products p
+    SET
+        previous_price = COALESCE(p.current_price, l.price_amount),
+        current_price = l.price_amount,
+        price_change_percent = CASE
+            WHEN p.current_price > 0 THEN ROUND(((l.price_amount - p.current_price) / p.current_price) * 100.0, 2)
+            ELSE 0
+        END,
+        lowest_price_30d = CASE
+            WHEN r.product_id IS NOT NULL THEN r.min_price
+            WHEN b.min_price <= p.lowest_price_30d THEN b.min_price
+            ELSE p.lowest_price_30d
+        END,
+        lowest_price_30d_at = CASE
+            WHEN r.product_id IS NOT NULL THEN r.min_at
+            WHEN b.min_price <= p.lowest_price_30d THEN b.min_at
+            ELSE p.lowest_price_30d_at
+        END,
+        last_price_change_at = NOW(),
+        last_updated_at = NOW()
+    FROM latest l
+    JOIN batch_min b ON b.product_id = l.product_id
+    LEFT JOIN recomputed r ON r.product_id = l.product_id
+    WHERE p.product_id = l.product_id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_refresh_product_metrics ON price_history;
+
+CREATE TRIGGER trg_refresh_product_metrics
+AFTER INSERT ON price_history
+REFERENCING NEW TABLE AS new_prices
+FOR EACH STATEMENT
+EXECUTE FUNCTION refresh_product_price_metrics();
+
+DROP FUNCTION IF EXISTS update_product_price_metrics();
+
+
+
+CREATE TABLE IF NOT EXISTS price_history_daily (
+    product_id UUID NOT NULL REFERENCES products(product_id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    min_price NUMERIC(14, 2) NOT NULL,
+    avg_price NUMERIC(14, 2) NOT NULL,
+    max_price NUMERIC(14, 2) NOT NULL,
+    observation_count INT NOT NULL,
+    PRIMARY KEY (product_id, day)
+);
+
+CREATE OR REPLACE FUNCTION create_price_history_partitions(p_from DATE, p_months INT)
+RETURNS INT AS $$
+DECLARE
+    v_month DATE := date_trunc('month', p_from)::date;
+    v_name TEXT;
+    v_lower TIMESTAMPTZ;
+    v_upper TIMESTAMPTZ;
+    v_created INT := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('price_history_partitions'));
+
+    FOR i IN 1..p_months LOOP
+        v_name := 'price_history_' || to_char(v_month, '"y"YYYY"m"MM');
+        v_lower := v_month::timestamp AT TIME ZONE 'UTC';
+        v_upper := (v_month + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC';
+        IF to_regclass(v_name) IS NULL THEN
+            IF to_regclass('price_history_default') IS NOT NULL
+               AND EXISTS (SELECT 1 FROM price_history_default WHERE scraped_at >= v_lower AND scraped_at < v_upper) THEN
+                -- Rows of this month that landed in the default partition would make CREATE ... PARTITION OF
+                -- fail; build the partition standalone, move them in, then attach it.
+                EXECUTE format('CREATE TABLE %I (LIKE price_history INCLUDING DEFAULTS)', v_name);
+                EXECUTE format($sql$
+                    WITH moved AS (
+                        DELETE FROM price_history_default
+                        WHERE scraped_at >= %L AND scraped_at < %L
+                        RETURNING *
+                    )
+                    INSERT INTO %I SELECT * FROM moved
+                $sql$, v_lower, v_upper, v_name);
+                EXECUTE format(
+                    'ALTER TABLE price_history ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    v_name, v_lower, v_upper
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF price_history FOR VALUES FROM (%L) TO (%L)',
+                    v_name, v_lower, v_upper
+                );
+            END IF;
+            v_created := v_created + 1;
+        END IF;
+        v_month := (v_month + INTERVAL '1 month')::date;
+    END LOOP;
+
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_price_history_retention(p_keep_raw INTERVAL)
+RETURNS INT AS $$
+DECLARE
+    v_cutoff TIMESTAMP := date_trunc('month', (NOW() - GREATEST(p_keep_raw, INTERVAL '31 days')) AT TIME ZONE 'UTC');
+    v_partition TEXT;
+    v_dropped INT := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('price_history_partitions'));
+
+    FOR v_partition IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'price_history'::regclass
+          AND c.relname ~ '^price_history_y[0-9]{4}m[0-9]{2}$'
+          AND to_date(right(c.relname, 7), 'YYYY"m"MM') + INTERVAL '1 month' <= v_cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format($sql$
+            INSERT INTO price_history_daily (product_id, day, min_price, avg_price, max_price, observation_count)
+            SELECT product_id, (scraped_at AT TIME ZONE 'UTC')::date, MIN(price_amount), ROUND(AVG(price_amount), 2), MAX(price_amount), COUNT(*)
+            FROM %I
+            GROUP BY 1, 2
+            ON CONFLICT (product_id, day) DO UPDATE
+            SET min_price = EXCLUDED.min_price,
+                avg_price = EXCLUDED.avg_price,
+                max_price = EXCLUDED.max_price,
+                observation_count = EXCLUDED.observation_count
+        $sql$, v_partition);
+
+        EXECUTE format('ALTER TABLE price_history DETACH PARTITION %I', v_partition);
+        EXECUTE format('DROP TABLE %I', v_partition);
+        v_dropped := v_dropped + 1;
+    END LOOP;
+
+    RETURN v_dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    v_first DATE;
+    v_months INT;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'price_history'::regclass) THEN
+        RETURN;
+    END IF;
+
+    DROP TRIGGER IF EXISTS trg_refresh_product_metrics ON price_history;
+    DROP INDEX IF EXISTS idx_price_history_product_date;
+    ALTER TABLE price_history RENAME TO price_history_legacy;
+    ALTER TABLE price_history_legacy RENAME CONSTRAINT price_history_pkey TO price_history_legacy_pkey;
+    ALTER TABLE price_history_legacy RENAME CONSTRAINT price_history_product_id_fkey TO price_history_legacy_product_id_fkey;
+
+    CREATE SEQUENCE IF NOT EXISTS price_history_id_seq;
+
+    CREATE TABLE price_history (
+        history_id BIGINT NOT NULL DEFAULT nextval('price_history_id_seq'),
+        product_id UUID NOT NULL REFERENCES products(product_id) ON DELETE CASCADE,
+
+        price_amount NUMERIC(14, 2) NOT NULL,
+        currency CHAR(3) DEFAULT 'BRL',
+
+        scraped_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (history_id, scraped_at)
+    ) PARTITION BY RANGE (scraped_at);
+
+    ALTER SEQUENCE price_history_id_seq OWNED BY price_history.history_id;
+
+    SELECT (COALESCE(MIN(scraped_at), NOW()) AT TIME ZONE 'UTC')::date INTO v_first FROM price_history_legacy;
+    v_months := (EXTRACT(YEAR FROM AGE(date_trunc('month', NOW() AT TIME ZONE 'UTC'), date_trunc('month', v_first))) * 12
+               + EXTRACT(MONTH FROM AGE(date_trunc('month', NOW() AT TIME ZONE 'UTC'), date_trunc('month', v_first))))::int + 3;
+    PERFORM create_price_history_partitions(v_first, v_months);
+
+    CREATE TABLE price_history_default PARTITION OF price_history DEFAULT;
+
+    INSERT INTO price_history (history_id, product_id, price_amount, currency, scraped_at)
+    SELECT history_id, product_id, price_amount, currency, COALESCE(scraped_at, NOW())
+    FROM price_history_legacy;
+
+    PERFORM setval('price_history_id_seq', COALESCE((SELECT MAX(history_id) FROM price_history_legacy), 0) + 1, false);
+
+    DROP TABLE price_history_legacy;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_price_history_product_date ON price_history (product_id, scraped_at DESC);
+
+SELECT create_price_history_partitions((NOW() AT TIME ZONE 'UTC')::date, 3);
+
+DROP TRIGGER IF EXISTS trg_refresh_product_metrics ON price_history;
+
+CREATE TRIGGER trg_refresh_product_metrics
+AFTER INSERT ON price_history
+REFERENCING NEW TABLE AS new_prices
+FOR EACH STATEMENT
+EXECUTE FUNCTION refresh_product_price_metrics();
+
+
+
+ALTER TABLE price_history
+ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMPTZ,
+ADD COLUMN IF NOT EXISTS observation_count INT NOT NULL DEFAULT 1;
+
+UPDATE price_history SET last_seen_at = scraped_at WHERE last_seen_at IS NULL;
+
+ALTER TABLE price_history
+ALTER COLUMN last_seen_at SET DEFAULT NOW(),
+ALTER COLUMN last_seen_at SET NOT NULL;
+
+WITH ordered AS (
+    SELECT history_id, scraped_at, product_id, price_amount, last_seen_at, observation_count,
+           date_trunc('month', scraped_at AT TIME ZONE 'UTC') AS month,
+           LAG(price_amount) OVER (
+               PARTITION BY product_id, date_trunc('month', scraped_at AT TIME ZONE 'UTC')
+               ORDER BY scraped_at, history_id
+           ) AS prev_amount
+    FROM price_history
+),
+numbered AS (
+    SELECT *,
+           COUNT(*) FILTER (WHERE prev_amount IS DISTINCT FROM price_amount) OVER (
+               PARTITION BY product_id, month
+               ORDER BY scraped_at, history_id
+           ) AS run_no
+    FROM ordered
+),
+runs AS (
+    SELECT product_id, month, run_no,
+           (ARRAY_AGG(history_id ORDER BY scraped_at, history_id))[1] AS head_id,
+           MIN(scraped_at) AS head_at,
+           MAX(last_seen_at) AS last_seen_at,
+           SUM(observation_count) AS observation_count
+    FROM numbered
+    GROUP BY product_id, month, run_no
+    HAVING COUNT(*) > 1
+),
+merged AS (
+    UPDATE price_history h
+    SET last_seen_at = r.last_seen_at,
+        observation_count = r.observation_count
+    FROM runs r
+    WHERE h.history_id = r.head_id AND h.scraped_at = r.head_at
+)
+DELETE FROM price_history h
+USING numbered n
+JOIN runs r ON r.product_id = n.product_id AND r.month = n.month AND r.run_no = n.run_no
+WHERE h.history_id = n.history_id
+  AND h.scraped_at = n.scraped_at
+  AND n.history_id <> r.head_id;
+
+CREATE OR REPLACE FUNCTION refresh_product_price_metrics()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- new_prices is folded into one row per product and the recompute is materialized once, so the
+    -- plan cached for a one-row insert stays linear in the batch size for later bulk inserts.
+    WITH batch AS (
+        SELECT product_id,
+               (ARRAY_AGG(price_amount ORDER BY scraped_at DESC, history_id DESC))[1] AS price_amount,
+               MIN(price_amount) AS min_price,
+               (ARRAY_AGG(last_seen_at ORDER BY price_amount, last_seen_at DESC))[1] AS min_at
+        FROM new_prices
+        GROUP BY product_id
+    ),
+    stale AS MATERIALIZED (
+        SELECT p.product_id
+        FROM products p
+        JOIN batch b ON b.product_id = p.product_id
+        WHERE p.lowest_price_30d IS NULL
+           OR p.lowest_price_30d_at IS NULL
+           OR p.lowest_price_30d_at < NOW() - INTERVAL '30 days'
+    ),
+    recomputed AS MATERIALIZED (
+        SELECT DISTINCT ON (h.product_id) h.product_id, h.price_amount AS min_price, h.last_seen_at AS min_at
+        FROM price_history h
+        JOIN stale s ON s.product_id = h.product_id
+        WHERE h.scraped_at >= date_trunc('month', (NOW() - INTERVAL '30 days') AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+          AND h.last_seen_at >= NOW() - INTERVAL '30 days'
+        ORDER BY h.product_id, h.price_amount, h.last_seen_at DESC
+    )
+    UPDATE products p
+    SET
+        previous_price = CASE
+            WHEN p.current_price IS DISTINCT FROM b.price_amount THEN COALESCE(p.current_price, b.price_amount)
+            ELSE p.previous_price
+        END,
+        current_price = b.price_amount,
+        price_change_percent = CASE
+            WHEN p.current_price = b.price_amount THEN p.price_change_percent
+            WHEN p.current_price > 0 THEN ROUND(((b.price_amount - p.current_price) / p.current_price) * 100.0, 2)
+            ELSE 0
+        END,
+        lowest_price_30d = CASE
+            WHEN r.product_id IS NOT NULL THEN r.min_price
+            WHEN b.min_price <= p.lowest_price_30d THEN b.min_price
+            ELSE p.lowest_price_30d
+        END,
+        lowest_price_30d_at = CASE
+            WHEN r.product_id IS NOT NULL THEN r.min_at
+            WHEN b.min_price <= p.lowest_price_30d THEN b.min_at
+            ELSE p.lowest_price_30d_at
+        END,
+        last_price_change_at = CASE
+            WHEN p.current_price IS DISTINCT FROM b.price_amount THEN NOW()
+            ELSE p.last_price_change_at
+        END,
+        last_updated_at = NOW()
+    FROM batch b
+    LEFT JOIN recomputed r ON r.product_id = b.product_id
+    WHERE p.product_id = b.product_id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION refresh_stale_lowest_prices()
+RETURNS INT AS $$
+DECLARE
+    v_updated INT;
+BEGIN
+    WITH recomputed AS (
+        SELECT DISTINCT ON (h.product_id) h.product_id, h.price_amount AS min_price, h.last_seen_at AS min_at
+        FROM price_history h
+        JOIN products p ON p.product_id = h.product_id
+        WHERE p.lowest_price_30d_at < NOW() - INTERVAL '30 days'
+          AND h.scraped_at >= date_trunc('month', (NOW() - INTERVAL '30 days') AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+          AND h.last_seen_at >= NOW() - INTERVAL '30 days'
+        ORDER BY h.product_id, h.price_amount, h.last_seen_at DESC
+    )
+    UPDATE products p
+    SET lowest_price_30d = r.min_price,
+        lowest_price_30d_at = r.min_at
+    FROM recomputed r
+    WHERE p.product_id = r.product_id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_price_history_retention(p_keep_raw INTERVAL)
+RETURNS INT AS $$
+DECLARE
+    v_cutoff TIMESTAMP := date_trunc('month', (NOW() - GREATEST(p_keep_raw, INTERVAL '31 days')) AT TIME ZONE 'UTC');
+    v_partition TEXT;
+    v_dropped INT := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('price_history_partitions'));
+
+    FOR v_partition IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'price_history'::regclass
+          AND c.relname ~ '^price_history_y[0-9]{4}m[0-9]{2}$'
+          AND to_date(right(c.relname, 7), 'YYYY"m"MM') + INTERVAL '1 month' <= v_cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format($sql$
+            INSERT INTO price_history_daily (product_id, day, min_price, avg_price, max_price, observation_count)
+            SELECT product_id, day, MIN(price_amount), ROUND(AVG(price_amount), 2), MAX(price_amount),
+                   COALESCE(SUM(observation_count) FILTER (WHERE day = (scraped_at AT TIME ZONE 'UTC')::date), 0)
+            FROM (
+                SELECT product_id, price_amount, observation_count, scraped_at,
+                       generate_series(
+                           (scraped_at AT TIME ZONE 'UTC')::date,
+                           (last_seen_at AT TIME ZONE 'UTC')::date,
+                           INTERVAL '1 day'
+                       )::date AS day
+                FROM %I
+            ) run_days
+            GROUP BY 1, 2
+            ON CONFLICT (product_id, day) DO UPDATE
+            SET min_price = EXCLUDED.min_price,
+                avg_price = EXCLUDED.avg_price,
+                max_price = EXCLUDED.max_price,
+                observation_count = EXCLUDED.observation_count
+        $sql$, v_partition);
+
+        EXECUTE format('ALTER TABLE price_history DETACH PARTITION %I', v_partition);
+        EXECUTE format('DROP TABLE %I', v_partition);
+        v_dropped := v_dropped + 1;
+    END LOOP;
+
+    RETURN v_dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+
+
+CREATE INDEX IF NOT EXISTS idx_products_embedding_active
+ON products USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64)
+WHERE is_active = TRUE;
+
+DROP INDEX IF EXISTS idx_products_embedding;
+
+CREATE INDEX IF NOT EXISTS idx_products_domain_active ON products (domain) WHERE is_active = TRUE;
+
+
+
+CREATE OR REPLACE FUNCTION notify_product_embedding()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('product_embeddings', OLD.product_id::text);
+        RETURN OLD;
+    END IF;
+
+    PERFORM pg_notify('product_embeddings', NEW.product_id::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notify_product_embedding ON products;
+
+CREATE TRIGGER trg_notify_product_embedding
+AFTER INSERT OR DELETE ON products
+FOR EACH ROW
+EXECUTE FUNCTION notify_product_embedding();
+
+DROP TRIGGER IF EXISTS trg_notify_product_embedding_update ON products;
+
+CREATE TRIGGER trg_notify_product_embedding_update
+AFTER UPDATE OF embedding, is_active ON products
+FOR EACH ROW
+WHEN (OLD.embedding IS DISTINCT FROM NEW.embedding OR OLD.is_active IS DISTINCT FROM NEW.is_active)
+EXECUTE FUNCTION notify_product_embedding();
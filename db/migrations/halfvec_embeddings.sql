@@ -0,0 +1,92 @@
+-- Optional: store products.embedding as halfvec(384) (pgvector >= 0.7).
+-- Half-precision storage halves the HNSW index and heap size of the embeddings.
+-- Run the three steps in order, and only run step 3 when step 2 reports acceptable recall.
+-- Afterwards set EMBEDDING_STORAGE=halfvec.
+
+
+-- Step 1: shadow column and its index, built while the current column keeps serving queries.
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS embedding_half halfvec(384);
+
+UPDATE products
+SET embedding_half = embedding::halfvec(384)
+WHERE embedding IS NOT NULL
+  AND embedding_half IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_products_embedding_half_active
+ON products USING hnsw (embedding_half halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64)
+WHERE is_active = TRUE;
+
+
+-- Step 2: recall parity. For 200 sampled products used as queries, compares the exact
+-- float32 top 10 against the halfvec HNSW top 10 at the ef_search the application uses.
+-- recall_at_10 close to 1.0 (for example >= 0.98) means the switch is safe.
+
+BEGIN;
+SET LOCAL hnsw.ef_search = 100;
+
+WITH queries AS (
+    SELECT product_id AS query_id, embedding AS query
+    FROM products
+    WHERE is_active = TRUE AND embedding IS NOT NULL
+    ORDER BY random()
+    LIMIT 200
+),
+exact AS (
+    SELECT q.query_id, e.product_id
+    FROM queries q
+    CROSS JOIN LATERAL (
+        SELECT product_id
+        FROM products
+        WHERE is_active = TRUE AND embedding IS NOT NULL
+        ORDER BY (embedding <=> q.query) + 0
+        LIMIT 10
+    ) e
+),
+approximate AS (
+    SELECT q.query_id, a.product_id
+    FROM queries q
+    CROSS JOIN LATERAL (
+        SELECT product_id
+        FROM products
+        WHERE is_active = TRUE
+        ORDER BY embedding_half <=> q.query::halfvec(384)
+        LIMIT 10
+    ) a
+)
+SELECT
+    ROUND(COUNT(a.product_id)::numeric / NULLIF(COUNT(*), 0), 4) AS recall_at_10,
+    COUNT(DISTINCT e.query_id) AS queries
+FROM exact e
+LEFT JOIN approximate a ON a.query_id = e.query_id AND a.product_id = e.product_id;
+
+COMMIT;
+
+
+-- Step 3: swap the columns. Rows written between step 1 and now are converted here; the
+-- table lock keeps writers out until the swap commits. The update trigger of the vector
+-- mirror depends on the embedding column, so it is dropped and recreated around the swap.
+
+BEGIN;
+
+LOCK TABLE products IN SHARE ROW EXCLUSIVE MODE;
+
+UPDATE products
+SET embedding_half = embedding::halfvec(384)
+WHERE embedding IS NOT NULL
+  AND embedding_half IS DISTINCT FROM embedding::halfvec(384);
+
+DROP TRIGGER IF EXISTS trg_notify_product_embedding_update ON products;
+DROP INDEX IF EXISTS idx_products_embedding_active;
+ALTER TABLE products DROP COLUMN embedding;
+ALTER TABLE products RENAME COLUMN embedding_half TO embedding;
+ALTER INDEX idx_products_embedding_half_active RENAME TO idx_products_embedding_active;
+
+CREATE TRIGGER trg_notify_product_embedding_update
+AFTER UPDATE OF embedding, is_active ON products
+FOR EACH ROW
+WHEN (OLD.embedding IS DISTINCT FROM NEW.embedding OR OLD.is_active IS DISTINCT FROM NEW.is_active)
+EXECUTE FUNCTION notify_product_embedding();
+
+COMMIT;
@@ -1,11 +1,22 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
 import logging
 
 
 from src.telegram.start_up import lifespan
 from src.telegram.webhook import router as telegram_router
+from src.services.embedding_service import embedding_service
+from src.services.parse_pool import parse_pool
+from src.services.scrapper_service import strategy_registry
+from src.services.fetch_service import fetch_service
+from src.services.price_fetcher import price_fetcher
+from src.services.domain_guard import domain_guard
+from src.services.alert_notifier import alert_notifier
+from src.services.history_maintenance_service import history_maintenance
+from src.services.search_cache import search_cache
+from src.services.vector_mirror import vector_mirror
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,6 +38,31 @@ app.include_router(telegram_router, tags=["Telegram"])
 async def health_check():
     return {"status": "healthy", "service": "ThanatosAgent"}
 
+@app.get("/ready")
+async def readiness_check(request: Request):
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is None or not warmup.ready:
+        status = warmup.status() if warmup else {}
+        return JSONResponse(status_code=503, content={"status": "warming_up", **status})
+    return {"status": "ready", **warmup.status()}
+
+@app.get("/metrics")
+async def metrics(request: Request):
+    watchdog = getattr(request.app.state, "watchdog", None)
+    return {
+        "embedding": embedding_service.stats(),
+        "parse_pool": parse_pool.stats(),
+        "extraction": strategy_registry.stats(),
+        "http": fetch_service.stats(),
+        "price_fetcher": price_fetcher.stats(),
+        "domains": domain_guard.stats(),
+        "watchdog": watchdog.stats() if watchdog else None,
+        "alerts": alert_notifier.stats(),
+        "price_history": history_maintenance.stats(),
+        "search_cache": search_cache.stats(),
+        "vector_mirror": vector_mirror.stats()
+    }
+
 if __name__ == "__main__":
     logger.info("Starting Server...")
     uvicorn.run(
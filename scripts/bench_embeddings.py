@@ -0,0 +1,129 @@
+"""
+Encode throughput and memory of the embedding backends.
+
+Each backend runs in its own subprocess, so its load time and resident memory are measured in
+isolation. The texts are the parity fixture corpus (tests/fixtures/embedding_corpus.txt),
+repeated up to --texts, encoded at several batch sizes after a warmup batch:
+
+    python -m scripts.bench_embeddings --backends torch,onnx --batch-sizes 1,8,32,64
+
+The cosine similarity of each backend to torch is printed as well; tests/test_embedding_parity.py
+is the check that gates EMBEDDING_BACKEND=onnx.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+
+CORPUS = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "embedding_corpus.txt"
+
+
+def load_corpus(size: int) -> List[str]:
+    lines = [line.strip() for line in CORPUS.read_text(encoding="utf-8").splitlines()]
+    lines = [line for line in lines if line and not line.startswith("#")]
+    return [f"{lines[i % len(lines)]} #{i // len(lines)}" if i >= len(lines) else lines[i] for i in range(size)]
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def run_backend(backend: str, model: str, texts: int, batch_sizes: List[int], vectors_path: str):
+    from src.services.embedding_backends import TorchEmbeddingBackend, OnnxEmbeddingBackend
+
+    corpus = load_corpus(texts)
+    baseline = rss_mb()
+    started = time.perf_counter()
+    if backend == "torch":
+        encoder = TorchEmbeddingBackend(model)
+    else:
+        encoder = OnnxEmbeddingBackend(model, os.environ.get("EMBEDDING_ONNX_DIR", ".cache/onnx"))
+    load_seconds = time.perf_counter() - started
+    loaded = rss_mb()
+
+    encoder.encode(corpus[:8])
+    report = {"backend": backend, "load_s": round(load_seconds, 2), "rss_loaded_mb": round(loaded - baseline, 1), "batches": []}
+
+    for batch_size in batch_sizes:
+        latencies = []
+        started = time.perf_counter()
+        for offset in range(0, len(corpus), batch_size):
+            batch_started = time.perf_counter()
+            encoder.encode(corpus[offset:offset + batch_size])
+            latencies.append((time.perf_counter() - batch_started) * 1000.0)
+        elapsed = time.perf_counter() - started
+        report["batches"].append({
+            "batch_size": batch_size,
+            "texts_per_s": round(len(corpus) / elapsed, 1),
+            "p50_batch_ms": round(statistics.median(latencies), 2),
+        })
+
+    report["peak_rss_mb"] = round(peak_rss_mb() - baseline, 1)
+    np.save(vectors_path, np.asarray(encoder.encode(load_corpus(64)), dtype=np.float32))
+    print(json.dumps(report))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="torch,onnx")
+    parser.add_argument("--model", default=os.environ.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2"))
+    parser.add_argument("--texts", type=int, default=2048)
+    parser.add_argument("--batch-sizes", default="1,8,32,64")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--vectors", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    batch_sizes = [int(value) for value in args.batch_sizes.split(",")]
+
+    if args.child:
+        run_backend(args.child, args.model, args.texts, batch_sizes, args.vectors)
+        return
+
+    vectors = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends.split(","):
+            vectors_path = os.path.join(tmp, f"{backend}.npy")
+            result = subprocess.run(
+                [sys.executable, "-m", "scripts.bench_embeddings", "--child", backend, "--vectors", vectors_path,
+                 "--model", args.model, "--texts", str(args.texts), "--batch-sizes", args.batch_sizes],
+                capture_output=True, text=True
+            )
+            if result.returncode != 0:
+                print(f"{backend}: failed\n{result.stderr.strip().splitlines()[-1] if result.stderr.strip() else ''}")
+                continue
+
+            report = json.loads(result.stdout.strip().splitlines()[-1])
+            vectors[backend] = np.load(vectors_path)
+            print(f"\n{backend}: load {report['load_s']}s, +{report['rss_loaded_mb']} MB after load, "
+                  f"+{report['peak_rss_mb']} MB peak")
+            for batch in report["batches"]:
+                print(f"  batch {batch['batch_size']:>4}: {batch['texts_per_s']:>8} texts/s, p50 {batch['p50_batch_ms']} ms/batch")
+
+    if "torch" in vectors:
+        reference = vectors["torch"] / np.linalg.norm(vectors["torch"], axis=1, keepdims=True)
+        for backend, values in vectors.items():
+            if backend == "torch":
+                continue
+            cosine = np.sum(reference * values / np.linalg.norm(values, axis=1, keepdims=True), axis=1)
+            print(f"\n{backend} vs torch: mean cosine {cosine.mean():.4f}, min {cosine.min():.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Insert throughput of price_history under the per-row and the statement-level price metrics trigger.
+
+Seeds synthetic products and a price history of --history rows spread over the last 60 days,
+then times price_history inserts with each trigger installed in turn:
+
+    row        the old FOR EACH ROW update_product_price_metrics (a products SELECT, a 30-day
+               MIN() over history and an UPDATE per inserted row)
+    statement  the current FOR EACH STATEMENT refresh_product_price_metrics
+
+Each is measured with one row per INSERT (the per-item write path) and with --batch rows per
+INSERT (the bulk observe path):
+
+    python -m scripts.bench_price_history --history 1000000
+
+Run it against a scratch database with the schema from db/ddl.sql (the usual POSTGRES_*
+variables select it). Seeded products use `https://bench-history.example` URLs and are deleted,
+with their history, at the end unless --keep; the statement trigger is always reinstalled.
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import List
+
+from sqlalchemy import text
+
+from src.core.database import db_manager
+
+
+URL_PREFIX = "https://bench-history.example/p/"
+
+ROW_TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION bench_update_product_price_metrics()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        v_old_price NUMERIC(14,2);
+        v_lowest_30d NUMERIC(14,2);
+        v_percent_change NUMERIC(10,2);
+    BEGIN
+        SELECT current_price INTO v_old_price
+        FROM products
+        WHERE product_id = NEW.product_id;
+
+        IF v_old_price IS NULL THEN
+            v_old_price := NEW.price_amount;
+            v_percent_change := 0;
+        ELSE
+            IF v_old_price > 0 THEN
+                v_percent_change := ((NEW.price_amount - v_old_price) / v_old_price) * 100.0;
+            ELSE
+                v_percent_change := 0;
+            END IF;
+        END IF;
+
+        SELECT MIN(price_amount) INTO v_lowest_30d
+        FROM price_history
+        WHERE product_id = NEW.product_id
+          AND scraped_at >= NOW() - INTERVAL '30 days';
+
+        IF NEW.price_amount < COALESCE(v_lowest_30d, NEW.price_amount) THEN
+            v_lowest_30d := NEW.price_amount;
+        END IF;
+
+        UPDATE products
+        SET
+            previous_price = v_old_price,
+            current_price = NEW.price_amount,
+            price_change_percent = ROUND(v_percent_change, 2),
+            lowest_price_30d = COALESCE(v_lowest_30d, NEW.price_amount),
+            last_price_change_at = NOW(),
+            last_updated_at = NOW()
+        WHERE product_id = NEW.product_id;
+
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+TRIGGERS = {
+    "row": """
+        CREATE TRIGGER trg_refresh_product_metrics
+        AFTER INSERT ON price_history
+        FOR EACH ROW
+        EXECUTE FUNCTION bench_update_product_price_metrics()
+    """,
+    "statement": """
+        CREATE TRIGGER trg_refresh_product_metrics
+        AFTER INSERT ON price_history
+        REFERENCING NEW TABLE AS new_prices
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION refresh_product_price_metrics()
+    """,
+}
+
+
+async def execute(*statements: str):
+    async with db_manager.engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in statements:
+            await conn.execute(text(statement))
+
+
+async def install(mode: str):
+    await execute("DROP TRIGGER IF EXISTS trg_refresh_product_metrics ON price_history", TRIGGERS[mode])
+
+
+async def seed(products: int, history: int) -> List[str]:
+    """
+    Seeds products and history server-side with no trigger installed, then sets the product
+    metrics from the seeded history once.
+    """
+    started = time.perf_counter()
+    await execute(
+        "DROP TRIGGER IF EXISTS trg_refresh_product_metrics ON price_history",
+        "SELECT create_price_history_partitions(((NOW() - INTERVAL '60 days') AT TIME ZONE 'UTC')::date, 5)",
+        f"""
+        INSERT INTO products (url, domain, title, description, content_hash, is_active)
+        SELECT '{URL_PREFIX}' || i, 'bench-history.example', 'bench product ' || i, '', 'bench', TRUE
+        FROM generate_series(1, {products}) AS i
+        ON CONFLICT (url) DO NOTHING
+        """,
+        f"""
+        INSERT INTO price_history (product_id, price_amount, scraped_at, last_seen_at)
+        SELECT p.product_id, round((100 + random() * 900)::numeric, 2), t.at, t.at
+        FROM (
+            SELECT product_id, row_number() OVER (ORDER BY product_id) - 1 AS n
+            FROM products WHERE url LIKE '{URL_PREFIX}%'
+        ) p
+        JOIN (
+            SELECT i % {products} AS n, NOW() - random() * INTERVAL '60 days' AS at
+            FROM generate_series(0, {history - 1}) AS i
+        ) t ON t.n = p.n
+        """,
+        "ANALYZE products",
+        "ANALYZE price_history",
+        f"""
+        UPDATE products p
+        SET current_price = h.last_price, previous_price = h.last_price, lowest_price_30d = h.min_price,
+            lowest_price_30d_at = NOW() - INTERVAL '1 day'
+        FROM (
+            SELECT product_id, MIN(price_amount) AS min_price, (ARRAY_AGG(price_amount ORDER BY scraped_at DESC))[1] AS last_price
+            FROM price_history GROUP BY product_id
+        ) h
+        WHERE p.product_id = h.product_id AND p.url LIKE '{URL_PREFIX}%'
+        """,
+    )
+    async with await db_manager.get_session() as session:
+        result = await session.execute(text("SELECT product_id FROM products WHERE url LIKE :prefix"), {"prefix": f"{URL_PREFIX}%"})
+        ids = [str(row[0]) for row in result.all()]
+    print(f"  seeded {len(ids)} products and {history} history rows in {time.perf_counter() - started:.0f}s")
+    return ids
+
+
+async def run_inserts(product_ids: List[str], rows: int, batch: int) -> float:
+    """
+    Inserts `rows` new prices for random products, `batch` rows per statement and one
+    statement per transaction. Returns rows per second.
+    """
+    sql = text("""
+        INSERT INTO price_history (product_id, price_amount)
+        SELECT product_id, price
+        FROM unnest(CAST(:ids AS uuid[]), CAST(:prices AS numeric[])) AS t(product_id, price)
+    """)
+    started = time.perf_counter()
+    async with await db_manager.get_session() as session:
+        for offset in range(0, rows, batch):
+            n = min(batch, rows - offset)
+            params = {
+                "ids": random.sample(product_ids, n),
+                "prices": [round(random.uniform(100, 1000), 2) for _ in range(n)],
+            }
+            async with session.begin():
+                await session.execute(sql, params)
+    return rows / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--history", type=int, default=1000000)
+    parser.add_argument("--single-rows", type=int, default=5000, help="rows inserted one per statement")
+    parser.add_argument("--batch-rows", type=int, default=50000, help="rows inserted --batch per statement")
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--keep", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    try:
+        await execute(ROW_TRIGGER_FUNCTION)
+        print(f"\n== {args.history} history rows, {args.products} products ==")
+        product_ids = await seed(args.products, args.history)
+
+        results = {}
+        for mode in ("row", "statement"):
+            await install(mode)
+            single = await run_inserts(product_ids, args.single_rows, 1)
+            batched = await run_inserts(product_ids, args.batch_rows, args.batch)
+            results[mode] = (single, batched)
+            print(f"  {mode:<10} 1 row/stmt: {single:9.0f} rows/s   {args.batch} rows/stmt: {batched:9.0f} rows/s")
+
+        print(f"  speedup    1 row/stmt: {results['statement'][0] / results['row'][0]:9.2f}x   "
+              f"{args.batch} rows/stmt: {results['statement'][1] / results['row'][1]:9.2f}x")
+    finally:
+        await install("statement")
+        await execute("DROP FUNCTION IF EXISTS bench_update_product_price_metrics()")
+        if not args.keep:
+            await execute(f"DELETE FROM products WHERE url LIKE '{URL_PREFIX}%'")
+        await db_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,236 @@
+"""
+Synthetic hybrid search benchmark at catalog scale.
+
+Seeds N synthetic products and measures CatalogRepository.search_hybrid latency and the
+recall@candidates of its ANN branch against an exact scan, unfiltered and with domain / price
+filters, for several ef_search values. The in-process vector mirror is timed on the same
+queries. Embeddings are drawn from a low-dimensional latent space, like sentence embeddings,
+so nearest neighbours are meaningful; titles come from a small vocabulary, and prices and
+domains are spread uniformly.
+
+Run it against a scratch database with the schema from db/ddl.sql (the usual POSTGRES_*
+variables select it):
+
+    python -m scripts.bench_search --rows 100000,1000000
+
+Seeded rows use the `bench-*.example` domains and are deleted at the end unless --keep.
+With --rebuild-index the HNSW index is dropped while seeding and rebuilt afterwards, which
+is much faster than maintaining it row by row at 1M products.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+from sqlalchemy import text
+
+from src.core.database import db_manager
+from src.core.settings import settings
+from src.domain.search import SearchConfig
+from src.repository.catalog_repository import CatalogRepository
+from src.services.vector_mirror import VectorMirror
+
+
+DIM = 384
+LATENT_DIM = 24
+DOMAINS = 20
+VOCABULARY = (
+    "monitor notebook teclado mouse headset cadeira mesa smartphone tablet impressora "
+    "roteador ssd memoria placa fonte gabinete webcam microfone caixa som tv console "
+    "controle cabo carregador bateria camera lente tripe drone relogio fone"
+).split()
+URL_PREFIX = "https://bench-"
+
+
+def synthetic_vectors(rng: np.random.Generator, n: int, projection: np.ndarray) -> np.ndarray:
+    latent = rng.normal(0.0, 1.0, (n, projection.shape[0])).astype(np.float32)
+    vectors = latent @ projection + rng.normal(0.0, 0.01, (n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def seed(rows: int, rng: np.random.Generator, projection: np.ndarray, batch: int = 5000):
+    sql = text(f"""
+        INSERT INTO products (url, domain, title, description, embedding, content_hash, current_price, is_active)
+        SELECT url, domain, title, '', embedding, 'bench', price, TRUE
+        FROM unnest(
+            CAST(:urls AS text[]),
+            CAST(:domains AS text[]),
+            CAST(:titles AS text[]),
+            {db_manager.vector_array_sql("embeddings")},
+            CAST(:prices AS numeric[])
+        ) AS t(url, domain, title, embedding, price)
+        ON CONFLICT (url) DO NOTHING
+    """)
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        n = min(batch, rows - offset)
+        ids = range(offset, offset + n)
+        params = {
+            "urls": [f"{URL_PREFIX}{i % DOMAINS}.example/p/{i}" for i in ids],
+            "domains": [f"bench-{i % DOMAINS}.example" for i in ids],
+            "titles": [" ".join(random.sample(VOCABULARY, 3)) + f" {i}" for i in ids],
+            "embeddings": db_manager.vector_array_param(list(synthetic_vectors(rng, n, projection))),
+            "prices": [round(random.uniform(10, 5000), 2) for _ in ids],
+        }
+        async with await db_manager.get_session() as session:
+            async with session.begin():
+                await session.execute(sql, params)
+        if (offset // batch) % 20 == 0:
+            print(f"  seeded {offset + n}/{rows} ({time.perf_counter() - started:.0f}s)")
+
+
+async def execute(statement: str):
+    async with db_manager.engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(statement))
+
+
+async def ann_ids(query: np.ndarray, config: SearchConfig, exact: bool) -> List[str]:
+    """
+    The semantic branch of search_hybrid on its own: through the HNSW index, or exact when the
+    `+ 0` keeps the planner off the index.
+    """
+    filters, params = "", {"embedding": db_manager.vector_param(query.tolist()), "candidates": config.candidates}
+    if config.domains:
+        filters += " AND domain = ANY(CAST(:domains AS text[]))"
+        params["domains"] = config.domains
+    if config.min_price is not None:
+        filters += " AND current_price >= :min_price"
+        params["min_price"] = config.min_price
+    if config.max_price is not None:
+        filters += " AND current_price <= :max_price"
+        params["max_price"] = config.max_price
+    order = "(embedding <=> :embedding) + 0" if exact else "embedding <=> :embedding"
+
+    async with await db_manager.get_session() as session:
+        async with session.begin():
+            await session.execute(text("SELECT set_config('hnsw.ef_search', :ef, true)"), {"ef": str(config.effective_ef_search)})
+            if config.iterative_scan:
+                await session.execute(text("SELECT set_config('hnsw.iterative_scan', :mode, true)"), {"mode": config.iterative_scan})
+            result = await session.execute(text(f"""
+                SELECT product_id FROM products
+                WHERE is_active = TRUE{filters}
+                ORDER BY {order}
+                LIMIT :candidates
+            """), params)
+            return [str(row[0]) for row in result.all()]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_case(repository: CatalogRepository, name: str, config: SearchConfig, queries: List[Dict[str, Any]], recall_queries: int):
+    latencies, returned = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results = await repository.search_hybrid(query["text"], query["vector"].tolist(), limit=10, config=config)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        returned.append(len(results))
+
+    hits = total = 0
+    for query in queries[:recall_queries]:
+        exact = await ann_ids(query["vector"], config, exact=True)
+        approximate = set(await ann_ids(query["vector"], config, exact=False))
+        hits += sum(1 for product_id in exact if product_id in approximate)
+        total += len(exact)
+
+    print(f"  {name:<44} ef={config.effective_ef_search:<4} p50={statistics.median(latencies):7.2f}ms "
+          f"p95={percentile(latencies, 0.95):7.2f}ms results={statistics.mean(returned):5.2f} "
+          f"recall@{config.candidates}={hits / total if total else 0.0:.3f}")
+
+
+async def bench_mirror(queries: List[Dict[str, Any]], domains: Optional[List[str]]):
+    mirror = VectorMirror(dim=DIM)
+    after = None
+    started = time.perf_counter()
+    while True:
+        rows = await mirror.repository.get_embeddings_page(after, 5000)
+        if not rows:
+            break
+        mirror.apply(rows)
+        after = str(rows[-1]["product_id"])
+    loaded = time.perf_counter() - started
+
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        mirror._search(query["vector"], settings.search_candidates, domains)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    label = "mirror brute force" + (" (1 domain)" if domains else "")
+    print(f"  {label:<44} load={loaded:6.1f}s p50={statistics.median(latencies):7.2f}ms p95={percentile(latencies, 0.95):7.2f}ms")
+
+
+async def bench(rows: int, args):
+    rng = np.random.default_rng(args.seed)
+    random.seed(args.seed)
+    projection = rng.normal(0.0, 1.0 / np.sqrt(DIM), (LATENT_DIM, DIM)).astype(np.float32)
+
+    print(f"\n== {rows} synthetic products ==")
+    await execute(f"DELETE FROM products WHERE url LIKE '{URL_PREFIX}%'")
+    if args.rebuild_index:
+        await execute("DROP INDEX IF EXISTS idx_products_embedding_active")
+    await seed(rows, rng, projection)
+    if args.rebuild_index:
+        ops = "halfvec_cosine_ops" if settings.embedding_storage == "halfvec" else "vector_cosine_ops"
+        started = time.perf_counter()
+        await execute(f"""
+            CREATE INDEX idx_products_embedding_active ON products
+            USING hnsw (embedding {ops}) WITH (m = 16, ef_construction = 64)
+            WHERE is_active = TRUE
+        """)
+        print(f"  HNSW index built in {time.perf_counter() - started:.0f}s")
+    await execute("ANALYZE products")
+
+    queries = [
+        {"text": " ".join(random.sample(VOCABULARY, 2)), "vector": synthetic_vectors(rng, 1, projection)[0]}
+        for _ in range(args.queries)
+    ]
+    repository = CatalogRepository()
+    one_domain = ["bench-3.example"]
+    cases = [
+        ("unfiltered", {}),
+        ("1 domain (5%)", {"domains": one_domain}),
+        ("price 10..500 (10%)", {"min_price": 10, "max_price": 500}),
+        ("1 domain + price (0.5%)", {"domains": one_domain, "min_price": 10, "max_price": 500}),
+    ]
+    for ef_search in args.ef_search:
+        for name, filters in cases:
+            await run_case(repository, name, SearchConfig.default(ef_search=ef_search, **filters), queries, args.recall_queries)
+    if args.iterative_scan:
+        for name, filters in cases[1:]:
+            config = SearchConfig.default(iterative_scan=args.iterative_scan, **filters)
+            await run_case(repository, f"{name} +{args.iterative_scan}", config, queries, args.recall_queries)
+
+    await bench_mirror(queries, None)
+    await bench_mirror(queries, one_domain)
+
+    if not args.keep:
+        await execute(f"DELETE FROM products WHERE url LIKE '{URL_PREFIX}%'")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="100000,1000000", help="comma-separated catalog sizes")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--recall-queries", type=int, default=50)
+    parser.add_argument("--ef-search", type=lambda v: [int(x) for x in v.split(",")], default=[40, 100, 200])
+    parser.add_argument("--iterative-scan", default="", help="relaxed_order or strict_order (pgvector >= 0.8)")
+    parser.add_argument("--rebuild-index", action="store_true")
+    parser.add_argument("--keep", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    try:
+        for rows in (int(value) for value in args.rows.split(",")):
+            await bench(rows, args)
+    finally:
+        await db_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,6 +2,7 @@ from langchain_core.tools import tool
 
 from src.services.catalog_service import CatalogService
 from src.repository.alert_repository import AlertRepository
+from src.services.alert_notifier import alert_notifier
 from src.core.logger import logger
 
 
@@ -30,6 +31,7 @@ async def create_price_alert(url: str, target_price: float, chat_id: int) -> str
         )
         
         alert_id = await alert_repo.create_alert(product_id, chat_id, target_price)
+        alert_notifier.watch(alert_id, product_id, chat_id, target_price)
         
         return f"Vigilance started. Alert ID {alert_id} set for $ {target_price:.2f}."
     except Exception as e:
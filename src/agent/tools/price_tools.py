@@ -1,12 +1,14 @@
-import httpx
-
 from langchain_core.tools import tool
 
 
-from src.services.scrapper_service import ScraperEngine
+from src.services.price_fetcher import price_fetcher
+from src.services.catalog_service import CatalogService
+from src.services.domain_guard import CircuitOpenError
 from src.core.logger import logger
 
 
+catalog_service = CatalogService()
+
 
 @tool
 async def check_price_from_url(url: str) -> str:
@@ -22,35 +24,37 @@ async def check_price_from_url(url: str) -> str:
         str: A formatted string with current price, original price, and source.
     """
     logger.info(f"Sniper check on: {url}")
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml"
-    }
-
-    engine = ScraperEngine()
-    
+
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=headers, follow_redirects=True, timeout=12.0)
-            
-            if resp.status_code != 200:
-                logger.warning(f"Failed to access URL: {resp.status_code}")
-                return f"Error: HTTP {resp.status_code}"
-            
-            result = engine.extract_price(resp.text, url)
-            
-            if not result.is_available:
-                return "Status: Out of Stock/Unavailable"
-            
-            if result.has_price:
-                return (
-                    f"Price: $ {result.current_price:.2f} | "
-                    f"Original: {result.original_price or 'N/A'} | "
-                    f"Source: {result.source}"
-                )
-            
-            return "Could not extract price. Structure might have changed or site is not supported."
+        observation = await price_fetcher.fetch(url, timeout=12.0)
+        
+        if not observation.ok:
+            logger.warning(f"Failed to access URL: {observation.status_code}")
+            return f"Error: HTTP {observation.status_code}"
+        
+        result = observation.result
+        
+        if not result.is_available:
+            return "Status: Out of Stock/Unavailable"
+        
+        if result.has_price:
+            if not observation.from_cache:
+                try:
+                    await catalog_service.record_price_observation(url, result.current_price)
+                except Exception as e:
+                    logger.warning(f"Could not record price observation for {url}: {e}")
+
+            return (
+                f"Price: $ {result.current_price:.2f} | "
+                f"Original: {result.original_price or 'N/A'} | "
+                f"Source: {result.source}"
+            )
+        
+        return "Could not extract price. Structure might have changed or site is not supported."
+
+    except CircuitOpenError as e:
+        logger.info(f"Sniper skipped {url}: {e}")
+        return f"Access Error: {str(e)}"
 
     except Exception as e:
         logger.error(f"Sniper error processing {url}: {e}")
@@ -1,17 +1,17 @@
 import json
-import httpx
 import asyncio
 
 from typing import Optional
 
-from bs4 import BeautifulSoup
 import re
 
 from langchain_core.tools import tool
 
 from src.core.settings import settings
 from src.core.logger import logger
-from src.services.scrapper_service import ScraperEngine
+from src.services.fetch_service import fetch_service
+from src.services.price_fetcher import price_fetcher, PriceFetcher
+from src.services.domain_guard import CircuitOpenError
 from src.services.catalog_service import CatalogService 
 
 
@@ -56,24 +56,24 @@ def classify_url_pattern(url: str) -> Optional[str]:
     return "SINGLE_PRODUCT"
 
 
-async def smart_scrape(client: httpx.AsyncClient, item: dict, engine: ScraperEngine) -> dict:
+async def smart_scrape(item: dict, fetcher: PriceFetcher) -> dict:
     """
-    Attempts to extract structural data from a product page using the scraping engine.
+    Attempts to extract structural data from a product page through the shared price fetcher.
     """
     if item["type"] == "OPTION_LIST":
         item['final_price'] = "See Options"
         item['is_available'] = True
         return item
 
+    if fetcher.is_demoted(item['link']):
+        item['final_price'] = "View on Site"
+        return item
+
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml"
-        }
-        resp = await client.get(item['link'], headers=headers, follow_redirects=True, timeout=10.0)
+        observation = await fetcher.fetch(item['link'], timeout=10.0)
         
-        if resp.status_code == 200:
-            price_result = engine.extract_price(resp.text, item['link'])
+        if observation.ok:
+            price_result = observation.result
             
             item['is_available'] = price_result.is_available
             
@@ -90,8 +90,7 @@ async def smart_scrape(client: httpx.AsyncClient, item: dict, engine: ScraperEng
                     item['original_price'] = old
                 item['extraction_method'] = price_result.source 
             else:
-                soup = BeautifulSoup(resp.text, 'html.parser')
-                page_title = soup.title.get_text().lower() if soup.title else ""
+                page_title = observation.title.lower()
                 
                 list_indicators = ["department", "category", "products", "selection", "best", "store"]
                 
@@ -103,6 +102,11 @@ async def smart_scrape(client: httpx.AsyncClient, item: dict, engine: ScraperEng
             item['final_price'] = "Connection Error"
             item['is_available'] = False
             
+    except CircuitOpenError as e:
+        logger.info(f"Skipping {item['link']}: {e}")
+        item['final_price'] = "Access Error"
+        item['is_available'] = False
+
     except Exception as e:
         logger.warning(f"Failed to access {item['link']}: {e}")
         item['final_price'] = "Access Error"
@@ -124,59 +128,56 @@ async def search_web_products(query: str, gl: str = "us", hl: str = "en") -> str
     """
     logger.info(f"Smart search for: {query} | Market: {gl} | Language: {hl}")
 
-    local_engine = ScraperEngine()
     catalog_service = CatalogService() 
     
     candidates = []
-    async with httpx.AsyncClient() as client:
-        headers = {'X-API-KEY': settings.serper_api_key, 'Content-Type': 'application/json'}
-        payload = json.dumps({'q': query, 'gl': gl, 'hl': hl, 'num': 8}) 
-        
-        try:
-            res = await client.post('https://google.serper.dev/search', headers=headers, data=payload)
-            data = res.json()
-        except:
-            return "Critical error in Search API."
-
-        for item in data.get("shopping", []):
-            candidates.append({
-                "title": item.get("title"),
-                "link": item.get("link"),
-                "source": item.get("source", "Shopping"),
-                "final_price": item.get("price"), 
-                "price_detected": True,
-                "type": "SINGLE_PRODUCT",
-                "is_available": True 
-            })
+    headers = {'X-API-KEY': settings.serper_api_key, 'Content-Type': 'application/json'}
+    payload = json.dumps({'q': query, 'gl': gl, 'hl': hl, 'num': 8}) 
+    
+    try:
+        res = await fetch_service.post('https://google.serper.dev/search', headers=headers, content=payload)
+        data = res.json()
+    except:
+        return "Critical error in Search API."
+
+    for item in data.get("shopping", []):
+        candidates.append({
+            "title": item.get("title"),
+            "link": item.get("link"),
+            "source": item.get("source", "Shopping"),
+            "final_price": item.get("price"), 
+            "price_detected": True,
+            "type": "SINGLE_PRODUCT",
+            "is_available": True 
+        })
+
+    for item in data.get("organic", []):
+        url_type = classify_url_pattern(item.get("link", ""))
+        if url_type is None:
+            continue
 
-        for item in data.get("organic", []):
-            url_type = classify_url_pattern(item.get("link", ""))
-            if url_type is None:
-                continue
-
-            final_price = "See Options" if url_type == "OPTION_LIST" else None
-            price_detected = True if url_type == "OPTION_LIST" else False
-
-            candidates.append({
-                "title": item.get("title"),
-                "link": item.get("link"),
-                "source": item.get("source", "Web"),
-                "final_price": final_price, 
-                "price_detected": price_detected,
-                "type": url_type or "SINGLE_PRODUCT",
-                "is_available": True 
-            })
+        final_price = "See Options" if url_type == "OPTION_LIST" else None
+        price_detected = True if url_type == "OPTION_LIST" else False
+
+        candidates.append({
+            "title": item.get("title"),
+            "link": item.get("link"),
+            "source": item.get("source", "Web"),
+            "final_price": final_price, 
+            "price_detected": price_detected,
+            "type": url_type or "SINGLE_PRODUCT",
+            "is_available": True 
+        })
 
     to_scrape = [c for c in candidates if not c["price_detected"] and c["type"] == "SINGLE_PRODUCT"][:5] 
 
     if to_scrape:
         logger.info(f"Scraping {len(to_scrape)} URLs using Engine...")
-        async with httpx.AsyncClient() as client:
-            tasks = [smart_scrape(client, item, local_engine) for item in to_scrape]
-            await asyncio.gather(*tasks)
+        tasks = [smart_scrape(item, price_fetcher) for item in to_scrape]
+        await asyncio.gather(*tasks)
 
     final_results = []
-    save_tasks = []
+    to_save = []
     
     is_pt = (gl.lower() == 'br')
     currency_symbol = "R$" if is_pt else "$"
@@ -198,20 +199,18 @@ async def search_web_products(query: str, gl: str = "us", hl: str = "en") -> str
         
         if isinstance(price_val, (int, float)) or (isinstance(price_val, str) and currency_symbol in price_val):
             logger.info(f"Auto-saving product: {item['title'][:30]}...")
-            save_tasks.append(
-                catalog_service.register_product(
-                    url=item["link"],
-                    title=item["title"],
-                    price=price_val,
-                    description=f"Auto-saved from search: {query}", 
-                    specs={"source": item.get("source")}
-                )
-            )
+            to_save.append({
+                "url": item["link"],
+                "title": item["title"],
+                "price": price_val,
+                "description": f"Auto-saved from search: {query}", 
+                "specs": {"source": item.get("source")}
+            })
     
-    if save_tasks:
+    if to_save:
         try:
-            await asyncio.gather(*save_tasks)
-            logger.info(f"Successfully auto-saved {len(save_tasks)} products.")
+            await catalog_service.register_products_bulk(to_save)
+            logger.info(f"Successfully auto-saved {len(to_save)} products.")
         except Exception as e:
             logger.error(f"Error in auto-save routine: {e}")
 
@@ -1,25 +1,99 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+import asyncio
+from typing import Optional, Sequence, Any
+
+import numpy as np
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 
 
 from src.core.settings import settings
+from src.core.logger import logger
 
 
 class DatabaseManager:
     """
     Manages asynchronous connections to the PostgreSQL database using SQLAlchemy.
+    The engine is created lazily on first use, so importing this module has no side effects.
+    With PG_BINARY_VECTORS and the `pgvector` package installed, every connection registers
+    binary codecs for vector/halfvec, so embeddings travel as packed floats instead of text.
     """
     def __init__(self):
-        self.engine = create_async_engine(
-            settings.database_url,
-            echo=False, 
-            pool_size=20,
-            max_overflow=10
-        )
-        self.session_factory = async_sessionmaker(
-            bind=self.engine,
-            class_=AsyncSession,
-            expire_on_commit=False
-        )
+        self._engine = None
+        self._session_factory = None
+        self.binary_vectors = False
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            self._engine = create_async_engine(
+                settings.database_url,
+                echo=False, 
+                pool_size=20,
+                max_overflow=10
+            )
+            self.binary_vectors = self._install_vector_codecs(self._engine)
+        return self._engine
+
+    @staticmethod
+    def _install_vector_codecs(engine: AsyncEngine) -> bool:
+        if not settings.pg_binary_vectors:
+            return False
+        try:
+            from pgvector.asyncpg import register_vector
+        except ImportError:
+            logger.warning("PG_BINARY_VECTORS is enabled but the 'pgvector' package is not installed; sending vectors as text.")
+            return False
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def _register(dbapi_connection, connection_record):
+            dbapi_connection.run_async(register_vector)
+
+        return True
+
+    def vector_param(self, embedding: Optional[Sequence[float]]) -> Any:
+        """
+        Bind value for a vector parameter: a float32 array for the binary codec,
+        or pgvector's text literal when the codec is not available.
+        """
+        if embedding is None:
+            return None
+        if self.engine is not None and self.binary_vectors:
+            return np.asarray(embedding, dtype=np.float32)
+        return str([float(value) for value in embedding])
+
+    def vector_array_param(self, embeddings: Sequence[Optional[Sequence[float]]]) -> list:
+        """
+        Bind value for an array of vectors (None entries allowed). With the binary codec every
+        element is wrapped in pgvector's Vector/HalfVector: asyncpg would otherwise encode a list
+        of float arrays as a two-dimensional float array and reject it as a vector[] element.
+        """
+        if self.engine is not None and self.binary_vectors:
+            if settings.embedding_storage == "halfvec":
+                from pgvector import HalfVector as element
+            else:
+                from pgvector import Vector as element
+            return [element(np.asarray(embedding, dtype=np.float32)) if embedding is not None else None for embedding in embeddings]
+        return [self.vector_param(embedding) for embedding in embeddings]
+
+    def vector_array_sql(self, param: str) -> str:
+        """
+        SQL expression turning a bound vector_array_param() list into an array of the
+        configured embedding storage type.
+        """
+        array_type = f"{settings.embedding_storage}[]"
+        if self.engine is not None and self.binary_vectors:
+            return f"CAST(:{param} AS {array_type})"
+        return f"CAST(CAST(:{param} AS text[]) AS {array_type})"
+
+    @property
+    def session_factory(self) -> async_sessionmaker:
+        if self._session_factory is None:
+            self._session_factory = async_sessionmaker(
+                bind=self.engine,
+                class_=AsyncSession,
+                expire_on_commit=False
+            )
+        return self._session_factory
 
     async def get_session(self) -> AsyncSession:
         """
@@ -27,10 +101,24 @@ class DatabaseManager:
         """
         return self.session_factory()
 
+    async def prime_pool(self, connections: int = 5):
+        """
+        Opens several pooled connections concurrently so the first requests do not pay for connection setup.
+        """
+        async def _touch():
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        await asyncio.gather(*[_touch() for _ in range(connections)])
+
     async def close(self):
         """
         Disposes of the database engine and closes all connections.
         """
-        await self.engine.dispose()
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._session_factory = None
+            self.binary_vectors = False
 
-db_manager = DatabaseManager()
\ No newline at end of file
+db_manager = DatabaseManager()
@@ -23,6 +23,67 @@ class Settings:
         self.pg_db = self._safe_load("POSTGRES_DB")
         
         self.context_window = 5000
+
+        self.embedding_batch_size = int(self._optional_load("EMBEDDING_BATCH_SIZE", "32"))
+        self.embedding_max_wait_ms = float(self._optional_load("EMBEDDING_MAX_WAIT_MS", "5"))
+
+        self.embedding_model = self._optional_load("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+        self.embedding_backend = self._optional_load("EMBEDDING_BACKEND", "torch")
+        self.embedding_onnx_dir = self._optional_load("EMBEDDING_ONNX_DIR", ".cache/onnx")
+        self.embedding_server_socket = self._optional_load("EMBEDDING_SERVER_SOCKET", "")
+        self.embedding_server_timeout = float(self._optional_load("EMBEDDING_SERVER_TIMEOUT", "10"))
+        self.embedding_cache_dir = self._optional_load("EMBEDDING_CACHE_DIR", ".cache/embeddings")
+        self.embedding_cache_memory_size = int(self._optional_load("EMBEDDING_CACHE_MEMORY_SIZE", "4096"))
+        self.embedding_cache_disk_size = int(self._optional_load("EMBEDDING_CACHE_DISK_SIZE", "100000"))
+        self.embedding_cache_flush_seconds = float(self._optional_load("EMBEDDING_CACHE_FLUSH_SECONDS", "5"))
+
+        self.scraper_pool_workers = int(self._optional_load("SCRAPER_POOL_WORKERS", "2"))
+        self.scraper_pool_max_pending = int(self._optional_load("SCRAPER_POOL_MAX_PENDING", "16"))
+        self.extraction_demote_after = int(self._optional_load("EXTRACTION_DEMOTE_AFTER", "5"))
+        self.extraction_demote_minutes = int(self._optional_load("EXTRACTION_DEMOTE_MINUTES", "360"))
+
+        self.http2 = self._optional_load("HTTP2", "true").lower() == "true"
+        self.http_max_connections = int(self._optional_load("HTTP_MAX_CONNECTIONS", "100"))
+        self.http_max_keepalive = int(self._optional_load("HTTP_MAX_KEEPALIVE", "20"))
+        self.http_per_domain_limit = int(self._optional_load("HTTP_PER_DOMAIN_LIMIT", "4"))
+        self.http_domain_limits = self._optional_load("HTTP_DOMAIN_LIMITS", "")
+
+        self.page_cache_ttl_seconds = float(self._optional_load("PAGE_CACHE_TTL_SECONDS", "300"))
+        self.page_cache_max_entries = int(self._optional_load("PAGE_CACHE_MAX_ENTRIES", "2000"))
+        self.scraper_early_stop = self._optional_load("SCRAPER_EARLY_STOP", "true").lower() == "true"
+        self.scraper_max_page_bytes = int(self._optional_load("SCRAPER_MAX_PAGE_BYTES", "8388608"))
+
+        self.domain_rate_initial = float(self._optional_load("DOMAIN_RATE_INITIAL", "2"))
+        self.domain_rate_min = float(self._optional_load("DOMAIN_RATE_MIN", "0.2"))
+        self.domain_rate_max = float(self._optional_load("DOMAIN_RATE_MAX", "8"))
+        self.domain_rate_step = float(self._optional_load("DOMAIN_RATE_STEP", "0.25"))
+        self.domain_slow_seconds = float(self._optional_load("DOMAIN_SLOW_SECONDS", "6"))
+        self.circuit_failure_threshold = int(self._optional_load("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.circuit_cooldown_seconds = float(self._optional_load("CIRCUIT_COOLDOWN_SECONDS", "120"))
+
+        self.watchdog_concurrency = int(self._optional_load("WATCHDOG_CONCURRENCY", "8"))
+        self.watchdog_tick_seconds = int(self._optional_load("WATCHDOG_TICK_SECONDS", "60"))
+        self.watchdog_batch_size = int(self._optional_load("WATCHDOG_BATCH_SIZE", "200"))
+        self.watchdog_base_interval_minutes = float(self._optional_load("WATCHDOG_BASE_INTERVAL_MINUTES", "60"))
+        self.watchdog_min_interval_minutes = float(self._optional_load("WATCHDOG_MIN_INTERVAL_MINUTES", "10"))
+        self.watchdog_max_interval_minutes = float(self._optional_load("WATCHDOG_MAX_INTERVAL_MINUTES", "720"))
+        self.watchdog_lease_seconds = float(self._optional_load("WATCHDOG_LEASE_SECONDS", "300"))
+        self.watchdog_mode = self._optional_load("WATCHDOG_MODE", "leader").lower()
+        self.alert_index_refresh_seconds = int(self._optional_load("ALERT_INDEX_REFRESH_SECONDS", "60"))
+        self.price_history_raw_retention_days = int(self._optional_load("PRICE_HISTORY_RAW_RETENTION_DAYS", "180"))
+        self.price_history_partitions_ahead = int(self._optional_load("PRICE_HISTORY_PARTITIONS_AHEAD", "2"))
+        self.price_history_maintenance_hours = float(self._optional_load("PRICE_HISTORY_MAINTENANCE_HOURS", "24"))
+        self.search_cache_ttl_seconds = float(self._optional_load("SEARCH_CACHE_TTL_SECONDS", "120"))
+        self.search_cache_max_entries = int(self._optional_load("SEARCH_CACHE_MAX_ENTRIES", "1000"))
+        self.search_candidates = int(self._optional_load("SEARCH_CANDIDATES", "40"))
+        self.search_rrf_k = int(self._optional_load("SEARCH_RRF_K", "60"))
+        self.search_ef_search = int(self._optional_load("SEARCH_EF_SEARCH", "100"))
+        self.search_hnsw_iterative_scan = self._optional_load("SEARCH_HNSW_ITERATIVE_SCAN", "").lower()
+        self.pg_binary_vectors = self._optional_load("PG_BINARY_VECTORS", "true").lower() == "true"
+        self.embedding_storage = "halfvec" if self._optional_load("EMBEDDING_STORAGE", "vector").lower() == "halfvec" else "vector"
+        self.ann_mirror_enabled = self._optional_load("ANN_MIRROR_ENABLED", "false").lower() == "true"
+        self.ann_mirror_backend = self._optional_load("ANN_MIRROR_BACKEND", "auto").lower()
+        self.ann_mirror_hnsw_threshold = int(self._optional_load("ANN_MIRROR_HNSW_THRESHOLD", "200000"))
     
     def _safe_load(self, key: str) -> str:
         """
@@ -32,6 +93,12 @@ class Settings:
         if value is None:
             raise ValueError(f"Environment variable '{key}' is not set.")
         return value
+
+    def _optional_load(self, key: str, default: str) -> str:
+        """
+        Loads an optional environment variable, falling back to a default value.
+        """
+        return os.getenv(key, default)
     
     @property
     def database_url(self) -> str:
@@ -40,7 +107,38 @@ class Settings:
         """
         return f"postgresql+asyncpg://{self.pg_user}:{self.pg_pass}@{self.pg_host}:{self.pg_port}/{self.pg_db}"
 
+    @property
+    def embedding_model_id(self) -> str:
+        """
+        Identifies the vectors produced by the configured model and backend.
+        """
+        if self.embedding_backend == "torch":
+            return self.embedding_model
+        return f"{self.embedding_model}@{self.embedding_backend}-int8"
+
     def __str__(self):
         return f"Settings(token_telegram=****, ngrok_url={self.ngrok_url}, groq_api_key=****)"
 
-settings = Settings()
\ No newline at end of file
+class LazySettings:
+    """
+    Proxy that defers reading the environment until a setting is first accessed,
+    so modules can be imported without a complete .env.
+    """
+    def __init__(self):
+        object.__setattr__(self, "_settings", None)
+
+    def _load(self) -> Settings:
+        if self._settings is None:
+            object.__setattr__(self, "_settings", Settings())
+        return self._settings
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value):
+        setattr(self._load(), name, value)
+
+    def __str__(self):
+        return str(self._load())
+
+settings = LazySettings()
\ No newline at end of file
@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+from src.core.settings import settings
+
+
+class SearchConfig(BaseModel):
+    """
+    Tuning and filters for a hybrid catalog search. `candidates` is the depth of each ranked
+    branch before fusion, `rrf_k` the Reciprocal Rank Fusion constant and `ef_search` the HNSW
+    candidate list size for the query (never below `candidates`). Filters apply inside both
+    branches, before ranking; with pgvector >= 0.8, `iterative_scan` ("relaxed_order" or
+    "strict_order") keeps the index scan going until enough filtered rows are found.
+    """
+    candidates: int = 40
+    rrf_k: int = 60
+    ef_search: int = 100
+    iterative_scan: str = ""
+    domains: Optional[List[str]] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+    @classmethod
+    def default(cls, **overrides) -> "SearchConfig":
+        values = {
+            "candidates": settings.search_candidates,
+            "rrf_k": settings.search_rrf_k,
+            "ef_search": settings.search_ef_search,
+            "iterative_scan": settings.search_hnsw_iterative_scan,
+        }
+        values.update(overrides)
+        return cls(**values)
+
+    @property
+    def effective_ef_search(self) -> int:
+        return max(self.ef_search, self.candidates)
@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional, Any
 from decimal import Decimal
+from datetime import datetime
+
+from src.domain.search import SearchConfig
 
 class ICatalogRepository(ABC):
     
@@ -16,16 +19,57 @@ class ICatalogRepository(ABC):
                                        price: Optional[float],
                                        specs: Dict,
                                        description: Optional[str] = None,
-                                       embedding: Optional[List[float]] = None
+                                       embedding: Optional[List[float]] = None,
+                                       content_hash: Optional[str] = None
     ) -> str:
         pass
     
     
+    @abstractmethod
+    async def upsert_many(self, products: List[Dict[str, Any]]) -> Dict[str, str]:
+        pass
+    
+    
+    @abstractmethod
+    async def get_content_hash(self, url: str) -> Optional[str]:
+        pass
+    
+    
+    @abstractmethod
+    async def get_content_hashes(self, urls: List[str]) -> Dict[str, str]:
+        pass
+    
+    
+    @abstractmethod
+    async def insert_price_for_url(self, url: str, price: Decimal) -> Optional[Dict[str, Any]]:
+        pass
+    
+    
     @abstractmethod
     async def get_average_price_last_30_days(self, product_id: str) -> Optional[Decimal]:
         pass
     
     
     @abstractmethod
-    async def search_hybrid(self, query_text: str, query_vector: List[float], limit: int = 5) -> List[Dict[str, Any]]:
+    async def search_hybrid(self,
+                            query_text: str,
+                            query_vector: List[float],
+                            limit: int = 5,
+                            config: Optional[SearchConfig] = None,
+                            semantic_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        pass
+    
+    
+    @abstractmethod
+    async def get_embeddings_page(self, after_id: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        pass
+    
+    
+    @abstractmethod
+    async def get_embeddings_by_ids(self, product_ids: List[str]) -> List[Dict[str, Any]]:
+        pass
+    
+    
+    @abstractmethod
+    async def get_embeddings_updated_since(self, since: datetime) -> List[Dict[str, Any]]:
         pass
\ No newline at end of file
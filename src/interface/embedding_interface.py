@@ -0,0 +1,11 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class IEmbeddingBackend(ABC):
+
+    name: str = "unknown"
+
+    @abstractmethod
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        pass
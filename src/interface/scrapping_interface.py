@@ -1,35 +1,61 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable, Tuple
 from bs4 import BeautifulSoup
 import json
 import re
 
 
 from src.utils.scrapping_utils import clean_price_str
+from src.utils.html_prescan import find_json_ld_blocks, find_meta_content
 from src.domain.product import PriceExtractionResult
 
 
 class IScrapingStrategy(ABC):
+    name: str = "UNKNOWN"
+    domains: Tuple[str, ...] = ()
+    needs_dom: bool = True
+
     @abstractmethod
     def can_handle(self, url: str) -> bool:
         pass
 
+    def handles_domain(self, domain: str) -> bool:
+        """
+        Whether the strategy applies to a domain. Strategies without domain keywords are generic.
+        """
+        return not self.domains or any(keyword in domain for keyword in self.domains)
+
     @abstractmethod
     def extract(self, soup: BeautifulSoup) -> PriceExtractionResult:
         pass
 
+    def extract_fast(self, html: str) -> Optional[PriceExtractionResult]:
+        """
+        Extracts straight from the raw HTML without building a DOM.
+        Returns None when the strategy needs the parsed document.
+        """
+        return None
+
 
 class JsonLdStrategy(IScrapingStrategy):
+    name = "JSON_LD"
+    needs_dom = False
+
     def can_handle(self, url: str) -> bool:
         return True 
 
     def extract(self, soup: BeautifulSoup) -> PriceExtractionResult:
         scripts = soup.find_all('script', type='application/ld+json')
-        
-        for script in scripts:
+        return self._parse_blocks(script.string for script in scripts)
+
+    def extract_fast(self, html: str) -> Optional[PriceExtractionResult]:
+        return self._parse_blocks(find_json_ld_blocks(html))
+
+    def _parse_blocks(self, blocks: Iterable[Optional[str]]) -> PriceExtractionResult:
+        for block in blocks:
             try:
-                if not script.string: continue
-                data = json.loads(script.string)
+                if not block: continue
+                data = json.loads(block)
                 
                 if isinstance(data, list) and data: data = data[0]
                 
@@ -64,6 +90,9 @@ class JsonLdStrategy(IScrapingStrategy):
 
 
 class AmazonStrategy(IScrapingStrategy):
+    name = "AMAZON_HTML"
+    domains = ("amazon",)
+
     def can_handle(self, url: str) -> bool:
         return "amazon" in url.lower()
 
@@ -73,13 +102,12 @@ class AmazonStrategy(IScrapingStrategy):
         is_available = True
 
         availability_div = soup.select_one('#availability')
-        page_text = soup.get_text().lower()
         
         if availability_div:
             text = availability_div.get_text().lower()
             if "indisponível" in text or "não disponível" in text:
                 is_available = False
-        elif "atualmente indisponível" in page_text:
+        elif "atualmente indisponível" in soup.get_text().lower():
             is_available = False
 
         if not is_available:
@@ -100,6 +128,9 @@ class AmazonStrategy(IScrapingStrategy):
 
 
 class MercadoLivreStrategy(IScrapingStrategy):
+    name = "ML_HTML"
+    domains = ("mercadolivre",)
+
     def can_handle(self, url: str) -> bool:
         return "mercadolivre" in url.lower()
 
@@ -134,17 +165,25 @@ class MercadoLivreStrategy(IScrapingStrategy):
 
 
 class OpenGraphStrategy(IScrapingStrategy):
+    name = "OPEN_GRAPH"
+    needs_dom = False
+
     def can_handle(self, url: str) -> bool:
         return True
 
     def extract(self, soup: BeautifulSoup) -> PriceExtractionResult:
-        c_price = None
         og_price = soup.find("meta", property="product:price:amount")
+        return self._build(og_price.get("content") if og_price else None)
+
+    def extract_fast(self, html: str) -> Optional[PriceExtractionResult]:
+        return self._build(find_meta_content(html, "product:price:amount"))
+
+    def _build(self, content: Optional[str]) -> PriceExtractionResult:
+        c_price = None
         
-        
-        if og_price:
+        if content:
             try:
-                c_price = float(og_price["content"])
+                c_price = float(content)
             except:
                 pass
                 
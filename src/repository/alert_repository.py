@@ -1,6 +1,7 @@
 from sqlalchemy import text
 from typing import List, Dict, Any
 from decimal import Decimal
+from datetime import datetime, timedelta, timezone
 
 from src.core.database import db_manager
 
@@ -19,6 +20,12 @@ class AlertRepository:
             VALUES (:pid, :cid, :target)
             RETURNING alert_id;
         """)
+
+        sql_watch = text("""
+            INSERT INTO product_watch (product_id, next_check_at)
+            VALUES (:pid, NOW())
+            ON CONFLICT (product_id) DO UPDATE SET next_check_at = LEAST(product_watch.next_check_at, EXCLUDED.next_check_at);
+        """)
         
         async with await db_manager.get_session() as session:
             async with session.begin():
@@ -27,6 +34,7 @@ class AlertRepository:
                     "cid": chat_id,
                     "target": target_price
                 })
+                await session.execute(sql_watch, {"pid": product_id})
                 return result.scalar()
 
     async def get_active_alerts(self) -> List[Dict[str, Any]]:
@@ -50,11 +58,127 @@ class AlertRepository:
             result = await session.execute(sql)
             return [dict(row) for row in result.mappings().all()]
 
-    async def deactivate_alert(self, alert_id: int):
+    async def claim_due_alerts(self, owner: str, limit: int, lease_seconds: float) -> List[Dict[str, Any]]:
+        """
+        Leases up to `limit` due products to `owner` and returns their active alerts, most overdue first,
+        along with the product's price volatility (last change percent when it happened within the
+        last 7 days, and the number of changes in that window).
+        Rows leased by another worker are skipped (FOR UPDATE SKIP LOCKED), and leases that expire
+        without being released become claimable again.
+        """
+        sql = text("""
+            WITH claimed AS (
+                UPDATE product_watch w
+                SET lease_owner = :owner,
+                    lease_expires_at = NOW() + make_interval(secs => :lease)
+                WHERE w.product_id IN (
+                    SELECT w2.product_id
+                    FROM product_watch w2
+                    WHERE w2.next_check_at <= NOW()
+                      AND (w2.lease_expires_at IS NULL OR w2.lease_expires_at < NOW())
+                      AND EXISTS (
+                          SELECT 1 FROM price_alerts pa
+                          WHERE pa.product_id = w2.product_id AND pa.is_active = TRUE
+                      )
+                    ORDER BY w2.next_check_at
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING w.product_id, w.next_check_at
+            )
+            SELECT 
+                pa.alert_id, 
+                pa.chat_id, 
+                pa.target_price, 
+                pa.product_id,
+                p.url, 
+                p.title,
+                CASE WHEN p.last_price_change_at >= :since_7d THEN p.price_change_percent ELSE 0 END AS price_change_percent,
+                COALESCE(changes.changes_7d, 0) AS changes_7d
+            FROM claimed
+            JOIN products p ON p.product_id = claimed.product_id
+            JOIN price_alerts pa ON pa.product_id = claimed.product_id AND pa.is_active = TRUE
+            LEFT JOIN LATERAL (
+                SELECT COUNT(*) FILTER (WHERE h.prev_amount IS NOT NULL AND h.price_amount <> h.prev_amount) AS changes_7d
+                FROM (
+                    SELECT ph.price_amount, LAG(ph.price_amount) OVER (ORDER BY ph.scraped_at) AS prev_amount
+                    FROM price_history ph
+                    WHERE ph.product_id = claimed.product_id
+                      AND ph.scraped_at >= :since_7d
+                ) h
+            ) changes ON TRUE
+            ORDER BY claimed.next_check_at
+        """)
+        
+        async with await db_manager.get_session() as session:
+            async with session.begin():
+                result = await session.execute(sql, {
+                    "owner": owner,
+                    "limit": limit,
+                    "lease": float(lease_seconds),
+                    "since_7d": datetime.now(timezone.utc) - timedelta(days=7)
+                })
+                return [dict(row) for row in result.mappings().all()]
+
+    async def renew_leases(self, owner: str, product_ids: List[str], lease_seconds: float) -> int:
+        """
+        Extends the leases `owner` still holds on the given products. Returns how many were renewed.
+        """
+        sql = text("""
+            UPDATE product_watch
+            SET lease_expires_at = NOW() + make_interval(secs => :lease)
+            WHERE product_id = ANY(CAST(:pids AS uuid[]))
+              AND lease_owner = :owner
+        """)
+
+        async with await db_manager.get_session() as session:
+            async with session.begin():
+                result = await session.execute(sql, {"pids": product_ids, "owner": owner, "lease": float(lease_seconds)})
+                return result.rowcount
+
+    async def mark_checked(self, owner: str, product_id: str, alert_ids: List[int], interval_seconds: float) -> bool:
         """
-        Deactivates a specific alert by its ID.
+        Records a watchdog check: stamps the alerts' last_checked_at, schedules the product's
+        next check and releases its lease. The schedule is only written while `owner` still holds
+        the lease; returns False when the lease expired and the product was claimed again.
         """
-        sql = text("UPDATE price_alerts SET is_active = FALSE WHERE alert_id = :aid")
+        sql_watch = text("""
+            UPDATE product_watch
+            SET last_checked_at = NOW(),
+                check_interval = make_interval(secs => :secs),
+                next_check_at = NOW() + make_interval(secs => :secs),
+                lease_owner = NULL,
+                lease_expires_at = NULL
+            WHERE product_id = :pid
+              AND lease_owner = :owner
+        """)
+        sql_alerts = text("UPDATE price_alerts SET last_checked_at = NOW() WHERE alert_id = ANY(:ids)")
+
+        async with await db_manager.get_session() as session:
+            async with session.begin():
+                result = await session.execute(sql_watch, {"pid": product_id, "owner": owner, "secs": float(interval_seconds)})
+                await session.execute(sql_alerts, {"ids": alert_ids})
+                return result.rowcount > 0
+
+    async def deactivate_alert(self, alert_id: int) -> bool:
+        """
+        Atomically deactivates an alert. Returns False when it was already inactive, so only one
+        caller (worker, event or user) ever wins the right to notify. The product leaves the
+        watchdog schedule once it has no active alerts left.
+        """
+        sql = text("UPDATE price_alerts SET is_active = FALSE WHERE alert_id = :aid AND is_active = TRUE RETURNING product_id")
+        sql_unwatch = text("""
+            DELETE FROM product_watch w
+            WHERE w.product_id = :pid
+              AND NOT EXISTS (
+                  SELECT 1 FROM price_alerts pa
+                  WHERE pa.product_id = w.product_id AND pa.is_active = TRUE
+              )
+        """)
         async with await db_manager.get_session() as session:
             async with session.begin():
-                await session.execute(sql, {"aid": alert_id})
\ No newline at end of file
+                product_id = (await session.execute(sql, {"aid": alert_id})).scalar()
+                if product_id is None:
+                    return False
+                await session.execute(sql_unwatch, {"pid": product_id})
+                return True
\ No newline at end of file
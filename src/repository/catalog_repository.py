@@ -4,12 +4,58 @@ import json
 from sqlalchemy import text
 from typing import List, Dict, Optional, Any
 from decimal import Decimal
+from datetime import datetime, timedelta, timezone
 
 from src.interface.catalog_interface import ICatalogRepository
+from src.domain.search import SearchConfig
 from src.core.database import db_manager
 from src.core.logger import logger
 
 
+# Run-length price recording shared by every write path; expects an `obs (product_id, price)` CTE.
+# A price equal to the product's latest run of the current month extends that run (last_seen_at,
+# observation_count); any other price starts a new run, which is what fires the metrics trigger.
+# Runs never cross a month, so each one lives in a single price_history partition.
+OBSERVE_PRICES = """
+    current_run AS (
+        SELECT DISTINCT ON (h.product_id) h.product_id, h.history_id, h.scraped_at, h.price_amount
+        FROM price_history h
+        JOIN obs o ON o.product_id = h.product_id
+        WHERE h.scraped_at >= :month_start
+        ORDER BY h.product_id, h.scraped_at DESC, h.history_id DESC
+    ),
+    extended AS (
+        UPDATE price_history h
+        SET last_seen_at = NOW(),
+            observation_count = h.observation_count + 1
+        FROM current_run c
+        JOIN obs o ON o.product_id = c.product_id
+        WHERE h.history_id = c.history_id
+          AND h.scraped_at = c.scraped_at
+          AND h.scraped_at >= :month_start
+          AND c.price_amount = o.price
+        RETURNING h.product_id
+    ),
+    inserted AS (
+        INSERT INTO price_history (product_id, price_amount)
+        SELECT o.product_id, o.price
+        FROM obs o
+        WHERE NOT EXISTS (
+            SELECT 1 FROM current_run c
+            WHERE c.product_id = o.product_id AND c.price_amount = o.price
+        )
+        RETURNING product_id
+    )
+"""
+
+
+def month_start() -> datetime:
+    """
+    Start of the current UTC month, the lower bound of the partition holding open runs.
+    """
+    return datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
 class CatalogRepository(ICatalogRepository):
     """
     Handles persistence and retrieval of products and price history from the database.
@@ -42,6 +88,22 @@ class CatalogRepository(ICatalogRepository):
             rows = result.mappings().all()
             return [dict(row) for row in rows]
 
+    async def get_content_hash(self, url: str) -> Optional[str]:
+        """
+        Returns the stored content hash of an active, already embedded product.
+        """
+        sql = text("""
+            SELECT content_hash
+            FROM products
+            WHERE url = :url
+            AND embedding IS NOT NULL
+            AND is_active = TRUE;
+        """)
+
+        async with await db_manager.get_session() as session:
+            result = await session.execute(sql, {"url": url})
+            return result.scalar()
+
     async def upsert_product_and_price(self, 
                                        url: str, 
                                        domain: str, 
@@ -49,30 +111,46 @@ class CatalogRepository(ICatalogRepository):
                                        price: Optional[Decimal],
                                        specs: Dict,
                                        description: Optional[str] = None,
-                                       embedding: Optional[List[float]] = None) -> str: 
+                                       embedding: Optional[List[float]] = None,
+                                       content_hash: Optional[str] = None) -> str: 
         """
         Inserts or updates a product and its current price.
-        If the product exists, updates its metadata. Always adds a new record to price history.
+        If the product exists and its content hash changed, updates its metadata;
+        an unchanged row is left untouched. The price is recorded run-length encoded:
+        a new history row only when it differs from the current run.
         """
         sql_product = text("""
-            INSERT INTO products (url, domain, title, description, specs, embedding, is_active)
-            VALUES (:url, :domain, :title, :desc, :specs, :embedding, TRUE)
+            INSERT INTO products (url, domain, title, description, specs, embedding, content_hash, is_active)
+            VALUES (:url, :domain, :title, :desc, :specs, :embedding, :content_hash, TRUE)
             ON CONFLICT (url) DO UPDATE 
             SET title = EXCLUDED.title,
                 description = EXCLUDED.description,
                 specs = EXCLUDED.specs,
-                embedding = EXCLUDED.embedding,
+                embedding = COALESCE(EXCLUDED.embedding, products.embedding),
+                content_hash = CASE
+                    WHEN EXCLUDED.embedding IS NULL AND products.content_hash IS DISTINCT FROM EXCLUDED.content_hash THEN NULL
+                    ELSE EXCLUDED.content_hash
+                END,
                 last_updated_at = NOW(),
                 is_active = TRUE
+            WHERE products.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+            OR EXCLUDED.content_hash IS NULL
+            OR products.embedding IS NULL
+            OR products.is_active IS NOT TRUE
             RETURNING product_id;
         """)
 
-        sql_price = text("""
-            INSERT INTO price_history (product_id, price_amount)
-            VALUES (:pid, :price);
+        sql_existing = text("SELECT product_id FROM products WHERE url = :url;")
+
+        sql_price = text(f"""
+            WITH obs AS (
+                SELECT CAST(:pid AS uuid) AS product_id, CAST(:price AS numeric(14, 2)) AS price
+            ),
+            {OBSERVE_PRICES}
+            SELECT COUNT(*) FROM inserted;
         """)
         
-        embedding_val = str(embedding) if embedding else None
+        embedding_val = db_manager.vector_param(embedding) if embedding else None
 
         async with await db_manager.get_session() as session:
             async with session.begin():
@@ -82,65 +160,335 @@ class CatalogRepository(ICatalogRepository):
                     "title": title,
                     "desc": description,
                     "specs": json.dumps(specs),
-                    "embedding": embedding_val 
+                    "embedding": embedding_val,
+                    "content_hash": content_hash
                 })
                 product_id = result.scalar()
 
+                if product_id is None:
+                    result = await session.execute(sql_existing, {"url": url})
+                    product_id = result.scalar()
+
                 if price is not None:
                     await session.execute(sql_price, {
                         "pid": product_id,
-                        "price": price
+                        "price": price,
+                        "month_start": month_start()
                     })
                 else:
                     logger.warning(f"Product registered without price: {title}")
                 
         return str(product_id)
     
+    async def get_content_hashes(self, urls: List[str]) -> Dict[str, str]:
+        """
+        Batch variant of get_content_hash: stored hashes of active, already embedded products by URL.
+        """
+        if not urls:
+            return {}
+
+        sql = text("""
+            SELECT url, content_hash
+            FROM products
+            WHERE url = ANY(CAST(:urls AS text[]))
+            AND embedding IS NOT NULL
+            AND is_active = TRUE;
+        """)
+
+        async with await db_manager.get_session() as session:
+            result = await session.execute(sql, {"urls": urls})
+            return {row["url"]: row["content_hash"] for row in result.mappings().all()}
+
+    async def upsert_many(self, products: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Bulk variant of upsert_product_and_price: upserts every product and records their
+        prices in a single statement (arrays unnested server-side), with the same
+        content-hash guard per row. URLs must be unique within the batch.
+        Returns product ids by URL.
+        """
+        if not products:
+            return {}
+
+        sql = text(f"""
+            WITH input AS (
+                SELECT *
+                FROM unnest(
+                    CAST(:urls AS text[]),
+                    CAST(:domains AS text[]),
+                    CAST(:titles AS text[]),
+                    CAST(:descs AS text[]),
+                    CAST(:specs AS text[]),
+                    {db_manager.vector_array_sql("embeddings")},
+                    CAST(:content_hashes AS text[]),
+                    CAST(:prices AS numeric[])
+                ) AS t(url, domain, title, description, specs, embedding, content_hash, price)
+            ),
+            upserted AS (
+                INSERT INTO products (url, domain, title, description, specs, embedding, content_hash, is_active)
+                SELECT url, domain, title, description, CAST(specs AS jsonb), embedding, content_hash, TRUE
+                FROM input
+                ON CONFLICT (url) DO UPDATE 
+                SET title = EXCLUDED.title,
+                    description = EXCLUDED.description,
+                    specs = EXCLUDED.specs,
+                    embedding = COALESCE(EXCLUDED.embedding, products.embedding),
+                    content_hash = CASE
+                        WHEN EXCLUDED.embedding IS NULL AND products.content_hash IS DISTINCT FROM EXCLUDED.content_hash THEN NULL
+                        ELSE EXCLUDED.content_hash
+                    END,
+                    last_updated_at = NOW(),
+                    is_active = TRUE
+                WHERE products.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                OR EXCLUDED.content_hash IS NULL
+                OR products.embedding IS NULL
+                OR products.is_active IS NOT TRUE
+                RETURNING product_id, url
+            ),
+            resolved AS (
+                SELECT i.url, COALESCE(u.product_id, p.product_id) AS product_id, i.price
+                FROM input i
+                LEFT JOIN upserted u ON u.url = i.url
+                LEFT JOIN products p ON p.url = i.url
+            ),
+            obs AS (
+                SELECT DISTINCT ON (product_id) product_id, CAST(price AS numeric(14, 2)) AS price
+                FROM resolved
+                WHERE price IS NOT NULL
+            ),
+            {OBSERVE_PRICES}
+            SELECT url, product_id FROM resolved;
+        """)
+
+        params = {
+            "urls": [p["url"] for p in products],
+            "domains": [p["domain"] for p in products],
+            "titles": [p["title"] for p in products],
+            "descs": [p.get("description") for p in products],
+            "specs": [json.dumps(p.get("specs") or {}) for p in products],
+            "embeddings": db_manager.vector_array_param([p.get("embedding") or None for p in products]),
+            "content_hashes": [p.get("content_hash") for p in products],
+            "prices": [p.get("price") for p in products],
+            "month_start": month_start(),
+        }
+
+        async with await db_manager.get_session() as session:
+            async with session.begin():
+                result = await session.execute(sql, params)
+                product_ids = {row["url"]: str(row["product_id"]) for row in result.mappings().all()}
+
+        missing_price = sum(1 for p in products if p.get("price") is None)
+        if missing_price:
+            logger.warning(f"{missing_price} product(s) registered without price.")
+        return product_ids
+
+    async def insert_price_for_url(self, url: str, price: Decimal) -> Optional[Dict[str, Any]]:
+        """
+        Records a price observation for an already catalogued product, identified by URL.
+        Returns the product's id and title, or None when the URL is not in the catalog.
+        """
+        sql = text(f"""
+            WITH product AS (
+                SELECT product_id, title FROM products WHERE url = :url
+            ),
+            obs AS (
+                SELECT product_id, CAST(:price AS numeric(14, 2)) AS price FROM product
+            ),
+            {OBSERVE_PRICES}
+            SELECT product_id, title FROM product;
+        """)
+
+        async with await db_manager.get_session() as session:
+            async with session.begin():
+                result = await session.execute(sql, {"url": url, "price": price, "month_start": month_start()})
+                row = result.mappings().first()
+                return {"product_id": str(row["product_id"]), "title": row["title"]} if row else None
+
     async def get_average_price_last_30_days(self, product_id: str) -> Optional[Decimal]:
         """
-        Calculates the average price of a product over the last 30 days.
+        Calculates the time-weighted average price of a product over the last 30 days:
+        each run weighs as long as its price held (until the next run, or the end of the window).
+        The window is bound as literal timestamps so only the covering partitions are scanned.
         """
         sql = text(
             """
-                SELECT AVG(price_amount)
-                FROM price_history
-                WHERE product_id = :pid
-                AND scraped_at >=NOW() - INTERVAL '30 days'
-                AND scraped_at < NOW() - INTERVAL '1 minute';
+                SELECT CASE
+                    WHEN SUM(weight) > 0 THEN SUM(price_amount * weight) / SUM(weight)
+                    ELSE AVG(price_amount)
+                END
+                FROM (
+                    SELECT
+                        price_amount,
+                        GREATEST(EXTRACT(EPOCH FROM
+                            LEAST(COALESCE(LEAD(scraped_at) OVER (ORDER BY scraped_at, history_id), :until), :until)
+                            - GREATEST(scraped_at, :since)
+                        ), 0) AS weight
+                    FROM price_history
+                    WHERE product_id = :pid
+                    AND scraped_at >= :scan_from
+                    AND scraped_at < :until
+                    AND last_seen_at >= :since
+                ) runs;
             """
         )
+
+        now = datetime.now(timezone.utc)
+        since = now - timedelta(days=30)
         
         async with await db_manager.get_session() as session:
-            result = await session.execute(sql, {"pid": product_id})
+            result = await session.execute(sql, {
+                "pid": product_id,
+                "since": since,
+                "until": now - timedelta(minutes=1),
+                "scan_from": since.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            })
             avg_price = result.scalar()
             
             if avg_price:
                 return Decimal(avg_price)
             return None
         
-    async def search_hybrid(self, query_text: str, query_vector: List[float], limit: int = 5) -> List[Dict[str, Any]]:
+    async def get_embeddings_page(self, after_id: Optional[str], limit: int) -> List[Dict[str, Any]]:
         """
-        Performs a hybrid search (Text + Vector) using Reciprocal Rank Fusion (RRF).
-        Uses a 384-dimension local embedding vector.
+        Keyset-paginated scan of active, embedded products (product_id, domain, embedding),
+        ordered by product_id. Used to bootstrap the in-process vector mirror.
         """
         sql = text("""
-            WITH semantic_search AS (
-                SELECT 
-                    product_id, 
-                    1.0 / (ROW_NUMBER() OVER (ORDER BY embedding <=> :embedding) + 60) AS score_vec
-                FROM products
-                WHERE is_active = TRUE
-                ORDER BY embedding <=> :embedding
-                LIMIT 20
-            ),
+            SELECT product_id, domain, embedding
+            FROM products
+            WHERE is_active = TRUE
+            AND embedding IS NOT NULL
+            AND (CAST(:after AS uuid) IS NULL OR product_id > CAST(:after AS uuid))
+            ORDER BY product_id
+            LIMIT :limit;
+        """)
+
+        async with await db_manager.get_session() as session:
+            result = await session.execute(sql, {"after": after_id, "limit": limit})
+            return [dict(row) for row in result.mappings().all()]
+
+    async def get_embeddings_by_ids(self, product_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Current embedding state of the given products; rows missing from the result were deleted.
+        """
+        if not product_ids:
+            return []
+
+        sql = text("""
+            SELECT product_id, domain, embedding, is_active
+            FROM products
+            WHERE product_id = ANY(CAST(:ids AS uuid[]));
+        """)
+
+        async with await db_manager.get_session() as session:
+            result = await session.execute(sql, {"ids": product_ids})
+            return [dict(row) for row in result.mappings().all()]
+
+    async def get_embeddings_updated_since(self, since: datetime) -> List[Dict[str, Any]]:
+        """
+        Embedding state of every product updated at or after `since` (catch-up after missed notifications).
+        """
+        sql = text("""
+            SELECT product_id, domain, embedding, is_active
+            FROM products
+            WHERE last_updated_at >= :since;
+        """)
+
+        async with await db_manager.get_session() as session:
+            result = await session.execute(sql, {"since": since})
+            return [dict(row) for row in result.mappings().all()]
+
+    async def probe_vector_index(self, query_vector: List[float]) -> Optional[str]:
+        """
+        Runs a single nearest-neighbour lookup to pull the HNSW index into memory.
+        """
+        sql = text("""
+            SELECT product_id
+            FROM products
+            WHERE is_active = TRUE
+            ORDER BY embedding <=> :embedding
+            LIMIT 1;
+        """)
+
+        async with await db_manager.get_session() as session:
+            result = await session.execute(sql, {"embedding": db_manager.vector_param(query_vector)})
+            product_id = result.scalar()
+            return str(product_id) if product_id else None
+
+    async def search_hybrid(self,
+                            query_text: str,
+                            query_vector: List[float],
+                            limit: int = 5,
+                            config: Optional[SearchConfig] = None,
+                            semantic_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Performs a hybrid search (Text + Vector) using Reciprocal Rank Fusion (RRF).
+        Uses a 384-dimension local embedding vector. Both branches apply the config's filters
+        before ranking and return `candidates` rows each; only the fused top ids are joined
+        back to products. hnsw.ef_search is set for this transaction only.
+        `semantic_ids` (nearest first, e.g. from the in-process vector mirror) replaces the
+        database ANN branch.
+        """
+        config = config or SearchConfig.default()
+
+        filters = ""
+        params: Dict[str, Any] = {
+            "q": query_text,
+            "candidates": config.candidates,
+            "rrf_k": config.rrf_k,
+            "limit": limit
+        }
+        if config.domains:
+            filters += " AND domain = ANY(CAST(:domains AS text[]))"
+            params["domains"] = config.domains
+        if config.min_price is not None:
+            filters += " AND current_price >= :min_price"
+            params["min_price"] = Decimal(str(config.min_price))
+        if config.max_price is not None:
+            filters += " AND current_price <= :max_price"
+            params["max_price"] = Decimal(str(config.max_price))
+
+        if semantic_ids is None:
+            semantic_sql = f"""
+                SELECT product_id, ROW_NUMBER() OVER (ORDER BY distance) AS position
+                FROM (
+                    SELECT product_id, embedding <=> :embedding AS distance
+                    FROM products
+                    WHERE is_active = TRUE{filters}
+                    ORDER BY embedding <=> :embedding
+                    LIMIT :candidates
+                ) ann
+            """
+            params["embedding"] = db_manager.vector_param(query_vector)
+        else:
+            semantic_sql = """
+                SELECT product_id, position
+                FROM unnest(CAST(:semantic_ids AS uuid[])) WITH ORDINALITY AS s(product_id, position)
+            """
+            params["semantic_ids"] = semantic_ids
+
+        sql = text(f"""
+            WITH semantic_search AS ({semantic_sql}),
             keyword_search AS (
-                SELECT 
-                    product_id, 
-                    1.0 / (ROW_NUMBER() OVER (ORDER BY ts_rank(search_vector, websearch_to_tsquery('portuguese', :q)) DESC) + 60) AS score_text
-                FROM products
-                WHERE search_vector @@ websearch_to_tsquery('portuguese', :q)
-                AND is_active = TRUE
-                LIMIT 20
+                SELECT product_id, ROW_NUMBER() OVER (ORDER BY text_rank DESC) AS position
+                FROM (
+                    SELECT product_id, ts_rank(search_vector, websearch_to_tsquery('portuguese', :q)) AS text_rank
+                    FROM products
+                    WHERE search_vector @@ websearch_to_tsquery('portuguese', :q)
+                    AND is_active = TRUE{filters}
+                    ORDER BY text_rank DESC
+                    LIMIT :candidates
+                ) fts
+            ),
+            fused AS (
+                SELECT product_id, SUM(1.0 / (:rrf_k + position)) AS final_score
+                FROM (
+                    SELECT product_id, position FROM semantic_search
+                    UNION ALL
+                    SELECT product_id, position FROM keyword_search
+                ) ranked
+                GROUP BY product_id
+                ORDER BY final_score DESC
+                LIMIT :limit
             )
             SELECT 
                 p.product_id, 
@@ -151,20 +499,25 @@ class CatalogRepository(ICatalogRepository):
                 p.previous_price,
                 p.price_change_percent,
                 p.lowest_price_30d,
-                (COALESCE(s.score_vec, 0.0) + COALESCE(k.score_text, 0.0)) AS final_score
-            FROM products p
-            LEFT JOIN semantic_search s ON p.product_id = s.product_id
-            LEFT JOIN keyword_search k ON p.product_id = k.product_id
-            WHERE (COALESCE(s.score_vec, 0.0) + COALESCE(k.score_text, 0.0)) > 0
-            ORDER BY final_score DESC
-            LIMIT :limit;
+                f.final_score
+            FROM fused f
+            JOIN products p ON p.product_id = f.product_id
+            WHERE p.is_active = TRUE
+            ORDER BY f.final_score DESC;
         """)
 
         async with await db_manager.get_session() as session:
-            result = await session.execute(sql, {
-                "q": query_text, 
-                "embedding": str(query_vector), 
-                "limit": limit
-            })
-            rows = result.mappings().all()
-            return [dict(row) for row in rows]
\ No newline at end of file
+            async with session.begin():
+                if semantic_ids is None:
+                    await session.execute(
+                        text("SELECT set_config('hnsw.ef_search', :ef, true);"),
+                        {"ef": str(config.effective_ef_search)}
+                    )
+                    if config.iterative_scan:
+                        await session.execute(
+                            text("SELECT set_config('hnsw.iterative_scan', :mode, true);"),
+                            {"mode": config.iterative_scan}
+                        )
+                result = await session.execute(sql, params)
+                rows = result.mappings().all()
+                return [dict(row) for row in rows]
@@ -0,0 +1,58 @@
+import json
+
+
+from sqlalchemy import text
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+
+from src.core.database import db_manager
+
+
+class ExtractionStatsRepository:
+    """
+    Persists per-domain extraction learning: preferred strategy, failure streaks,
+    demotion windows and per-strategy hit counters.
+    """
+
+    async def load_all(self) -> List[Dict[str, Any]]:
+        """
+        Retrieves the learned state of every known domain.
+        """
+        sql = text("""
+            SELECT domain, preferred_strategy, consecutive_failures, demoted_until, strategy_stats
+            FROM domain_extraction_stats;
+        """)
+
+        async with await db_manager.get_session() as session:
+            result = await session.execute(sql)
+            return [dict(row) for row in result.mappings().all()]
+
+    async def save(self,
+                   domain: str,
+                   preferred_strategy: Optional[str],
+                   consecutive_failures: int,
+                   demoted_until: Optional[datetime],
+                   strategy_stats: Dict[str, Dict[str, int]]):
+        """
+        Inserts or updates the learned state of a domain.
+        """
+        sql = text("""
+            INSERT INTO domain_extraction_stats (domain, preferred_strategy, consecutive_failures, demoted_until, strategy_stats)
+            VALUES (:domain, :preferred, :failures, :demoted_until, :stats)
+            ON CONFLICT (domain) DO UPDATE
+            SET preferred_strategy = EXCLUDED.preferred_strategy,
+                consecutive_failures = EXCLUDED.consecutive_failures,
+                demoted_until = EXCLUDED.demoted_until,
+                strategy_stats = EXCLUDED.strategy_stats,
+                updated_at = NOW();
+        """)
+
+        async with await db_manager.get_session() as session:
+            async with session.begin():
+                await session.execute(sql, {
+                    "domain": domain,
+                    "preferred": preferred_strategy,
+                    "failures": consecutive_failures,
+                    "demoted_until": demoted_until,
+                    "stats": json.dumps(strategy_stats)
+                })
@@ -0,0 +1,56 @@
+from sqlalchemy import text
+
+from src.core.database import db_manager
+
+
+class PriceHistoryRepository:
+    """
+    Maintenance of the partitioned price_history table: monthly partitions ahead of time,
+    daily rollups of expired raw rows and retention of old partitions.
+    """
+
+    async def ensure_partitions(self, months_ahead: int) -> int:
+        """
+        Creates the monthly partitions for the current month and the next `months_ahead` ones.
+        Returns how many were created.
+        """
+        sql = text("SELECT create_price_history_partitions(CAST((NOW() AT TIME ZONE 'UTC') AS date), :months);")
+
+        async with await db_manager.get_session() as session:
+            async with session.begin():
+                result = await session.execute(sql, {"months": months_ahead + 1})
+                return result.scalar() or 0
+
+    async def count_default_rows(self) -> int:
+        """
+        Returns how many rows sit in the default partition, i.e. outside every monthly partition.
+        """
+        sql = text("SELECT COUNT(*) FROM price_history_default;")
+
+        async with await db_manager.get_session() as session:
+            result = await session.execute(sql)
+            return result.scalar() or 0
+
+    async def apply_retention(self, keep_raw_days: int) -> int:
+        """
+        Rolls raw partitions older than the horizon up into price_history_daily and drops them.
+        Returns how many partitions were dropped.
+        """
+        sql = text("SELECT apply_price_history_retention(make_interval(days => :days));")
+
+        async with await db_manager.get_session() as session:
+            async with session.begin():
+                result = await session.execute(sql, {"days": keep_raw_days})
+                return result.scalar() or 0
+
+    async def refresh_stale_lowest_prices(self) -> int:
+        """
+        Recomputes lowest_price_30d for products whose recorded minimum left the 30-day window.
+        Extending a run does not fire the metrics trigger, so stable products need this sweep.
+        """
+        sql = text("SELECT refresh_stale_lowest_prices();")
+
+        async with await db_manager.get_session() as session:
+            async with session.begin():
+                result = await session.execute(sql)
+                return result.scalar() or 0
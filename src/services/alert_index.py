@@ -0,0 +1,78 @@
+from bisect import bisect_left, insort
+from typing import List, Dict, Any, Iterable, Tuple
+
+
+class IndexedAlert:
+    __slots__ = ("alert_id", "product_id", "chat_id", "target")
+
+    def __init__(self, alert_id: int, product_id: str, chat_id: int, target: float):
+        self.alert_id = alert_id
+        self.product_id = product_id
+        self.chat_id = chat_id
+        self.target = target
+
+
+class AlertIndex:
+    """
+    In-memory index of active alerts: product -> alerts sorted by target price.
+    An observed price hits every alert whose target is >= the price, found with one bisect.
+    """
+    def __init__(self):
+        self._targets: Dict[str, List[Tuple[float, int]]] = {}
+        self._alerts: Dict[int, IndexedAlert] = {}
+        self.lookups = 0
+        self.hits = 0
+
+    def replace(self, rows: Iterable[Dict[str, Any]]):
+        """
+        Rebuilds the index from price_alerts rows (alert_id, product_id, chat_id, target_price).
+        """
+        targets: Dict[str, List[Tuple[float, int]]] = {}
+        alerts: Dict[int, IndexedAlert] = {}
+        for row in rows:
+            alert = IndexedAlert(row["alert_id"], str(row["product_id"]), row["chat_id"], float(row["target_price"]))
+            alerts[alert.alert_id] = alert
+            targets.setdefault(alert.product_id, []).append((alert.target, alert.alert_id))
+
+        for entries in targets.values():
+            entries.sort()
+        self._targets, self._alerts = targets, alerts
+
+    def add(self, alert_id: int, product_id: str, chat_id: int, target: float):
+        self.remove(alert_id)
+        alert = IndexedAlert(alert_id, str(product_id), chat_id, float(target))
+        self._alerts[alert_id] = alert
+        insort(self._targets.setdefault(alert.product_id, []), (alert.target, alert_id))
+
+    def remove(self, alert_id: int):
+        alert = self._alerts.pop(alert_id, None)
+        if alert is None:
+            return
+        entries = self._targets.get(alert.product_id, [])
+        position = bisect_left(entries, (alert.target, alert_id))
+        if position < len(entries) and entries[position] == (alert.target, alert_id):
+            del entries[position]
+        if not entries:
+            self._targets.pop(alert.product_id, None)
+
+    def match(self, product_id: str, price: float) -> List[IndexedAlert]:
+        """
+        Alerts on the product whose target the price has reached (price <= target).
+        """
+        self.lookups += 1
+        entries = self._targets.get(str(product_id))
+        if not entries or price <= 0:
+            return []
+
+        position = bisect_left(entries, (price, -1))
+        hits = [self._alerts[alert_id] for _, alert_id in entries[position:]]
+        self.hits += len(hits)
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "alerts": len(self._alerts),
+            "products": len(self._targets),
+            "lookups": self.lookups,
+            "hits": self.hits,
+        }
@@ -0,0 +1,70 @@
+from typing import Dict, Any
+
+
+from src.repository.alert_repository import AlertRepository
+from src.services.alert_index import AlertIndex
+from src.telegram.message import send_message
+from src.core.logger import logger
+
+
+class AlertNotifier:
+    """
+    Evaluates alerts the moment a price is observed. Every price recorded in price_history
+    is matched against the AlertIndex; hits are deactivated atomically and notified right away,
+    so the watchdog poll is no longer the only path to an alert.
+    """
+    def __init__(self, repository: AlertRepository = None, index: AlertIndex = None):
+        self.repository = repository or AlertRepository()
+        self.index = index or AlertIndex()
+        self.fired = 0
+
+    async def refresh(self):
+        """
+        Reloads the index from price_alerts (picks up alerts created or closed by other processes).
+        """
+        self.index.replace(await self.repository.get_active_alerts())
+
+    def watch(self, alert_id: int, product_id: str, chat_id: int, target_price: float):
+        self.index.add(alert_id, product_id, chat_id, target_price)
+
+    async def on_price(self, product_id: str, price: float, title: str, url: str) -> int:
+        """
+        Checks an observed price against the product's alerts and fires every hit.
+        Returns how many notifications were sent.
+        """
+        sent = 0
+        for alert in self.index.match(product_id, price):
+            try:
+                if await self.fire(alert.alert_id, alert.chat_id, alert.target, price, title, url):
+                    sent += 1
+            except Exception as e:
+                logger.error(f"Error firing alert {alert.alert_id}: {e}")
+        return sent
+
+    async def fire(self, alert_id: int, chat_id: int, target: float, current_price: float, title: str, url: str) -> bool:
+        """
+        Deactivates the alert and notifies the user. Only the caller that wins the
+        deactivation sends the message, so concurrent observers never double-notify.
+        """
+        self.index.remove(alert_id)
+        if not await self.repository.deactivate_alert(alert_id):
+            return False
+
+        logger.info(f"🚨 TARGET HIT! Alert {alert_id}: {current_price} <= {target}")
+
+        msg = (
+            f"🚨 <b>PRICE ALERT HIT!</b>\n\n"
+            f"📦 {title}\n"
+            f"🎯 Target: $ {target:.2f}\n"
+            f"🔥 <b>Current: $ {current_price:.2f}</b>\n\n"
+            f"🔗 <a href='{url}'>BUY NOW</a>"
+        )
+        await send_message(chat_id, msg)
+        self.fired += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.index.stats(), "fired": self.fired}
+
+
+alert_notifier = AlertNotifier()
@@ -1,10 +1,19 @@
+import hashlib
+import json
+import time
+
 from typing import List, Dict, Optional, Any
 from urllib.parse import urlparse
 from decimal import Decimal, InvalidOperation, getcontext
 
 from src.interface.catalog_interface import ICatalogRepository
 from src.repository.catalog_repository import CatalogRepository
-from src.services.embedding_service import embedding_service
+from src.domain.search import SearchConfig
+from src.services.embedding_service import embedding_service, is_fallback_embedding
+from src.services.alert_notifier import AlertNotifier, alert_notifier as shared_alert_notifier
+from src.services.search_cache import SearchResultCache, search_cache as shared_search_cache
+from src.services.vector_mirror import VectorMirror, vector_mirror as shared_vector_mirror
+from src.core.settings import settings
 from src.core.logger import logger
 
 
@@ -13,16 +22,55 @@ class CatalogService:
     Business logic layer for managing the product catalog and price analysis.
     Provides services for searching, registering products, and calculating discounts.
     """
-    def __init__(self, repository: ICatalogRepository = None):
-        self.repository = repository or CatalogRepository()    
+    def __init__(self,
+                 repository: ICatalogRepository = None,
+                 notifier: AlertNotifier = None,
+                 search_cache: SearchResultCache = None,
+                 vector_mirror: VectorMirror = None):
+        self.repository = repository or CatalogRepository()
+        self.notifier = notifier or shared_alert_notifier
+        self.search_cache = search_cache or shared_search_cache
+        self.vector_mirror = vector_mirror or shared_vector_mirror
         getcontext().prec = 6
     
-    async def search_products(self, query: str) -> List[Dict]:
+    async def search_products(self, query: str, limit: int = 5, config: Optional[SearchConfig] = None) -> List[Dict]:
         """
         Searches for products in the local catalog using semantic embeddings.
+        Results are served from the SearchResultCache until a catalog write invalidates them.
+        When the in-process vector mirror is loaded, it answers the semantic branch unless the
+        search filters on price (prices are not mirrored).
         """
-        vector = embedding_service.get_embedding(query)
-        return await self.repository.search_hybrid(query_text=query, query_vector=vector)
+        config = config or SearchConfig.default()
+        variant = config.model_dump_json()
+
+        if self.search_cache.enabled:
+            cached = self.search_cache.lookup(query, limit, variant)
+            if cached is not None:
+                return list(cached)
+
+        version = self.search_cache.snapshot()
+        started = time.perf_counter()
+        vector = await embedding_service.aget_embedding(query)
+
+        semantic_ids = None
+        if self.vector_mirror.ready and config.min_price is None and config.max_price is None:
+            semantic_ids = await self.vector_mirror.search(vector, config.candidates, config.domains)
+
+        results = await self.repository.search_hybrid(
+            query_text=query,
+            query_vector=vector,
+            limit=limit,
+            config=config,
+            semantic_ids=semantic_ids
+        )
+
+        if self.search_cache.enabled:
+            self.search_cache.store(
+                query, limit, results, version, time.perf_counter() - started, variant,
+                price_filtered=config.min_price is not None or config.max_price is not None,
+                domain_filter=config.domains
+            )
+        return list(results)
     
     def _sanitize_price(self, price: float | str) -> Optional[Decimal]:
         """
@@ -46,6 +94,19 @@ class CatalogService:
         
         return None
 
+    def _content_hash(self, title: str, description: Optional[str], specs: dict) -> str:
+        """
+        Hashes everything that feeds the product row and its embedding, including the model name,
+        so unchanged content can skip re-embedding and the row rewrite.
+        """
+        payload = json.dumps(
+            [settings.embedding_model_id, title, description or "", specs or {}],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
     async def register_product(self, 
                              url: str, 
                              title: str, 
@@ -54,6 +115,9 @@ class CatalogService:
                              specs: dict = {}) -> str:
         """
         Registers or updates a product in the catalog, generating embeddings and sanitizing the price.
+        Embedding generation is skipped when the stored content hash matches. When encoding fails,
+        the product keeps its previous vector and no content hash, so the next registration retries.
+        The recorded price is checked against the product's alerts right away.
         """
         try:
             domain = urlparse(url).netloc
@@ -61,19 +125,125 @@ class CatalogService:
             domain = "unknown"
 
         final_price = self._sanitize_price(price)
-        text_to_embed = f"{title}. {description or ''}"
-        vector = embedding_service.get_embedding(text_to_embed)
+        content_hash = self._content_hash(title, description, specs)
+
+        vector = None
+        content_changed = await self.repository.get_content_hash(url) != content_hash
+        if content_changed:
+            text_to_embed = f"{title}. {description or ''}"
+            vector = await embedding_service.aget_embedding(text_to_embed)
+            if is_fallback_embedding(vector):
+                vector, content_hash = None, None
 
-        return await self.repository.upsert_product_and_price(
+        product_id = await self.repository.upsert_product_and_price(
             url=url,
             domain=domain,
             title=title,
             price=final_price, 
             specs=specs,
             description=description,
-            embedding=vector 
+            embedding=vector,
+            content_hash=content_hash
         )
 
+        if content_changed:
+            if vector is not None and self.vector_mirror.ready:
+                self.vector_mirror.upsert(product_id, domain, vector)
+            self.search_cache.bump_catalog()
+        else:
+            self.search_cache.bump_domain(domain)
+
+        await self._notify_price(product_id, final_price, title, url)
+        return product_id
+
+    async def register_products_bulk(self, products: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Registers many products at once: one content-hash lookup, one batched embedding call for
+        the products whose content changed, and a single upsert round trip for products and prices.
+        Each item takes the register_product arguments (url, title, price, description, specs);
+        when a URL repeats, the last item wins. Returns product ids by URL.
+        """
+        by_url: Dict[str, Dict[str, Any]] = {}
+        for item in products:
+            url = item["url"]
+            try:
+                domain = urlparse(url).netloc
+            except:
+                domain = "unknown"
+
+            description = item.get("description", "")
+            specs = item.get("specs") or {}
+            by_url[url] = {
+                "url": url,
+                "domain": domain,
+                "title": item["title"],
+                "description": description,
+                "specs": specs,
+                "price": self._sanitize_price(item.get("price")),
+                "content_hash": self._content_hash(item["title"], description, specs),
+            }
+
+        rows = list(by_url.values())
+        if not rows:
+            return {}
+
+        stored = await self.repository.get_content_hashes([row["url"] for row in rows])
+        changed = [row for row in rows if stored.get(row["url"]) != row["content_hash"]]
+        if changed:
+            vectors = await embedding_service.aget_embeddings(
+                [f"{row['title']}. {row['description'] or ''}" for row in changed]
+            )
+            for row, vector in zip(changed, vectors):
+                if is_fallback_embedding(vector):
+                    row["content_hash"] = None
+                else:
+                    row["embedding"] = vector
+
+        product_ids = await self.repository.upsert_many(rows)
+
+        if changed:
+            if self.vector_mirror.ready:
+                self.vector_mirror.apply(
+                    {"product_id": product_ids[row["url"]], "domain": row["domain"], "embedding": row["embedding"]}
+                    for row in changed if row["url"] in product_ids and row.get("embedding") is not None
+                )
+            self.search_cache.bump_catalog()
+        else:
+            for domain in {row["domain"] for row in rows}:
+                self.search_cache.bump_domain(domain)
+
+        for row in rows:
+            product_id = product_ids.get(row["url"])
+            if product_id:
+                await self._notify_price(product_id, row["price"], row["title"], row["url"])
+        return product_ids
+
+    async def record_price_observation(self, url: str, price: float | str) -> Optional[str]:
+        """
+        Records a freshly observed price for a product already in the catalog (e.g. from a URL check)
+        without touching its metadata, and evaluates its alerts. Returns None for unknown URLs.
+        """
+        final_price = self._sanitize_price(price)
+        if not final_price:
+            return None
+
+        product = await self.repository.insert_price_for_url(url, final_price)
+        if product is None:
+            return None
+
+        self.search_cache.bump_domain(self.search_cache.domain_of(url))
+
+        await self._notify_price(product["product_id"], final_price, product["title"], url)
+        return product["product_id"]
+
+    async def _notify_price(self, product_id: str, price: Optional[Decimal], title: str, url: str):
+        if not price or price <= 0:
+            return
+        try:
+            await self.notifier.on_price(product_id, float(price), title, url)
+        except Exception as e:
+            logger.error(f"Alert evaluation failed for {url}: {e}")
+
     async def calculate_real_discount(self, product_id: str, current_price: Decimal | float) -> Dict[str, Any]:
         """
         Calculates the real discount percentage based on the average price of the last 30 days.
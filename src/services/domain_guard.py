@@ -0,0 +1,194 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, AsyncIterator
+from urllib.parse import urlparse
+
+
+from src.core.settings import settings
+from src.core.logger import logger
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+OVERLOAD_STATUSES = {429, 503}
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of contacting a domain whose circuit is open.
+    """
+    def __init__(self, domain: str, retry_in: float):
+        super().__init__(f"Circuit open for {domain} (retry in {retry_in:.0f}s)")
+        self.domain = domain
+        self.retry_in = retry_in
+
+
+class DomainState:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = 1.0
+        self.refilled_at = time.monotonic()
+
+        self.circuit = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+        self.requests = 0
+        self.failures = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.throttle_wait = 0.0
+        self.latency_ewma: Optional[float] = None
+
+
+class GuardedCall:
+    """
+    Handle for one guarded request; the caller reports the response status through observe().
+    Latency runs until the guarded block exits, so it covers reading the body.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.status_code: Optional[int] = None
+        self.latency: Optional[float] = None
+
+    def observe(self, status_code: int):
+        self.status_code = status_code
+
+    def finish(self):
+        self.latency = time.perf_counter() - self.started
+
+
+class DomainGuard:
+    """
+    Per-domain outbound protection for scraping. A token bucket paces requests, and its rate
+    adapts AIMD-style: it grows additively on fast successes and is halved on 429/503, errors
+    or slow responses. Repeated failures open a circuit breaker that fails fast until a
+    cool-down passes, after which a single half-open probe decides whether to close it again.
+    """
+    def __init__(self):
+        self._domains: Dict[str, DomainState] = {}
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        try:
+            return urlparse(url).netloc.lower()
+        except Exception:
+            return ""
+
+    def _state(self, domain: str) -> DomainState:
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = DomainState(settings.domain_rate_initial)
+        return state
+
+    def _admit(self, domain: str, state: DomainState) -> bool:
+        """
+        Circuit check. Returns True when this request is the half-open probe.
+        """
+        if state.circuit == CLOSED:
+            return False
+
+        elapsed = time.monotonic() - state.opened_at
+        if state.circuit == OPEN and elapsed >= settings.circuit_cooldown_seconds:
+            state.circuit = HALF_OPEN
+            logger.info(f"Circuit half-open for {domain}, sending probe.")
+
+        if state.circuit == HALF_OPEN and not state.probing:
+            state.probing = True
+            return True
+
+        state.rejected += 1
+        raise CircuitOpenError(domain, max(0.0, settings.circuit_cooldown_seconds - elapsed))
+
+    async def _take_token(self, state: DomainState):
+        now = time.monotonic()
+        state.tokens = min(max(1.0, state.rate), state.tokens + (now - state.refilled_at) * state.rate)
+        state.refilled_at = now
+        state.tokens -= 1.0
+
+        if state.tokens < 0:
+            wait = -state.tokens / state.rate
+            state.throttled += 1
+            state.throttle_wait += wait
+            await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def request(self, url: str) -> AsyncIterator[GuardedCall]:
+        """
+        Wraps one outbound request: raises CircuitOpenError when the domain is open,
+        waits for a token, then records the outcome. Any exception escaping the block,
+        including one raised while reading the body, counts as a failed request.
+        """
+        domain = self.domain_of(url)
+        state = self._state(domain)
+        probe = self._admit(domain, state)
+
+        try:
+            await self._take_token(state)
+            call = GuardedCall()
+            state.requests += 1
+            try:
+                yield call
+            except Exception:
+                call.finish()
+                self._record(domain, state, call, errored=True)
+                raise
+            else:
+                call.finish()
+                self._record(domain, state, call, errored=False)
+        finally:
+            if probe:
+                state.probing = False
+
+    def _record(self, domain: str, state: DomainState, call: GuardedCall, errored: bool):
+        latency = call.latency
+        state.latency_ewma = latency if state.latency_ewma is None else 0.8 * state.latency_ewma + 0.2 * latency
+
+        failed = errored or call.status_code in OVERLOAD_STATUSES or (call.status_code or 0) >= 500
+        slow = latency > settings.domain_slow_seconds
+
+        if failed or slow:
+            state.rate = max(settings.domain_rate_min, state.rate / 2.0)
+        else:
+            state.rate = min(settings.domain_rate_max, state.rate + settings.domain_rate_step)
+
+        if not failed:
+            if state.circuit != CLOSED:
+                logger.info(f"Circuit closed for {domain}.")
+            state.circuit = CLOSED
+            state.consecutive_failures = 0
+            return
+
+        state.failures += 1
+        state.consecutive_failures += 1
+        if state.circuit == HALF_OPEN or state.consecutive_failures >= settings.circuit_failure_threshold:
+            if state.circuit != OPEN:
+                logger.warning(f"Circuit opened for {domain} after {state.consecutive_failures} consecutive failures.")
+            state.circuit = OPEN
+            state.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-domain rate, circuit state and counters.
+        """
+        return {
+            domain: {
+                "circuit": state.circuit,
+                "rate_per_s": round(state.rate, 3),
+                "consecutive_failures": state.consecutive_failures,
+                "requests": state.requests,
+                "failures": state.failures,
+                "rejected": state.rejected,
+                "throttled": state.throttled,
+                "avg_throttle_ms": round(state.throttle_wait / state.throttled * 1000.0, 1) if state.throttled else 0.0,
+                "latency_ewma_ms": round(state.latency_ewma * 1000.0, 1) if state.latency_ewma is not None else None,
+            }
+            for domain, state in self._domains.items()
+        }
+
+
+domain_guard = DomainGuard()
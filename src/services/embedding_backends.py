@@ -0,0 +1,126 @@
+import json
+import os
+from typing import List, Optional
+
+
+from src.interface.embedding_interface import IEmbeddingBackend
+from src.core.settings import settings
+from src.core.logger import logger
+
+
+EMBEDDING_DIM = 384
+
+class TorchEmbeddingBackend(IEmbeddingBackend):
+    """
+    Full-precision PyTorch backend through sentence-transformers.
+    """
+    name = "torch"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self._model = SentenceTransformer(model_name)
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        return self._model.encode(texts, batch_size=len(texts)).tolist()
+
+
+class OnnxEmbeddingBackend(IEmbeddingBackend):
+    """
+    ONNX Runtime backend running a dynamically int8-quantized export of the model.
+    Reproduces the sentence-transformers pipeline (mean pooling and optional L2
+    normalization) without importing torch.
+    """
+    name = "onnx"
+
+    def __init__(self, model_name: str, cache_dir: str):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+        model_path = self._quantized_model(cache_dir)
+        self._session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self._session.get_inputs()}
+
+        max_length = self._read_config("sentence_bert_config.json", {}).get("max_seq_length", 256)
+        modules = self._read_config("modules.json", [])
+        self._normalize = any(m.get("type", "").endswith("Normalize") for m in modules)
+
+        self._tokenizer = Tokenizer.from_file(self._download("tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.enable_padding()
+
+    def _download(self, filename: str) -> str:
+        from huggingface_hub import hf_hub_download
+        return hf_hub_download(repo_id=self.repo_id, filename=filename)
+
+    def _read_config(self, filename: str, default):
+        try:
+            with open(self._download(filename)) as f:
+                return json.load(f)
+        except Exception:
+            return default
+
+    def _quantized_model(self, cache_dir: str) -> str:
+        """
+        Returns the path of the int8 model, quantizing the fp32 ONNX export on first use.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        quantized_path = os.path.join(cache_dir, f"{self.repo_id.replace('/', '__')}-int8.onnx")
+
+        if not os.path.exists(quantized_path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+
+            logger.info(f"Quantizing ONNX export of {self.repo_id} to int8...")
+            tmp_path = f"{quantized_path}.tmp"
+            quantize_dynamic(self._download("onnx/model.onnx"), tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, quantized_path)
+
+        return quantized_path
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        import numpy as np
+
+        encodings = self._tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        feeds = {k: v for k, v in feeds.items() if k in self._input_names}
+
+        token_embeddings = self._session.run(None, feeds)[0]
+        mask = feeds["attention_mask"][..., None].astype(np.float32)
+        vectors = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self._normalize:
+            vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+        return vectors.astype(np.float32).tolist()
+
+
+def create_embedding_backend(backend: Optional[str] = None) -> IEmbeddingBackend:
+    """
+    Builds the embedding backend selected in Settings (EMBEDDING_BACKEND).
+    When EMBEDDING_SERVER_SOCKET is set and no backend is forced, returns a client
+    for the shared embedding server instead of loading the model in-process.
+    """
+    if backend is None and settings.embedding_server_socket:
+        from src.services.embedding_server import RemoteEmbeddingBackend
+        return RemoteEmbeddingBackend(
+            socket_path=settings.embedding_server_socket,
+            dim=EMBEDDING_DIM,
+            timeout=settings.embedding_server_timeout
+        )
+
+    backend = (backend or settings.embedding_backend).lower()
+
+    if backend == "onnx":
+        return OnnxEmbeddingBackend(settings.embedding_model, settings.embedding_onnx_dir)
+    if backend == "torch":
+        return TorchEmbeddingBackend(settings.embedding_model)
+
+    raise ValueError(f"Unknown embedding backend: '{backend}'. Use 'torch' or 'onnx'.")
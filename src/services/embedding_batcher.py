@@ -0,0 +1,135 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Any
+
+
+from src.core.logger import logger
+
+
+EncodeFunction = Callable[[List[str]], List[List[float]]]
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching queue for embedding requests.
+    Collects concurrent requests for a few milliseconds, encodes them in a single
+    batched call on a worker thread and resolves each caller's future.
+    """
+    def __init__(self, encode_fn: EncodeFunction, batch_size: int = 32, max_wait_ms: float = 5.0):
+        self._encode_fn = encode_fn
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-batcher")
+        self._loop = None
+        self._queue = None
+        self._worker = None
+
+        self._batches = 0
+        self._items = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._encode_total = 0.0
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """
+        Starts the batching task on the running event loop if it is not alive yet.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def submit(self, texts: List[str]) -> List[List[float]]:
+        """
+        Enqueues texts for encoding and waits until their batch has been processed.
+        """
+        queue = self._ensure_worker()
+        loop = asyncio.get_running_loop()
+        futures = []
+
+        for text in texts:
+            future = loop.create_future()
+            queue.put_nowait((text, future, time.perf_counter()))
+            futures.append(future)
+
+        return list(await asyncio.gather(*futures))
+
+    async def _run(self):
+        """
+        Worker loop: waits for a first request, then gathers more until the batch
+        is full or the max wait window has elapsed.
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list):
+        """
+        Encodes a collected batch on the worker thread and resolves its futures.
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+
+        for _, _, enqueued_at in batch:
+            wait = started - enqueued_at
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+        self._batches += 1
+        self._items += len(batch)
+
+        texts = [text for text, _, _ in batch]
+        try:
+            vectors = await loop.run_in_executor(self._executor, self._encode_fn, texts)
+        except Exception as e:
+            logger.error(f"Error encoding embedding batch of {len(texts)}: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._encode_total += time.perf_counter() - started
+
+        for (_, future, _), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns batch fill rate and queue wait counters.
+        """
+        batches = self._batches or 1
+        items = self._items or 1
+        return {
+            "batch_size": self.batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / batches, 2),
+            "batch_fill_rate": round(self._items / (batches * self.batch_size), 4),
+            "avg_queue_wait_ms": round(self._wait_total / items * 1000.0, 3),
+            "max_queue_wait_ms": round(self._wait_max * 1000.0, 3),
+            "avg_encode_ms": round(self._encode_total / batches * 1000.0, 3),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+        }
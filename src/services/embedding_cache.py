@@ -0,0 +1,303 @@
+import fcntl
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
+
+import numpy as np
+
+
+from src.core.logger import logger
+
+
+KEY_SIZE = 32
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes text before hashing so trivially different inputs share a cache entry.
+    Only transformations the tokenizer is insensitive to are applied (unicode form, whitespace).
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_key(text: str) -> bytes:
+    """
+    Content address of a text: SHA-256 of its normalized form.
+    """
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+
+class DiskVectorStore:
+    """
+    On-disk, memory-mapped float32 vector store addressed by content hash.
+    Slots are reused in insertion order once the store is full (FIFO eviction).
+    The store is wiped whenever the model name or dimension recorded in its metadata changes.
+    A single process owns the files at a time (exclusive lock); others fall back to memory only.
+    """
+    def __init__(self, path: str, model_name: str, dim: int, capacity: int):
+        self.path = path
+        self.model_name = model_name
+        self.dim = dim
+        self.capacity = capacity
+
+        self._meta_path = os.path.join(path, "meta.json")
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._keys_path = os.path.join(path, "keys.bin")
+
+        self._cursor = 0
+        self._index: Dict[bytes, int] = {}
+        self.evictions = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = open(os.path.join(path, "store.lock"), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            raise RuntimeError(f"{path} is owned by another process")
+        self._open()
+
+    def _open(self):
+        """
+        Maps the store files, resetting them if they were written for another model.
+        """
+        meta = self._read_meta()
+        expected = {"model": self.model_name, "dim": self.dim, "capacity": self.capacity}
+
+        if meta is None or any(meta.get(k) != v for k, v in expected.items()):
+            if meta is not None:
+                logger.info(f"Embedding disk cache invalidated (was {meta.get('model')}, now {self.model_name}).")
+            self._reset()
+            return
+
+        try:
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim))
+            self._keys = np.memmap(self._keys_path, dtype=np.uint8, mode="r+", shape=(self.capacity, KEY_SIZE))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Embedding disk cache is corrupted, rebuilding: {e}")
+            self._reset()
+            return
+        self._cursor = int(meta.get("cursor", 0))
+
+        occupied = np.flatnonzero(self._keys.any(axis=1))
+        self._index = {self._keys[slot].tobytes(): int(slot) for slot in occupied}
+        logger.info(f"Embedding disk cache opened with {len(self._index)} vectors.")
+
+    def _reset(self):
+        for file_path in (self._vectors_path, self._keys_path):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="w+", shape=(self.capacity, self.dim))
+        self._keys = np.memmap(self._keys_path, dtype=np.uint8, mode="w+", shape=(self.capacity, KEY_SIZE))
+        self._cursor = 0
+        self._index = {}
+        self._write_meta()
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self):
+        meta = {"model": self.model_name, "dim": self.dim, "capacity": self.capacity, "cursor": self._cursor}
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: bytes) -> Optional[List[float]]:
+        slot = self._index.get(key)
+        if slot is None:
+            return None
+        return self._vectors[slot].tolist()
+
+    def put(self, key: bytes, vector: List[float]):
+        if key in self._index:
+            return
+
+        slot = self._cursor % self.capacity
+        old_key = self._keys[slot].tobytes()
+        if old_key in self._index and self._index[old_key] == slot:
+            del self._index[old_key]
+            self.evictions += 1
+
+        self._vectors[slot] = vector
+        self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+        self._index[key] = slot
+        self._cursor += 1
+
+    def flush(self):
+        """
+        Persists pending writes and the insertion cursor.
+        """
+        self._vectors.flush()
+        self._keys.flush()
+        self._write_meta()
+
+    def close(self):
+        """
+        Flushes the store and releases its lock for the next owner.
+        """
+        self.flush()
+        self._lock_file.close()
+
+
+class EmbeddingCache:
+    """
+    Two-tier content-addressed embedding cache.
+    Tier 1 is an in-memory LRU; tier 2 is a memory-mapped store that survives restarts.
+    Disk writes are queued to a writer thread, which flushes the store at most every
+    flush_interval seconds, so callers (including the event loop) never wait on disk I/O.
+    """
+    def __init__(self, model_name: str, dim: int, memory_size: int, disk_path: Optional[str], disk_size: int,
+                 flush_interval: float = 5.0):
+        self.model_name = model_name
+        self.memory_size = memory_size
+        self.flush_interval = max(0.0, flush_interval)
+        self._memory: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._disk = None
+        if disk_path and disk_size > 0:
+            try:
+                self._disk = DiskVectorStore(disk_path, model_name, dim, disk_size)
+            except Exception as e:
+                logger.warning(f"Embedding disk cache unavailable, using memory only: {e}")
+
+        self._pending: "queue.Queue[Optional[List[Tuple[bytes, List[float]]]]]" = queue.Queue()
+        self._writer = None
+        if self._disk is not None:
+            self._writer = threading.Thread(target=self._write_loop, name="embedding-cache-writer", daemon=True)
+            self._writer.start()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_flushes = 0
+
+    def _remember(self, key: bytes, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Looks up each text, promoting disk hits into memory. Misses are returned as None.
+        """
+        found = []
+        with self._lock:
+            for text in texts:
+                key = text_key(text)
+                vector = self._memory.get(key)
+
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                elif self._disk is not None and (vector := self._disk.get(key)) is not None:
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+
+                found.append(list(vector) if vector is not None else None)
+        return found
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]):
+        """
+        Stores freshly computed vectors in memory and queues them for the disk tier.
+        """
+        entries = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = text_key(text)
+                self._remember(key, list(vector))
+                entries.append((key, vector))
+
+        if self._writer is not None and entries:
+            self._pending.put(entries)
+
+    def _write_loop(self):
+        """
+        Writer thread: applies queued vectors to the disk store and flushes it once
+        flush_interval has passed since the last flush, or when the cache is closed.
+        """
+        dirty = False
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, last_flush + self.flush_interval - time.monotonic()) if dirty else None
+            try:
+                entries = self._pending.get(timeout=timeout)
+            except queue.Empty:
+                entries = []
+
+            if entries:
+                for key, vector in entries:
+                    with self._lock:
+                        self._disk.put(key, vector)
+                dirty = True
+
+            closing = entries is None
+            if dirty and (closing or time.monotonic() - last_flush >= self.flush_interval):
+                try:
+                    self._disk.flush()
+                    self.disk_flushes += 1
+                except Exception as e:
+                    logger.warning(f"Failed to flush embedding disk cache: {e}")
+                dirty = False
+                last_flush = time.monotonic()
+
+            if closing:
+                return
+
+    def close(self, timeout: float = 10.0):
+        """
+        Writes every queued vector, stops the writer thread and closes the disk store.
+        The cache keeps working from memory afterwards. If the writer is still busy after
+        `timeout`, the store is left open (and locked) for it to finish with.
+        """
+        if self._writer is None:
+            return
+        self._pending.put(None)
+        self._writer.join(timeout)
+        writer, self._writer = self._writer, None
+        if writer.is_alive():
+            logger.warning(f"Embedding disk cache writer still busy after {timeout}s; leaving the store open.")
+            return
+
+        with self._lock:
+            disk, self._disk = self._disk, None
+        try:
+            disk.close()
+        except Exception as e:
+            logger.warning(f"Failed to close embedding disk cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "model": self.model_name,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_evictions": self.memory_evictions,
+            "disk_entries": len(self._disk) if self._disk is not None else 0,
+            "disk_evictions": self._disk.evictions if self._disk is not None else 0,
+            "disk_pending": self._pending.qsize(),
+            "disk_flushes": self.disk_flushes,
+        }
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+
+from src.interface.embedding_interface import IEmbeddingBackend
+from src.services.embedding_batcher import EmbeddingBatcher
+from src.core.settings import settings
+from src.core.logger import logger
+
+
+FRAME_HEADER = struct.Struct("!I")
+STATUS_OK = 0
+STATUS_ERROR = 1
+RETRY_AFTER_SECONDS = 30.0
+
+
+class EmbeddingServerError(Exception):
+    """
+    The embedding server answered, but could not encode the request.
+    """
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("Embedding server closed the connection")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+class EmbeddingServer:
+    """
+    Standalone process that owns the embedding model and serves batched encode
+    requests to web workers over a Unix socket.
+
+    Wire format: every frame is a 4-byte big-endian length followed by the payload.
+    Requests carry a JSON object {"texts": [...]}; responses start with a status byte,
+    followed by little-endian float32 vectors (OK) or a UTF-8 error message.
+    """
+    def __init__(self, backend: IEmbeddingBackend, socket_path: str):
+        self.backend = backend
+        self.socket_path = socket_path
+        self.batcher = EmbeddingBatcher(
+            encode_fn=backend.encode,
+            batch_size=settings.embedding_batch_size,
+            max_wait_ms=settings.embedding_max_wait_ms
+        )
+
+    async def serve(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        logger.info(f"Embedding server listening on {self.socket_path} (backend: {self.backend.name}).")
+
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(FRAME_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+
+                payload = await reader.readexactly(FRAME_HEADER.unpack(header)[0])
+                try:
+                    texts = json.loads(payload)["texts"]
+                    vectors = await self.batcher.submit(texts)
+                    response = bytes([STATUS_OK]) + np.asarray(vectors, dtype="<f4").tobytes()
+                except Exception as e:
+                    logger.error(f"Embedding server failed to encode request: {e}")
+                    response = bytes([STATUS_ERROR]) + str(e).encode("utf-8")
+
+                writer.write(FRAME_HEADER.pack(len(response)) + response)
+                await writer.drain()
+        except Exception as e:
+            logger.warning(f"Embedding server connection error: {e}")
+        finally:
+            writer.close()
+
+
+class RemoteEmbeddingBackend(IEmbeddingBackend):
+    """
+    Thin client for EmbeddingServer. Falls back to an in-process backend when the
+    server is unavailable or fails to encode, retrying the server after a short cool-down.
+    """
+    name = "remote"
+
+    def __init__(self, socket_path: str, dim: int, timeout: float = 10.0):
+        self.socket_path = socket_path
+        self.dim = dim
+        self.timeout = timeout
+
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self._retry_at = 0.0
+        self._fallback: Optional[IEmbeddingBackend] = None
+        self.remote_calls = 0
+        self.fallback_calls = 0
+
+    def _connect(self) -> socket.socket:
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._sock = sock
+        return self._sock
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+    def _remote_encode(self, texts: List[str]) -> List[List[float]]:
+        sock = self._connect()
+        payload = json.dumps({"texts": texts}).encode("utf-8")
+        sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+
+        size = FRAME_HEADER.unpack(_recv_exact(sock, FRAME_HEADER.size))[0]
+        response = _recv_exact(sock, size)
+
+        if response[0] != STATUS_OK:
+            raise EmbeddingServerError(response[1:].decode("utf-8", errors="replace"))
+        return np.frombuffer(response[1:], dtype="<f4").reshape(len(texts), self.dim).tolist()
+
+    def _local_encode(self, texts: List[str]) -> List[List[float]]:
+        if self._fallback is None:
+            from src.services.embedding_backends import create_embedding_backend
+
+            logger.warning("Loading in-process embedding backend as fallback for the embedding server.")
+            self._fallback = create_embedding_backend(settings.embedding_backend)
+        self.fallback_calls += 1
+        return self._fallback.encode(texts)
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            if time.monotonic() >= self._retry_at:
+                try:
+                    vectors = self._remote_encode(texts)
+                    self.remote_calls += 1
+                    return vectors
+                except (OSError, ConnectionError, ValueError, EmbeddingServerError) as e:
+                    logger.warning(f"Embedding server unavailable ({e}); encoding in-process.")
+                    self._close()
+                    self._retry_at = time.monotonic() + RETRY_AFTER_SECONDS
+
+            return self._local_encode(texts)
+
+
+async def main():
+    from src.services.embedding_backends import create_embedding_backend
+
+    if not settings.embedding_server_socket:
+        raise ValueError("Environment variable 'EMBEDDING_SERVER_SOCKET' is not set.")
+
+    logger.info(f"Loading Local Embedding Model ({settings.embedding_model}, backend: {settings.embedding_backend})...")
+    backend = create_embedding_backend(settings.embedding_backend)
+    logger.info("Embedding Model loaded successfully.")
+
+    await EmbeddingServer(backend, settings.embedding_server_socket).serve()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,33 +1,179 @@
-from typing import List
-from sentence_transformers import SentenceTransformer
+import asyncio
+import threading
+from typing import List, Dict, Any, Tuple
 
 
 from src.core.logger import logger
+from src.core.settings import settings
+from src.services.embedding_batcher import EmbeddingBatcher
+from src.services.embedding_cache import EmbeddingCache
+from src.services.embedding_backends import create_embedding_backend, EMBEDDING_DIM
+
+
+def is_fallback_embedding(vector: List[float]) -> bool:
+    """
+    Whether a vector is the all-zero placeholder returned when the model could not encode.
+    """
+    return not any(vector)
 
 
 class EmbeddingService:
+    """
+    Process-wide embedding facade. The backend, cache and batcher are loaded lazily
+    on first use (or explicitly through load() during startup warmup).
+    """
     _instance = None
-    _model = None
+    _backend = None
+    _batcher = None
+    _cache = None
+    _load_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(EmbeddingService, cls).__new__(cls)
-            logger.info("Loading Local Embedding Model (all-MiniLM-L6-v2)...")
-            cls._model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("Embedding Model loaded successfully.")
         return cls._instance
 
+    @property
+    def is_loaded(self) -> bool:
+        return self._backend is not None
+
+    def load(self):
+        """
+        Loads the embedding backend, cache and batcher. Safe to call repeatedly and from any thread.
+        """
+        if self.is_loaded:
+            return
+
+        cls = type(self)
+        with cls._load_lock:
+            if self.is_loaded:
+                return
+
+            logger.info(f"Loading Local Embedding Model ({settings.embedding_model}, backend: {settings.embedding_backend})...")
+            cls._cache = EmbeddingCache(
+                model_name=settings.embedding_model_id,
+                dim=EMBEDDING_DIM,
+                memory_size=settings.embedding_cache_memory_size,
+                disk_path=settings.embedding_cache_dir,
+                disk_size=settings.embedding_cache_disk_size,
+                flush_interval=settings.embedding_cache_flush_seconds
+            )
+            cls._batcher = EmbeddingBatcher(
+                encode_fn=self._encode_batch,
+                batch_size=settings.embedding_batch_size,
+                max_wait_ms=settings.embedding_max_wait_ms
+            )
+            cls._backend = create_embedding_backend()
+            logger.info("Embedding Model loaded successfully.")
+
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Encodes a batch of texts in a single model call. Runs on the batcher's worker thread.
+        """
+        return self._backend.encode(texts)
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[List[float]], List[int]]:
+        """
+        Resolves empty texts and cache hits. Returns the partially filled vectors
+        and the indices that still need encoding.
+        """
+        vectors = [[0.0] * EMBEDDING_DIM for _ in texts]
+        candidates = [i for i, text in enumerate(texts) if text]
+        cached = self._cache.get_many([texts[i] for i in candidates])
+
+        pending = []
+        for i, vector in zip(candidates, cached):
+            if vector is None:
+                pending.append(i)
+            else:
+                vectors[i] = vector
+        return vectors, pending
+
+    def _store(self, texts: List[str], vectors: List[List[float]], pending: List[int], encoded: List[List[float]]):
+        for i, vector in zip(pending, encoded):
+            vectors[i] = vector
+        self._cache.put_many([texts[i] for i in pending], encoded)
+
     def get_embedding(self, text: str) -> List[float]:
 
-        if not text:
-            return [0.0] * 384
-            
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Synchronously encodes several texts in one batched model call, serving cached vectors first.
+        """
+        try:
+            self.load()
+        except Exception as e:
+            logger.error(f"Error loading embedding model: {e}")
+            return [[0.0] * EMBEDDING_DIM for _ in texts]
+
+        vectors, pending = self._lookup(texts)
+        if not pending:
+            return vectors
+
         try:
-            vector = self._model.encode(text).tolist()
-            return vector
+            encoded = self._encode_batch([texts[i] for i in pending])
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
-            return [0.0] * 384
+            return vectors
+
+        self._store(texts, vectors, pending, encoded)
+        return vectors
+
+    async def aget_embedding(self, text: str) -> List[float]:
+        """
+        Async variant of get_embedding. The encode runs off the event loop,
+        batched together with any concurrent requests.
+        """
+        return (await self.aget_embeddings([text]))[0]
+
+    async def aget_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Async batch encode through the micro-batching queue, serving cached vectors first.
+        """
+        if not self.is_loaded:
+            try:
+                await asyncio.to_thread(self.load)
+            except Exception as e:
+                logger.error(f"Error loading embedding model: {e}")
+                return [[0.0] * EMBEDDING_DIM for _ in texts]
+
+        vectors, pending = self._lookup(texts)
+        if not pending:
+            return vectors
+
+        try:
+            encoded = await self._batcher.submit([texts[i] for i in pending])
+        except Exception as e:
+            logger.error(f"Error generating embeddings: {e}")
+            return vectors
+
+        self._store(texts, vectors, pending, encoded)
+        return vectors
+
+    def close(self):
+        """
+        Flushes the embedding disk cache. Called on shutdown.
+        """
+        if self._cache is not None:
+            self._cache.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns micro-batching counters (batch fill rate, queue wait time) and cache stats.
+        """
+        if not self.is_loaded:
+            return {"loaded": False}
+
+        return {
+            "loaded": True,
+            "backend": self._backend.name,
+            "remote": getattr(self._backend, "remote_calls", None),
+            "remote_fallback": getattr(self._backend, "fallback_calls", None),
+            "batcher": self._batcher.stats(),
+            "cache": self._cache.stats()
+        }
 
 
 embedding_service = EmbeddingService()
\ No newline at end of file
@@ -0,0 +1,194 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, AsyncIterator
+from urllib.parse import urlparse
+
+import httpx
+
+
+from src.core.settings import settings
+from src.core.logger import logger
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+BROWSER_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml"
+}
+
+
+class DomainCounters:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.waits = 0
+        self.wait_total = 0.0
+
+
+class FetchService:
+    """
+    Application-scoped HTTP layer shared by tools, the watchdog and the Telegram client.
+    Keeps a single pooled httpx client (keep-alive, TLS session reuse, optional HTTP/2)
+    and caps concurrent requests per domain.
+    """
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._counters: Dict[str, DomainCounters] = {}
+        self._domain_limits: Optional[Dict[str, int]] = None
+
+    def _http2_enabled(self) -> bool:
+        if not settings.http2:
+            return False
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1.")
+            return False
+
+    async def start(self):
+        """
+        Opens the shared client. Called from the application lifespan.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self._http2_enabled(),
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive
+                ),
+                timeout=httpx.Timeout(15.0)
+            )
+            logger.info("Shared HTTP client started.")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("FetchService is not started.")
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        try:
+            return urlparse(url).netloc.lower()
+        except Exception:
+            return ""
+
+    def _limit_for(self, domain: str) -> int:
+        """
+        Per-domain concurrency: HTTP_DOMAIN_LIMITS overrides ("amazon.com.br:2,...") or the default.
+        """
+        if self._domain_limits is None:
+            self._domain_limits = {}
+            for entry in settings.http_domain_limits.split(","):
+                name, _, limit = entry.strip().partition(":")
+                if name and limit.isdigit():
+                    self._domain_limits[name.lower()] = int(limit)
+
+        for name, limit in self._domain_limits.items():
+            if domain == name or domain.endswith(f".{name}"):
+                return limit
+        return settings.http_per_domain_limit
+
+    @asynccontextmanager
+    async def _domain_slot(self, url: str) -> AsyncIterator[DomainCounters]:
+        domain = self.domain_of(url)
+        slot = self._slots.get(domain)
+        if slot is None:
+            slot = self._slots[domain] = asyncio.Semaphore(self._limit_for(domain))
+        counters = self._counters.setdefault(domain, DomainCounters())
+
+        if slot.locked():
+            counters.waits += 1
+        queued_at = time.perf_counter()
+
+        async with slot:
+            counters.wait_total += time.perf_counter() - queued_at
+            counters.requests += 1
+            counters.in_flight += 1
+            try:
+                yield counters
+            except Exception:
+                counters.errors += 1
+                raise
+            finally:
+                counters.in_flight -= 1
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if self._client is None:
+            await self.start()
+        async with self._domain_slot(url):
+            return await self.client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def get_page(self, url: str, timeout: float = 15.0, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """
+        Fetches a product page with browser headers, following redirects.
+        """
+        return await self.get(url, headers={**BROWSER_HEADERS, **(headers or {})}, follow_redirects=True, timeout=timeout)
+
+    @asynccontextmanager
+    async def stream_page(self, url: str, timeout: float = 15.0, headers: Optional[Dict[str, str]] = None) -> AsyncIterator[httpx.Response]:
+        """
+        Like get_page, but the body is not read: the caller iterates it and may stop early.
+        The domain slot is held until the response is closed.
+        """
+        if self._client is None:
+            await self.start()
+        async with self._domain_slot(url):
+            async with self.client.stream(
+                "GET", url,
+                headers={**BROWSER_HEADERS, **(headers or {})},
+                follow_redirects=True,
+                timeout=timeout
+            ) as response:
+                yield response
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Connection-pool and per-domain counters.
+        """
+        pool = {}
+        try:
+            connections = self._client._transport._pool.connections if self._client else []
+            pool = {
+                "connections": len(connections),
+                "idle": sum(1 for c in connections if c.is_idle()),
+                "http2": sum(1 for c in connections if "HTTP/2" in c.info()),
+            }
+        except Exception:
+            pass
+
+        return {
+            "started": self._client is not None,
+            "pool": pool,
+            "domains": {
+                domain: {
+                    "limit": self._limit_for(domain),
+                    "requests": c.requests,
+                    "errors": c.errors,
+                    "in_flight": c.in_flight,
+                    "waits": c.waits,
+                    "avg_wait_ms": round(c.wait_total / c.requests * 1000.0, 3) if c.requests else 0.0,
+                }
+                for domain, c in self._counters.items()
+            }
+        }
+
+
+fetch_service = FetchService()
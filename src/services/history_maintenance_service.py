@@ -0,0 +1,64 @@
+import time
+from typing import Dict, Any, Optional
+
+
+from src.repository.history_repository import PriceHistoryRepository
+from src.core.settings import settings
+from src.core.logger import logger
+
+
+class HistoryMaintenanceService:
+    """
+    Periodic upkeep of price_history: keeps PRICE_HISTORY_PARTITIONS_AHEAD monthly partitions
+    ready and rolls raw data older than PRICE_HISTORY_RAW_RETENTION_DAYS up into daily
+    min/avg/max rows before dropping its partitions. It also refreshes 30-day minimums that
+    aged out while a product's price stayed unchanged. Creating a partition moves the rows of
+    its month out of the default partition; rows left there (outside every partition) are
+    counted and logged, since retention never drops them. Safe to run from several processes,
+    the database functions serialize on an advisory lock.
+    """
+    def __init__(self, repository: PriceHistoryRepository = None):
+        self.repository = repository or PriceHistoryRepository()
+        self.runs = 0
+        self.partitions_created = 0
+        self.partitions_dropped = 0
+        self.lowest_prices_refreshed = 0
+        self.default_rows = 0
+        self.last_run_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    async def run(self):
+        try:
+            created = await self.repository.ensure_partitions(settings.price_history_partitions_ahead)
+            dropped = await self.repository.apply_retention(settings.price_history_raw_retention_days)
+            refreshed = await self.repository.refresh_stale_lowest_prices()
+            self.default_rows = await self.repository.count_default_rows()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Price history maintenance failed: {e}")
+            return
+
+        self.runs += 1
+        self.partitions_created += created
+        self.partitions_dropped += dropped
+        self.lowest_prices_refreshed += refreshed
+        self.last_run_at = time.time()
+        self.last_error = None
+        if created or dropped:
+            logger.info(f"🗄️ Price history maintenance: {created} partition(s) created, {dropped} rolled up and dropped.")
+        if self.default_rows:
+            logger.warning(f"Price history: {self.default_rows} row(s) in price_history_default, outside every monthly partition.")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "partitions_created": self.partitions_created,
+            "partitions_dropped": self.partitions_dropped,
+            "lowest_prices_refreshed": self.lowest_prices_refreshed,
+            "default_rows": self.default_rows,
+            "last_run_at": self.last_run_at,
+            "last_error": self.last_error,
+        }
+
+
+history_maintenance = HistoryMaintenanceService()
@@ -0,0 +1,121 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+from src.domain.product import PriceExtractionResult
+
+
+TRACKING_PARAMS = {"gclid", "fbclid", "srsltid", "msclkid", "dclid", "yclid", "_ga"}
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalizes a product URL for cache lookups: lowercase scheme and host, no fragment,
+    no tracking parameters (utm_*, gclid, ...), remaining query parameters sorted.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except Exception:
+        return url
+
+    host = (parts.hostname or "").lower()
+    if parts.port and not (parts.scheme == "https" and parts.port == 443) and not (parts.scheme == "http" and parts.port == 80):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((parts.scheme.lower(), host, parts.path or "/", urlencode(query), ""))
+
+
+class CachedPage:
+    def __init__(self,
+                 result: PriceExtractionResult,
+                 title: str = "",
+                 etag: Optional[str] = None,
+                 last_modified: Optional[str] = None):
+        self.result = result
+        self.title = title
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = time.monotonic()
+
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+    def validators(self) -> Dict[str, str]:
+        """
+        Conditional request headers for revalidating this page.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    Size-bounded LRU of extraction results keyed by canonical URL.
+    Entries younger than the TTL are served as-is; older ones keep their ETag/Last-Modified
+    validators so the next fetch can be a conditional request.
+    """
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, CachedPage]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def lookup(self, url: str) -> Optional[CachedPage]:
+        """
+        Returns the cached entry (fresh or stale) and marks it as recently used.
+        """
+        key = canonical_url(url)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def is_fresh(self, entry: CachedPage) -> bool:
+        return entry.age() < self.ttl_seconds
+
+    def store(self, url: str, entry: CachedPage):
+        key = canonical_url(url)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def refresh(self, entry: CachedPage):
+        """
+        Restarts the TTL of an entry the origin confirmed unchanged (304).
+        """
+        entry.stored_at = time.monotonic()
+        self.not_modified += 1
+
+    def discard(self, url: str):
+        self._entries.pop(canonical_url(url), None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.revalidations
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.not_modified) / lookups, 4) if lookups else 0.0,
+        }
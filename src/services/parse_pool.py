@@ -0,0 +1,160 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, Tuple, List
+
+
+from src.domain.product import PriceExtractionResult
+from src.core.settings import settings
+from src.core.logger import logger
+
+
+_worker_engine = None
+
+
+class PageParseError(Exception):
+    """
+    Raised when a page kills the pool worker parsing it, on the first try and on the retry.
+    """
+
+
+def extract_in_worker(payload: bytes, encoding: Optional[str], url: str, order: Optional[List[str]] = None) -> Tuple[Dict[str, Any], float]:
+    """
+    Entry point executed inside a pool process: decodes the page and runs the extraction.
+    Returns the serialized result and the parse time in seconds.
+    """
+    global _worker_engine
+    if _worker_engine is None:
+        from src.services.scrapper_service import ScraperEngine
+        _worker_engine = ScraperEngine()
+
+    started = time.perf_counter()
+    html = payload.decode(encoding or "utf-8", errors="replace")
+    result = _worker_engine.extract_price(html, url, order=order)
+    return result.model_dump(), time.perf_counter() - started
+
+
+class ParsePool:
+    """
+    Process pool that keeps HTML parsing off the event loop.
+    Queue depth is bounded: once max_pending pages are in flight, callers wait (backpressure).
+    A page that crashes its worker is retried once on a fresh pool and then fails with
+    PageParseError; it is never parsed inside the calling process.
+    Sizes default to SCRAPER_POOL_WORKERS / SCRAPER_POOL_MAX_PENDING, read on first use.
+    """
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self._workers = workers
+        self._max_pending = max_pending
+        self.workers = 0
+        self.max_pending = 0
+
+        self.tasks = 0
+        self.failures = 0
+        self.restarts = 0
+        self.saturated = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.parse_total = 0.0
+        self.parse_max = 0.0
+        self.wait_total = 0.0
+
+    def _ensure_started(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self.workers = max(0, settings.scraper_pool_workers if self._workers is None else self._workers)
+            self.max_pending = max(1, settings.scraper_pool_max_pending if self._max_pending is None else self._max_pending)
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._slots
+
+    async def extract(self, payload: bytes, encoding: Optional[str], url: str, order: Optional[List[str]] = None) -> PriceExtractionResult:
+        """
+        Parses a page on the pool, waiting for a free slot when the queue is full.
+        """
+        slots = self._ensure_started()
+        if slots.locked():
+            self.saturated += 1
+
+        queued_at = time.perf_counter()
+        async with slots:
+            self.wait_total += time.perf_counter() - queued_at
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.tasks += 1
+            try:
+                data, parse_time = await self._submit(payload, encoding, url, order)
+            except Exception:
+                self.failures += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+        self.parse_total += parse_time
+        self.parse_max = max(self.parse_max, parse_time)
+        return PriceExtractionResult(**data)
+
+    async def _submit(self, payload: bytes, encoding: Optional[str], url: str, order: Optional[List[str]]) -> Tuple[Dict[str, Any], float]:
+        loop = asyncio.get_running_loop()
+
+        executor = self._executor
+        if executor is None:
+            return await asyncio.to_thread(extract_in_worker, payload, encoding, url, order)
+
+        for _ in range(2):
+            try:
+                return await loop.run_in_executor(executor, extract_in_worker, payload, encoding, url, order)
+            except BrokenProcessPool:
+                self._replace(executor)
+                executor = self._executor
+
+        raise PageParseError(f"Parsing {url} crashed the parse pool twice")
+
+    def _replace(self, executor: ProcessPoolExecutor):
+        """
+        Shuts down a broken executor and starts a new one. Every task in flight on the broken
+        pool ends up here; only the first one replaces it, so a pool already recreated by a
+        concurrent failure is kept.
+        """
+        if self._executor is not executor:
+            return
+        logger.error("Parse pool broke (worker died); restarting it.")
+        self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.restarts += 1
+        self._ensure_started()
+
+    def stats(self) -> Dict[str, Any]:
+        tasks = self.tasks or 1
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "saturation": round(self.in_flight / self.max_pending, 4) if self.max_pending else 0.0,
+            "saturated_waits": self.saturated,
+            "tasks": self.tasks,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "avg_parse_ms": round(self.parse_total / tasks * 1000.0, 3),
+            "max_parse_ms": round(self.parse_max * 1000.0, 3),
+            "avg_queue_wait_ms": round(self.wait_total / tasks * 1000.0, 3),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+parse_pool = ParsePool()
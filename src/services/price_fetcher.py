@@ -0,0 +1,160 @@
+from typing import Dict, Any, Optional
+
+import httpx
+
+
+from src.domain.product import PriceExtractionResult
+from src.services.fetch_service import FetchService, fetch_service as shared_fetch_service
+from src.services.page_cache import PageCache, CachedPage
+from src.services.domain_guard import DomainGuard, domain_guard
+from src.services.scrapper_service import ScraperEngine
+from src.utils.html_prescan import extract_title
+from src.core.settings import settings
+from src.core.logger import logger
+
+
+class PriceObservation:
+    """
+    Outcome of fetching a product page: HTTP status, extraction result and page title.
+    `result` is None when the page could not be retrieved.
+    """
+    def __init__(self,
+                 url: str,
+                 status_code: int,
+                 result: Optional[PriceExtractionResult] = None,
+                 title: str = "",
+                 from_cache: bool = False):
+        self.url = url
+        self.status_code = status_code
+        self.result = result
+        self.title = title
+        self.from_cache = from_cache
+
+    @property
+    def ok(self) -> bool:
+        return self.result is not None
+
+
+class PriceFetcher:
+    """
+    Fetch-and-extract entry point shared by the search tool, URL checks and the watchdog.
+    Fresh pages are served from the PageCache; stale ones are revalidated with a conditional
+    GET, and a 304 reuses the cached extraction result without downloading or parsing.
+    Pages are streamed: the download stops as soon as the result is determined
+    (SCRAPER_EARLY_STOP) or the SCRAPER_MAX_PAGE_BYTES cap is reached.
+    Network requests go through the DomainGuard, which may raise CircuitOpenError.
+    """
+    def __init__(self, fetch_service: FetchService = None, engine: ScraperEngine = None, cache: PageCache = None, guard: DomainGuard = None):
+        self.fetch_service = fetch_service or shared_fetch_service
+        self.guard = guard or domain_guard
+        self.engine = engine or ScraperEngine()
+        self._cache = cache
+
+        self.pages = 0
+        self.early_stops = 0
+        self.truncated = 0
+        self.bytes_read = 0
+
+    @property
+    def cache(self) -> PageCache:
+        """
+        Created on first use, so importing this module does not read the settings.
+        """
+        if self._cache is None:
+            self._cache = PageCache(
+                ttl_seconds=settings.page_cache_ttl_seconds,
+                max_entries=settings.page_cache_max_entries
+            )
+        return self._cache
+
+    def is_demoted(self, url: str) -> bool:
+        return self.engine.is_demoted(url)
+
+    async def fetch(self, url: str, timeout: float = 15.0, max_age: Optional[float] = None) -> PriceObservation:
+        """
+        Returns the price observation for a URL. `max_age` overrides the cache TTL
+        (0 forces a revalidation). Demoted domains are not fetched at all.
+        """
+        if self.is_demoted(url):
+            return PriceObservation(url, 200, PriceExtractionResult())
+
+        entry = self.cache.lookup(url)
+        ttl = self.cache.ttl_seconds if max_age is None else max_age
+
+        if entry is not None and entry.age() < ttl:
+            self.cache.hits += 1
+            return PriceObservation(url, 200, entry.result, entry.title, from_cache=True)
+
+        if entry is not None:
+            self.cache.revalidations += 1
+            headers = entry.validators()
+        else:
+            self.cache.misses += 1
+            headers = {}
+
+        async with self.guard.request(url) as call:
+            async with self.fetch_service.stream_page(url, timeout=timeout, headers=headers) as resp:
+                call.observe(resp.status_code)
+
+                if resp.status_code == 304 and entry is not None:
+                    self.cache.refresh(entry)
+                    return PriceObservation(url, 200, entry.result, entry.title, from_cache=True)
+
+                if resp.status_code != 200:
+                    if resp.status_code in (404, 410):
+                        self.cache.discard(url)
+                    return PriceObservation(url, resp.status_code)
+
+                content = await self._read_page(resp, url)
+
+        result = await self.engine.aextract_price(content, url, encoding=resp.encoding)
+        title = ""
+        if result.is_available and not result.has_price:
+            title = extract_title(content.decode(resp.encoding or "utf-8", errors="replace"))
+
+        self.cache.store(url, CachedPage(
+            result=result,
+            title=title,
+            etag=resp.headers.get("etag"),
+            last_modified=resp.headers.get("last-modified")
+        ))
+        logger.debug(f"Fetched and cached {url} ({result.source})")
+        return PriceObservation(url, 200, result, title)
+
+    async def _read_page(self, resp: httpx.Response, url: str) -> bytes:
+        """
+        Reads the body until the early-stop scanner is satisfied or the byte cap is hit.
+        """
+        scanner = self.engine.stream_scanner(url, resp.encoding) if settings.scraper_early_stop else None
+        limit = settings.scraper_max_page_bytes
+        body = bytearray()
+
+        async for chunk in resp.aiter_bytes():
+            body += chunk
+            if scanner is not None and scanner.feed(chunk):
+                self.early_stops += 1
+                break
+            if len(body) >= limit:
+                del body[limit:]
+                self.truncated += 1
+                logger.warning(f"Page exceeded {limit} bytes, truncated: {url}")
+                break
+
+        self.pages += 1
+        self.bytes_read += len(body)
+        return bytes(body)
+
+    def stats(self) -> Dict[str, Any]:
+        pages = self.pages or 1
+        return {
+            "cache": self.cache.stats(),
+            "stream": {
+                "pages": self.pages,
+                "early_stops": self.early_stops,
+                "truncated": self.truncated,
+                "avg_kb_read": round(self.bytes_read / pages / 1024.0, 1),
+            }
+        }
+
+
+price_fetcher = PriceFetcher()
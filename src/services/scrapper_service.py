@@ -1,5 +1,6 @@
-from typing import List
+from typing import List, Optional, Union
 from bs4 import BeautifulSoup
+import codecs
 
 
 from src.interface.scrapping_interface import (
@@ -10,32 +11,148 @@ from src.interface.scrapping_interface import (
     OpenGraphStrategy
 )
 from src.domain.product import PriceExtractionResult
+from src.services.parse_pool import parse_pool
+from src.services.strategy_registry import StrategyRegistry
+from src.utils.html_prescan import IncrementalPrescan
+from src.core.logger import logger
+
+
+try:
+    import lxml  # noqa: F401
+    DOM_PARSER = "lxml"
+except ImportError:
+    DOM_PARSER = "html.parser"
+
+
+def default_strategies() -> List[IScrapingStrategy]:
+    return [
+        JsonLdStrategy(),
+        AmazonStrategy(),
+        MercadoLivreStrategy(),
+        OpenGraphStrategy()
+    ]
+
+
+strategy_registry = StrategyRegistry(default_strategies())
+
+
+class EarlyStopScanner:
+    """
+    Watches a page while it downloads and reports when reading further cannot change the
+    extraction: a JSON-LD block with a priced offer, or the first OpenGraph price tag.
+    Only the first strategy in the domain's order may stop the download, and only when it
+    is DOM-free: a match by a later strategy proves nothing while a higher-priority one
+    can still match further down the page (an OpenGraph tag in <head> ahead of a JSON-LD
+    offer in <body>), so those pages are read in full.
+    """
+    def __init__(self, strategies: List[IScrapingStrategy], encoding: Optional[str]):
+        self._triggers = {}
+        if strategies and not strategies[0].needs_dom:
+            self._triggers[strategies[0].name] = strategies[0]
+
+        self._prescan = IncrementalPrescan()
+        try:
+            self._decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        except LookupError:
+            self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._og_seen = False
+        self.stopped_by: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self._triggers)
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Scans a downloaded chunk. Returns True once the result is determined.
+        """
+        if not self.active or self.stopped_by:
+            return bool(self.stopped_by)
+
+        for kind, attrs, raw in self._prescan.feed(self._decoder.decode(chunk)):
+            if kind == "script":
+                strategy = self._triggers.get("JSON_LD")
+                if strategy is None or attrs.get("type") != "application/ld+json":
+                    continue
+            else:
+                strategy = self._triggers.get("OPEN_GRAPH")
+                if strategy is None or self._og_seen or attrs.get("property") != "product:price:amount":
+                    continue
+                self._og_seen = True
+
+            if strategy.extract_fast(raw).has_price:
+                self.stopped_by = strategy.name
+                return True
+        return False
 
 
 class ScraperEngine:
     """
     Orchestrates the price extraction process by trying multiple scraping strategies.
     Supports JSON-LD, Amazon, Mercado Livre, and OpenGraph.
+    Strategy order per domain comes from the shared StrategyRegistry.
     """
     def __init__(self):
-        self.strategies: List[IScrapingStrategy] = [
-            JsonLdStrategy(),
-            AmazonStrategy(),
-            MercadoLivreStrategy(),
-            OpenGraphStrategy()
-        ]
+        self.strategies: List[IScrapingStrategy] = default_strategies()
+        self._by_name = {strategy.name: strategy for strategy in self.strategies}
+        self.registry = strategy_registry
 
-    def extract_price(self, html: str, url: str) -> PriceExtractionResult:
+    def extract_price(self, html: str, url: str, order: Optional[List[str]] = None) -> PriceExtractionResult:
         """
         Iterates through registered strategies to extract price data from HTML.
+        When `order` is given (strategy names), only those strategies run, in that order.
+        Strategies first try their DOM-free fast path (JSON-LD blocks, OpenGraph meta tags);
+        the document is only parsed when a DOM strategy actually has to run.
         """
-        soup = BeautifulSoup(html, 'html.parser')
+        if order is None:
+            strategies = [s for s in self.strategies if s.can_handle(url)]
+        else:
+            strategies = [self._by_name[name] for name in order if name in self._by_name]
+
+        soup = None
         
-        for strategy in self.strategies:
-            if strategy.can_handle(url):
+        for strategy in strategies:
+            result = strategy.extract_fast(html)
+
+            if result is None:
+                if soup is None:
+                    soup = BeautifulSoup(html, DOM_PARSER)
                 result = strategy.extract(soup)
-                
-                if result.has_price:
-                    return result
+            
+            if result.has_price:
+                return result
         
-        return PriceExtractionResult()
\ No newline at end of file
+        return PriceExtractionResult()
+
+    def stream_scanner(self, url: str, encoding: Optional[str]) -> EarlyStopScanner:
+        """
+        Early-stop scanner for a page download, following the domain's learned strategy order.
+        """
+        order = self.registry.ordered_for(self.registry.domain_of(url))
+        return EarlyStopScanner([self._by_name[name] for name in order if name in self._by_name], encoding)
+
+    def is_demoted(self, url: str) -> bool:
+        """
+        Whether the URL's domain is currently skipped after repeated extraction failures.
+        """
+        return self.registry.is_demoted(self.registry.domain_of(url))
+
+    async def aextract_price(self, content: Union[bytes, str], url: str, encoding: Optional[str] = None) -> PriceExtractionResult:
+        """
+        Async variant of extract_price. Parsing runs on the shared process pool so large
+        pages never block the event loop; raw bytes go in and the result comes back.
+        Strategies are tried in the domain's learned order, and the outcome is fed back
+        to the registry. Demoted domains are skipped.
+        """
+        domain = self.registry.domain_of(url)
+        if self.registry.is_demoted(domain):
+            logger.info(f"Skipping extraction for demoted domain: {domain}")
+            return PriceExtractionResult()
+
+        if isinstance(content, str):
+            content, encoding = content.encode("utf-8"), "utf-8"
+
+        order = self.registry.ordered_for(domain)
+        result = await parse_pool.extract(content, encoding, url, order)
+        self.registry.record(domain, order, result)
+        return result
\ No newline at end of file
@@ -0,0 +1,179 @@
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet
+from urllib.parse import urlparse
+
+
+from src.services.embedding_cache import normalize_text
+from src.core.settings import settings
+
+
+class CachedSearch:
+    def __init__(self,
+                 results: List[Dict[str, Any]],
+                 version: int,
+                 domains: FrozenSet[str],
+                 cost: float,
+                 price_scope: Optional[FrozenSet[str]] = None,
+                 price_filtered: bool = False):
+        self.results = results
+        self.version = version
+        self.domains = domains
+        self.price_scope = price_scope
+        self.price_filtered = price_filtered
+        self.cost = cost
+        self.stored_at = time.monotonic()
+
+
+class SearchResultCache:
+    """
+    Size-bounded LRU of local catalog search results keyed by normalized query, limit and
+    search config.
+    Writes invalidate through version counters instead of scanning entries: every write takes
+    the next version and stamps either the whole catalog (new or re-embedded products, which
+    can change any ranking) or only the product's domain (price-only observations). An entry
+    is valid while neither the catalog nor any domain in its results was stamped after the
+    version it was computed at. A price-only write can also move a product into a search
+    filtered on price, so price-filtered entries are additionally invalidated by any domain
+    stamp within their domain filter (by every domain stamp when unfiltered by domain).
+    Entries also expire after the TTL, which bounds staleness
+    from writes made by other processes. Limits left as None are read from the settings on
+    first use.
+    """
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int, str], CachedSearch]" = OrderedDict()
+
+        self.version = 0
+        self._catalog_changed_at = 0
+        self._domain_changed_at: Dict[str, int] = {}
+        self._any_domain_changed_at = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.expired = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    @property
+    def ttl_seconds(self) -> float:
+        if self._ttl_seconds is None:
+            self._ttl_seconds = settings.search_cache_ttl_seconds
+        return self._ttl_seconds
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is None:
+            self._max_entries = settings.search_cache_max_entries
+        return max(1, self._max_entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @staticmethod
+    def key(query: str, limit: int, variant: str = "") -> Tuple[str, int, str]:
+        return normalize_text(query), limit, variant
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        try:
+            return urlparse(url).netloc
+        except Exception:
+            return ""
+
+    def _is_current(self, entry: CachedSearch) -> bool:
+        if self._catalog_changed_at > entry.version:
+            return False
+        domains = entry.domains
+        if entry.price_filtered:
+            if entry.price_scope is None:
+                if self._any_domain_changed_at > entry.version:
+                    return False
+            else:
+                domains = domains | entry.price_scope
+        return all(self._domain_changed_at.get(domain, 0) <= entry.version for domain in domains)
+
+    def lookup(self, query: str, limit: int, variant: str = "") -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the cached results while they are fresh and no write invalidated them.
+        """
+        key = self.key(query, limit, variant)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if time.monotonic() - entry.stored_at >= self.ttl_seconds:
+            self.expired += 1
+        elif not self._is_current(entry):
+            self.invalidated += 1
+        else:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry.cost
+            return entry.results
+
+        del self._entries[key]
+        self.misses += 1
+        return None
+
+    def snapshot(self) -> int:
+        """
+        Version to pass to store(), taken before running the query so a write that
+        lands while it runs leaves the entry already invalid.
+        """
+        return self.version
+
+    def store(self,
+              query: str,
+              limit: int,
+              results: List[Dict[str, Any]],
+              version: int,
+              cost: float,
+              variant: str = "",
+              price_filtered: bool = False,
+              domain_filter: Optional[List[str]] = None):
+        """
+        Caches a result list. Searches filtered on price pass `price_filtered`, with the
+        search's domain filter if it has one.
+        """
+        key = self.key(query, limit, variant)
+        domains = frozenset(self.domain_of(row.get("url") or "") for row in results)
+        price_scope = frozenset(domain_filter) if domain_filter is not None else None
+        self._entries[key] = CachedSearch(results, version, domains, cost, price_scope, price_filtered)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def bump_catalog(self):
+        self.version += 1
+        self._catalog_changed_at = self.version
+
+    def bump_domain(self, domain: str):
+        self.version += 1
+        self._domain_changed_at[domain] = self.version
+        self._any_domain_changed_at = self.version
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidated": self.invalidated,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "version": self.version,
+            "saved_ms": round(self.saved_seconds * 1000.0, 1),
+        }
+
+
+search_cache = SearchResultCache()
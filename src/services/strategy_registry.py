@@ -0,0 +1,168 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse
+
+
+from src.interface.scrapping_interface import IScrapingStrategy
+from src.repository.extraction_repository import ExtractionStatsRepository
+from src.domain.product import PriceExtractionResult
+from src.core.settings import settings
+from src.core.logger import logger
+
+
+class DomainLearning:
+    """
+    What the engine has learned about one domain.
+    """
+    def __init__(self,
+                 preferred: Optional[str] = None,
+                 consecutive_failures: int = 0,
+                 demoted_until: Optional[datetime] = None,
+                 strategies: Optional[Dict[str, Dict[str, int]]] = None):
+        self.preferred = preferred
+        self.consecutive_failures = consecutive_failures
+        self.demoted_until = demoted_until
+        self.strategies = strategies or {}
+
+    def counters(self, strategy: str) -> Dict[str, int]:
+        return self.strategies.setdefault(strategy, {"attempts": 0, "successes": 0})
+
+
+class StrategyRegistry:
+    """
+    Indexes scraping strategies by domain and learns, per domain, which strategy
+    succeeds. The last successful strategy is tried first, and domains that keep
+    failing are demoted (skipped) for a cool-down period. State is persisted in Postgres.
+    """
+    def __init__(self, strategies: List[IScrapingStrategy], repository: ExtractionStatsRepository = None):
+        self.strategies = strategies
+        self.repository = repository or ExtractionStatsRepository()
+        self._index: Dict[str, List[str]] = {}
+        self._learning: Dict[str, DomainLearning] = {}
+        self._pending: set = set()
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        try:
+            return urlparse(url).netloc.lower()
+        except Exception:
+            return ""
+
+    def candidates(self, domain: str) -> List[str]:
+        """
+        Names of the strategies that apply to a domain, in default order (memoized per domain).
+        """
+        names = self._index.get(domain)
+        if names is None:
+            names = [s.name for s in self.strategies if s.handles_domain(domain)]
+            self._index[domain] = names
+        return names
+
+    def ordered_for(self, domain: str) -> List[str]:
+        """
+        Applicable strategies with the domain's last successful one moved to the front.
+        """
+        names = self.candidates(domain)
+        learning = self._learning.get(domain)
+        if learning and learning.preferred in names:
+            return [learning.preferred] + [n for n in names if n != learning.preferred]
+        return list(names)
+
+    def is_demoted(self, domain: str) -> bool:
+        learning = self._learning.get(domain)
+        return bool(
+            learning
+            and learning.demoted_until
+            and learning.demoted_until > datetime.now(timezone.utc)
+        )
+
+    def record(self, domain: str, order: List[str], result: PriceExtractionResult):
+        """
+        Updates the domain's counters after an extraction that tried strategies in `order`.
+        Every strategy before the winner (or all of them, on failure) counts as a failed attempt.
+        Out-of-stock pages do not count towards demotion.
+        """
+        learning = self._learning.setdefault(domain, DomainLearning())
+        winner = result.source if result.has_price and result.source in order else None
+        attempted = order[:order.index(winner) + 1] if winner else order
+
+        for name in attempted:
+            learning.counters(name)["attempts"] += 1
+
+        state_changed = False
+        if winner:
+            learning.counters(winner)["successes"] += 1
+            state_changed = learning.preferred != winner or learning.consecutive_failures > 0
+            learning.preferred = winner
+            learning.consecutive_failures = 0
+            learning.demoted_until = None
+        elif not result.is_available:
+            pass
+        else:
+            learning.consecutive_failures += 1
+            if learning.consecutive_failures >= settings.extraction_demote_after:
+                learning.demoted_until = datetime.now(timezone.utc) + timedelta(minutes=settings.extraction_demote_minutes)
+                logger.warning(f"Domain {domain} demoted after {learning.consecutive_failures} failed extractions.")
+            state_changed = True
+
+        total_attempts = sum(c["attempts"] for c in learning.strategies.values())
+        if state_changed or total_attempts % 10 == 0:
+            self._schedule_persist(domain, learning)
+
+    def _schedule_persist(self, domain: str, learning: DomainLearning):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        task = loop.create_task(self._persist(domain, learning))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _persist(self, domain: str, learning: DomainLearning):
+        try:
+            await self.repository.save(
+                domain=domain,
+                preferred_strategy=learning.preferred,
+                consecutive_failures=learning.consecutive_failures,
+                demoted_until=learning.demoted_until,
+                strategy_stats=learning.strategies
+            )
+        except Exception as e:
+            logger.warning(f"Failed to persist extraction stats for {domain}: {e}")
+
+    async def load(self):
+        """
+        Restores learned state from Postgres.
+        """
+        rows = await self.repository.load_all()
+        for row in rows:
+            self._learning[row["domain"]] = DomainLearning(
+                preferred=row["preferred_strategy"],
+                consecutive_failures=row["consecutive_failures"],
+                demoted_until=row["demoted_until"],
+                strategies=json.loads(row["strategy_stats"]) if isinstance(row["strategy_stats"], str) else (row["strategy_stats"] or {})
+            )
+        logger.info(f"Loaded extraction stats for {len(rows)} domains.")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-domain, per-strategy hit rates.
+        """
+        report = {}
+        for domain, learning in self._learning.items():
+            report[domain] = {
+                "preferred": learning.preferred,
+                "consecutive_failures": learning.consecutive_failures,
+                "demoted": self.is_demoted(domain),
+                "strategies": {
+                    name: {
+                        **counters,
+                        "hit_rate": round(counters["successes"] / counters["attempts"], 4) if counters["attempts"] else 0.0
+                    }
+                    for name, counters in learning.strategies.items()
+                }
+            }
+        return report
@@ -0,0 +1,374 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Iterable
+
+import asyncpg
+import numpy as np
+
+
+from src.interface.catalog_interface import ICatalogRepository
+from src.repository.catalog_repository import CatalogRepository
+from src.core.settings import settings
+from src.core.logger import logger
+
+
+NOTIFY_CHANNEL = "product_embeddings"
+
+
+def as_vector(value: Any) -> Optional[np.ndarray]:
+    """
+    Unit-normalized float32 copy of an embedding as returned by the driver
+    (pgvector text literal, binary-codec array or pgvector HalfVector).
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    elif hasattr(value, "to_numpy"):
+        value = value.to_numpy()
+
+    vector = np.asarray(value, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+class VectorMirror:
+    """
+    In-process copy of the active product embeddings, used for the semantic branch of the hybrid
+    search. Vectors live in a dense, unit-normalized NumPy matrix searched by brute-force matmul;
+    above ANN_MIRROR_HNSW_THRESHOLD products (and with `hnswlib` installed) an HNSW graph serves
+    unfiltered queries instead. The mirror is loaded from `products` at warmup and kept current by
+    this process's upserts and by a LISTEN on `product_embeddings`, which every writer triggers.
+    """
+    def __init__(self, repository: ICatalogRepository = None, dim: int = 384):
+        self.repository = repository or CatalogRepository()
+        self.dim = dim
+
+        self._lock = threading.Lock()
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._domain_codes = np.zeros(0, dtype=np.int32)
+        self._id_array = np.empty(0, dtype=object)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._domains: Dict[str, int] = {}
+
+        self._hnsw = None
+        self._ef = 0
+        self._labels: Dict[str, int] = {}
+        self._label_ids: Dict[int, str] = {}
+        self._next_label = 0
+        self._building = False
+        self._dirty: set = set()
+        self._removals = 0
+
+        self._listener: Optional[asyncpg.Connection] = None
+        self._pending: set = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._synced_at: Optional[datetime] = None
+
+        self.ready = False
+        self.searches = 0
+        self.search_seconds = 0.0
+        self.updates = 0
+        self.notifications = 0
+
+    @property
+    def size(self) -> int:
+        return len(self._ids)
+
+    def _domain_code(self, domain: str) -> int:
+        code = self._domains.get(domain)
+        if code is None:
+            code = self._domains[domain] = len(self._domains)
+        return code
+
+    def _grow(self, needed: int):
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:self.size] = self._matrix[:self.size]
+        codes = np.zeros(capacity, dtype=np.int32)
+        codes[:self.size] = self._domain_codes[:self.size]
+        id_array = np.empty(capacity, dtype=object)
+        id_array[:self.size] = self._id_array[:self.size]
+        self._matrix, self._domain_codes, self._id_array = matrix, codes, id_array
+
+    def _put(self, product_id: str, domain: str, vector: np.ndarray):
+        row = self._rows.get(product_id)
+        if row is None:
+            row = self.size
+            self._grow(row + 1)
+            self._ids.append(product_id)
+            self._rows[product_id] = row
+        self._matrix[row] = vector
+        self._domain_codes[row] = self._domain_code(domain)
+        self._id_array[row] = product_id
+
+        if self._building:
+            self._dirty.add(product_id)
+        if self._hnsw is not None:
+            label = self._labels.get(product_id)
+            if label is None:
+                label = self._labels[product_id] = self._next_label
+                self._label_ids[label] = product_id
+                self._next_label += 1
+            if label >= self._hnsw.get_max_elements():
+                self._hnsw.resize_index(max(label + 1, self._hnsw.get_max_elements() * 2))
+            self._hnsw.add_items(vector[np.newaxis, :], np.array([label]))
+
+    def _drop(self, product_id: str):
+        row = self._rows.pop(product_id, None)
+        if row is None:
+            return
+        last = self.size - 1
+        if row != last:
+            moved = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._domain_codes[row] = self._domain_codes[last]
+            self._id_array[row] = moved
+            self._ids[row] = moved
+            self._rows[moved] = row
+        self._ids.pop()
+        self._id_array[last] = None
+        self._removals += 1
+
+        if self._building:
+            self._dirty.add(product_id)
+
+        label = self._labels.pop(product_id, None)
+        if self._hnsw is not None and label is not None:
+            self._label_ids.pop(label, None)
+            self._hnsw.mark_deleted(label)
+
+    def apply(self, rows: Iterable[Dict[str, Any]]):
+        """
+        Applies product rows (product_id, domain, embedding[, is_active]): active rows with an
+        embedding are inserted or replaced, anything else is removed.
+        """
+        with self._lock:
+            for row in rows:
+                product_id = str(row["product_id"])
+                vector = as_vector(row.get("embedding"))
+                if vector is None or row.get("is_active") is False:
+                    self._drop(product_id)
+                else:
+                    self._put(product_id, row.get("domain") or "", vector)
+                self.updates += 1
+
+    def upsert(self, product_id: str, domain: str, embedding: List[float]):
+        self.apply([{"product_id": product_id, "domain": domain, "embedding": embedding}])
+
+    def remove(self, product_ids: Iterable[str]):
+        with self._lock:
+            for product_id in product_ids:
+                self._drop(str(product_id))
+
+    def _build_hnsw(self, hnswlib, matrix: np.ndarray, ids: List[str]):
+        index = hnswlib.Index(space="ip", dim=self.dim)
+        index.init_index(max_elements=max(len(ids) * 2, 1024), ef_construction=64, M=16)
+        index.set_ef(self._ef)
+        index.add_items(matrix, np.arange(len(ids)))
+        return index
+
+    async def _enable_hnsw(self):
+        """
+        Builds the HNSW graph off the event loop from a snapshot, then replays the products
+        written meanwhile before switching unfiltered queries over to it.
+        """
+        if settings.ann_mirror_backend == "numpy" or self.size < settings.ann_mirror_hnsw_threshold:
+            return
+        try:
+            import hnswlib
+        except ImportError:
+            logger.warning("ANN mirror is large enough for HNSW but 'hnswlib' is not installed; using brute force.")
+            return
+
+        with self._lock:
+            self._building = True
+            self._dirty = set()
+            self._ef = settings.search_ef_search
+            ids = list(self._ids)
+            matrix = self._matrix[:len(ids)].copy()
+
+        try:
+            index = await asyncio.to_thread(self._build_hnsw, hnswlib, matrix, ids)
+        finally:
+            with self._lock:
+                self._building = False
+
+        with self._lock:
+            self._labels = {product_id: label for label, product_id in enumerate(ids)}
+            self._label_ids = dict(enumerate(ids))
+            self._next_label = len(ids)
+            self._hnsw = index
+            for product_id in self._dirty:
+                row = self._rows.get(product_id)
+                if row is None:
+                    label = self._labels.pop(product_id, None)
+                    if label is not None:
+                        self._label_ids.pop(label, None)
+                        index.mark_deleted(label)
+                else:
+                    self._put(product_id, self._domain_name(int(self._domain_codes[row])), self._matrix[row].copy())
+            self._dirty = set()
+
+    def _domain_name(self, code: int) -> str:
+        for domain, domain_code in self._domains.items():
+            if domain_code == code:
+                return domain
+        return ""
+
+    async def bootstrap(self, page_size: int = 5000):
+        """
+        Loads every active embedded product. The listener is started first, so writes
+        made during the load are replayed instead of lost.
+        """
+        started = time.perf_counter()
+        await self.start_listener()
+        self._synced_at = datetime.now(timezone.utc)
+
+        after = None
+        while True:
+            rows = await self.repository.get_embeddings_page(after, page_size)
+            if not rows:
+                break
+            self.apply(rows)
+            after = str(rows[-1]["product_id"])
+
+        await self._enable_hnsw()
+        self.ready = True
+        logger.info(f"🧭 Vector mirror loaded {self.size} products in {time.perf_counter() - started:.2f}s ({'hnsw' if self._hnsw is not None else 'brute force'}).")
+
+    def _search(self, query: np.ndarray, k: int, domains: Optional[List[str]]) -> List[str]:
+        """
+        HNSW queries run under the lock. Brute-force scoring runs outside it on views of the
+        arrays; a removal moves or frees a row, so if one happened meanwhile the ranking is redone
+        under the lock (in-place updates and appends cannot pair a score with the wrong id).
+        """
+        with self._lock:
+            if domains is None and self._hnsw is not None:
+                k = min(k, len(self._label_ids))
+                if k == 0:
+                    return []
+                self._hnsw.set_ef(max(self._ef, k))
+                labels, _ = self._hnsw.knn_query(query, k=k)
+                return [self._label_ids[int(label)] for label in labels[0] if int(label) in self._label_ids]
+
+            removals = self._removals
+            view = self._view(domains)
+
+        ranked = self._rank(query, k, *view)
+        with self._lock:
+            if self._removals == removals:
+                return ranked
+            return self._rank(query, k, *self._view(domains))
+
+    def _view(self, domains: Optional[List[str]]):
+        n = self.size
+        allowed = [self._domains[domain] for domain in domains if domain in self._domains] if domains is not None else None
+        return self._matrix[:n], self._domain_codes[:n], self._id_array[:n], allowed
+
+    @staticmethod
+    def _rank(query: np.ndarray, k: int, matrix: np.ndarray, codes: np.ndarray, ids: np.ndarray, allowed: Optional[List[int]]) -> List[str]:
+        if matrix.shape[0] == 0:
+            return []
+
+        if allowed is not None:
+            rows = np.flatnonzero(np.isin(codes, allowed))
+            if rows.size == 0:
+                return []
+            scores = matrix[rows] @ query
+        else:
+            rows = None
+            scores = matrix @ query
+
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        if rows is not None:
+            top = rows[top]
+        return [ids[i] for i in top if ids[i] is not None]
+
+    async def search(self, query_vector: List[float], k: int, domains: Optional[List[str]] = None) -> List[str]:
+        """
+        Ids of the `k` nearest active products by cosine similarity, nearest first.
+        """
+        started = time.perf_counter()
+        ids = await asyncio.to_thread(self._search, as_vector(query_vector), k, domains)
+        self.searches += 1
+        self.search_seconds += time.perf_counter() - started
+        return ids
+
+    async def start_listener(self):
+        if self._listener is not None and not self._listener.is_closed():
+            return
+        dsn = f"postgresql://{settings.pg_user}:{settings.pg_pass}@{settings.pg_host}:{settings.pg_port}/{settings.pg_db}"
+        self._listener = await asyncpg.connect(dsn)
+        await self._listener.add_listener(NOTIFY_CHANNEL, self._on_notify)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self.notifications += 1
+        self._pending.add(payload)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush())
+
+    async def _flush(self):
+        """
+        Re-reads the notified products in batches (notifications only carry ids).
+        """
+        await asyncio.sleep(0.2)
+        while self._pending:
+            pending, self._pending = list(self._pending), set()
+            try:
+                rows = await self.repository.get_embeddings_by_ids(pending)
+            except Exception as e:
+                self._pending.update(pending)
+                logger.error(f"Vector mirror refresh failed: {e}")
+                return
+
+            found = {str(row["product_id"]) for row in rows}
+            self.apply(rows)
+            self.remove(product_id for product_id in pending if product_id not in found)
+
+    async def ensure_listening(self):
+        """
+        Reconnects a dropped listener and replays what changed while it was down.
+        """
+        if not self.ready or (self._listener is not None and not self._listener.is_closed()):
+            return
+        try:
+            await self.start_listener()
+            since = self._synced_at - timedelta(minutes=1)
+            self._synced_at = datetime.now(timezone.utc)
+            self.apply(await self.repository.get_embeddings_updated_since(since))
+            logger.info("🧭 Vector mirror listener reconnected.")
+        except Exception as e:
+            logger.warning(f"Vector mirror listener reconnect failed: {e}")
+
+    async def close(self):
+        if self._listener is not None:
+            try:
+                await self._listener.close()
+            except Exception:
+                pass
+            self._listener = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "products": self.size,
+            "backend": "hnsw" if self._hnsw is not None else "brute_force",
+            "searches": self.searches,
+            "avg_search_ms": round(self.search_seconds / self.searches * 1000.0, 3) if self.searches else 0.0,
+            "updates": self.updates,
+            "notifications": self.notifications,
+            "listening": self._listener is not None and not self._listener.is_closed(),
+        }
+
+
+vector_mirror = VectorMirror()
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from typing import Dict, Any, Callable, Awaitable, List, Tuple
+
+
+from src.core.database import db_manager
+from src.repository.catalog_repository import CatalogRepository
+from src.services.embedding_service import embedding_service
+from src.services.scrapper_service import strategy_registry
+from src.services.alert_notifier import alert_notifier
+from src.services.vector_mirror import vector_mirror
+from src.core.settings import settings
+from src.core.logger import logger
+
+
+class WarmupService:
+    """
+    Explicit, timed startup warmup: loads the embedding model, primes the database
+    pool, probes the HNSW index, restores learned extraction stats, loads the alert index and,
+    with ANN_MIRROR_ENABLED, the in-process vector mirror.
+    The application is ready once every required phase succeeds. Failed phases are retried
+    with exponential backoff, so a transient failure (database restarting, model download)
+    only delays readiness. Optional phases (the vector mirror, whose absence only means the
+    database answers the semantic branch) are retried too but never gate readiness.
+    """
+    def __init__(self, repository: CatalogRepository = None, retry_initial_seconds: float = 2.0, retry_max_seconds: float = 60.0):
+        self.repository = repository or CatalogRepository()
+        self.retry_initial_seconds = retry_initial_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.ready = False
+        self.attempts = 0
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+    async def _phase(self, name: str, step: Callable[[], Awaitable[None]]) -> bool:
+        started = time.perf_counter()
+        try:
+            await step()
+            self.errors.pop(name, None)
+            return True
+        except Exception as e:
+            self.errors[name] = str(e)
+            logger.error(f"Warmup phase '{name}' failed: {e}")
+            return False
+        finally:
+            self.timings[name] = round(time.perf_counter() - started, 3)
+
+    def _phases(self) -> List[Tuple[str, Callable[[], Awaitable[None]], bool]]:
+        """
+        (name, step, required) in execution order.
+        """
+        phases = [
+            ("embedding_model", self._load_model, True),
+            ("db_pool", self._prime_pool, True),
+            ("hnsw_probe", self._probe_hnsw, True),
+            ("extraction_stats", self._load_extraction_stats, True),
+            ("alert_index", self._load_alert_index, True),
+        ]
+        if settings.ann_mirror_enabled:
+            phases.append(("vector_mirror", self._load_vector_mirror, False))
+        return phases
+
+    async def _load_model(self):
+        await asyncio.to_thread(embedding_service.load)
+
+    async def _prime_pool(self):
+        await db_manager.prime_pool()
+
+    async def _probe_hnsw(self):
+        vector = await embedding_service.aget_embedding("warmup probe")
+        await self.repository.probe_vector_index(vector)
+
+    async def _load_extraction_stats(self):
+        await strategy_registry.load()
+
+    async def _load_alert_index(self):
+        await alert_notifier.refresh()
+
+    async def _load_vector_mirror(self):
+        await vector_mirror.bootstrap()
+
+    async def run(self):
+        """
+        Runs all warmup phases in order and logs a per-phase timing breakdown, then keeps
+        retrying the failed ones (backing off up to retry_max_seconds) until all succeed.
+        """
+        logger.info("Warmup started...")
+
+        pending = self._phases()
+        delay = self.retry_initial_seconds
+        while True:
+            self.attempts += 1
+            failed = [(name, step, required) for name, step, required in pending if not await self._phase(name, step)]
+
+            self.ready = not any(required for _, _, required in failed)
+            breakdown = " | ".join(f"{name}: {seconds:.3f}s" for name, seconds in self.timings.items())
+            logger.info(f"Warmup round {self.attempts} finished (ready={self.ready}) | {breakdown}")
+
+            if not failed:
+                return
+            logger.warning(f"Retrying warmup phases {[name for name, _, _ in failed]} in {delay:.0f}s.")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2.0, self.retry_max_seconds)
+            pending = failed
+
+    def status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "attempts": self.attempts, "phases": self.timings, "errors": self.errors}
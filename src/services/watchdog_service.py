@@ -1,73 +1,333 @@
-import httpx
+import asyncio
+import os
+import socket
+import time
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
 
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
 
+
+from src.core.database import db_manager
 from src.repository.alert_repository import AlertRepository
-from src.services.scrapper_service import ScraperEngine
 from src.services.catalog_service import CatalogService
-from src.telegram.message import send_message
+from src.services.price_fetcher import PriceFetcher, price_fetcher as shared_price_fetcher
+from src.services.domain_guard import CircuitOpenError
+from src.services.alert_notifier import AlertNotifier, alert_notifier as shared_alert_notifier
+from src.core.settings import settings
 from src.core.logger import logger
 
-class WatchdogService:
+
+def next_check_interval(current_price: Optional[float],
+                        targets: List[float],
+                        change_percent: float,
+                        changes_7d: int) -> float:
+    """
+    Seconds until a product's next watchdog check. Volatile products (recent price changes)
+    and products close to an alert target are checked more often, stable ones less often.
+    """
+    interval = settings.watchdog_base_interval_minutes * 60.0
+
+    volatility = max(min(changes_7d / 7.0, 1.0), min(abs(change_percent) / 10.0, 1.0))
+    if volatility > 0:
+        interval /= 1 + 3 * volatility
+    else:
+        interval *= 2
+
+    if current_price and targets:
+        gap = (current_price - max(targets)) / current_price
+        if gap <= 0.05:
+            interval *= 0.25
+        elif gap <= 0.15:
+            interval *= 0.5
+        elif gap >= 0.5:
+            interval *= 2
+
+    return min(max(interval, settings.watchdog_min_interval_minutes * 60.0), settings.watchdog_max_interval_minutes * 60.0)
+
+
+class CycleReport:
+    """
+    Counters for one watchdog cycle.
+    """
     def __init__(self):
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.alerts = 0
+        self.products = 0
+        self.pages_fetched = 0
+        self.from_cache = 0
+        self.no_price = 0
+        self.skipped = 0
+        self.failures = 0
+        self.alerts_hit = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "duration_s": round(self.duration, 3),
+            "alerts": self.alerts,
+            "products": self.products,
+            "pages_fetched": self.pages_fetched,
+            "from_cache": self.from_cache,
+            "dedup_ratio": round(1 - self.products / self.alerts, 4) if self.alerts else 0.0,
+            "no_price": self.no_price,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "alerts_hit": self.alerts_hit,
+        }
+
+
+WATCHDOG_LOCK_KEY = 0x7468616E61746F73
+
+
+class WatchdogLeader:
+    """
+    Postgres advisory-lock leadership for the in-process watchdog scheduler. The session-level
+    lock lives on a dedicated connection, so it is released automatically if the process dies.
+    """
+    def __init__(self, lock_key: int = WATCHDOG_LOCK_KEY):
+        self.lock_key = lock_key
+        self._conn: Optional[AsyncConnection] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._conn is not None
+
+    async def acquire(self) -> bool:
+        """
+        Returns True while this process holds leadership, trying to take it when it does not.
+        """
+        if self._conn is not None:
+            try:
+                await self._conn.execute(text("SELECT 1"))
+                await self._conn.commit()
+                return True
+            except Exception as e:
+                logger.warning(f"Lost watchdog leader connection: {e}")
+                await self._discard()
+
+        conn = await db_manager.engine.connect()
+        try:
+            acquired = (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key})).scalar()
+            await conn.commit()
+        except Exception:
+            await conn.close()
+            raise
+
+        if not acquired:
+            await conn.close()
+            return False
+
+        self._conn = conn
+        logger.info("🐕 Watchdog leadership acquired.")
+        return True
+
+    async def _discard(self):
+        conn, self._conn = self._conn, None
+        try:
+            await conn.invalidate()
+        except Exception:
+            pass
+
+    async def release(self):
+        if self._conn is None:
+            return
+        try:
+            await self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+            await self._conn.commit()
+            await self._conn.close()
+        except Exception:
+            await self._discard()
+        self._conn = None
+
+
+class WatchdogService:
+    """
+    Re-checks watched products. Each tick leases only the products whose next_check_at is due
+    (FOR UPDATE SKIP LOCKED, so any number of workers can share the load), groups their alerts
+    so each page is fetched once, fetches products concurrently (WATCHDOG_CONCURRENCY at a time),
+    registers all observed prices in one bulk upsert and schedules each product's next check. With a leader, ticks only run while it holds
+    the advisory lock. Leases are renewed while the batch runs, since a slow batch can outlast
+    WATCHDOG_LEASE_SECONDS; a crashed worker's products become claimable once it expires.
+    """
+    def __init__(self,
+                 price_fetcher: PriceFetcher = None,
+                 leader: WatchdogLeader = None,
+                 worker_id: str = None,
+                 notifier: AlertNotifier = None):
+        self.price_fetcher = price_fetcher or shared_price_fetcher
+        self.notifier = notifier or shared_alert_notifier
+        self.leader = leader
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
         self.alert_repo = AlertRepository()
-        self.catalog_service = CatalogService() 
-        self.scraper = ScraperEngine()
+        self.catalog_service = CatalogService(notifier=self.notifier)
+        self.last_report: Optional[CycleReport] = None
 
-    async def run_cycle(self):
+    async def run_cycle(self) -> Optional[CycleReport]:
+
+        if self.leader is not None and not await self.leader.acquire():
+            return None
+
+        report = CycleReport()
+        alerts = await self.alert_repo.claim_due_alerts(
+            owner=self.worker_id,
+            limit=settings.watchdog_batch_size,
+            lease_seconds=settings.watchdog_lease_seconds
+        )
 
-        logger.info("🐕 Watchdog Cycle Started...")
-        alerts = await self.alert_repo.get_active_alerts()
-        
         if not alerts:
-            logger.info("No active alerts to check.")
-            return
+            return None
+
+        logger.info("🐕 Watchdog Cycle Started...")
+
+        by_product: Dict[str, List[dict]] = defaultdict(list)
+        for alert in alerts:
+            by_product[alert['product_id']].append(alert)
+
+        report.alerts = len(alerts)
+        report.products = len(by_product)
+
+        slots = asyncio.Semaphore(max(1, settings.watchdog_concurrency))
 
-        
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            for alert in alerts:
+        async def observe(product_alerts: List[dict]):
+            async with slots:
+                return await self._observe_product(product_alerts, report)
+
+        groups = list(by_product.values())
+        renewer = asyncio.create_task(self._renew_leases(list(by_product.keys())))
+        try:
+            observations = await asyncio.gather(*(observe(group) for group in groups))
+
+            priced = [(group, price) for group, (price, _) in zip(groups, observations) if price is not None]
+            if priced:
                 try:
-                    await self._check_single_alert(client, alert)
+                    await self.catalog_service.register_products_bulk([
+                        {
+                            "url": group[0]['url'],
+                            "title": group[0]['title'],
+                            "price": price,
+                            "description": "Watchdog Update"
+                        }
+                        for group, price in priced
+                    ])
                 except Exception as e:
-                    logger.error(f"Error checking alert {alert['alert_id']}: {e}")
-        
-        logger.info("🐕 Watchdog Cycle Finished.")
+                    logger.error(f"Error registering watchdog observations: {e}")
 
-    async def _check_single_alert(self, client: httpx.AsyncClient, alert: dict):
-        url = alert['url']
-        target = float(alert['target_price'])
-        
-        headers = {
-           "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        }
+            async def schedule(product_alerts: List[dict], price: Optional[float], interval: float):
+                if price is not None:
+                    interval = await self._evaluate_product(product_alerts, price, report)
+                try:
+                    released = await self.alert_repo.mark_checked(
+                        self.worker_id,
+                        product_alerts[0]['product_id'],
+                        [alert['alert_id'] for alert in product_alerts],
+                        interval
+                    )
+                    if not released:
+                        logger.warning(f"Lease on {product_alerts[0]['url']} was lost before its check was recorded.")
+                except Exception as e:
+                    logger.error(f"Error scheduling next check for {product_alerts[0]['url']}: {e}")
 
-        resp = await client.get(url, headers=headers, follow_redirects=True)
-        if resp.status_code != 200:
-            return
+            await asyncio.gather(*(
+                schedule(group, price, interval)
+                for group, (price, interval) in zip(groups, observations)
+            ))
+        finally:
+            renewer.cancel()
 
-        result = self.scraper.extract_price(resp.text, url)
-        
-        if not result.has_price:
-            return
+        report.duration = time.time() - report.started_at
+        self.last_report = report
+        logger.info(f"🐕 Watchdog Cycle Finished. | {report.as_dict()}")
+        return report
+
+    async def _renew_leases(self, product_ids: List[str]):
+        """
+        Keeps the batch's leases alive, renewing them every third of the lease period.
+        Products already scheduled were released by mark_checked and are left alone.
+        """
+        lease = settings.watchdog_lease_seconds
+        while True:
+            await asyncio.sleep(lease / 3.0)
+            try:
+                await self.alert_repo.renew_leases(self.worker_id, product_ids, lease)
+            except Exception as e:
+                logger.warning(f"Watchdog lease renewal failed: {e}")
+
+    async def _observe_product(self, alerts: List[dict], report: CycleReport) -> Tuple[Optional[float], float]:
+        """
+        Fetches one product page. Returns the observed price (None when unavailable)
+        and the retry delay in seconds to use when there is no price.
+        """
+        url = alerts[0]['url']
+        retry_interval = settings.watchdog_base_interval_minutes * 60.0
+
+        try:
+            observation = await self.price_fetcher.fetch(url, timeout=15.0)
+        except CircuitOpenError as e:
+            report.skipped += 1
+            logger.info(f"Skipping {len(alerts)} alert(s) for {url}: {e}")
+            return None, max(e.retry_in, settings.watchdog_min_interval_minutes * 60.0)
+        except Exception as e:
+            report.failures += 1
+            logger.error(f"Error checking {url} ({len(alerts)} alert(s)): {e}")
+            return None, retry_interval
+
+        if observation.from_cache:
+            report.from_cache += 1
+        else:
+            report.pages_fetched += 1
+
+        if not observation.ok:
+            report.failures += 1
+            return None, retry_interval
+
+        if not observation.result.has_price:
+            report.no_price += 1
+            return None, retry_interval
 
-        current_price = result.current_price
+        return observation.result.current_price, retry_interval
 
-        await self.catalog_service.register_product(
-            url=url, 
-            title=alert['title'], 
-            price=current_price,
-            description="Watchdog Update"
+    async def _evaluate_product(self, alerts: List[dict], current_price: float, report: CycleReport) -> float:
+        """
+        Evaluates every alert watching a product against its observed price.
+        Returns the delay in seconds until the product's next check.
+        """
+        pending_targets = []
+        for alert in alerts:
+            try:
+                if await self._evaluate_alert(alert, current_price):
+                    report.alerts_hit += 1
+                    continue
+            except Exception as e:
+                report.failures += 1
+                logger.error(f"Error checking alert {alert['alert_id']}: {e}")
+            pending_targets.append(float(alert['target_price']))
+
+        return next_check_interval(
+            current_price,
+            pending_targets,
+            float(alerts[0].get('price_change_percent') or 0.0),
+            int(alerts[0].get('changes_7d') or 0)
         )
 
-        if current_price <= target:
-            logger.info(f"🚨 TARGET HIT! Alert {alert['alert_id']}: {current_price} <= {target}")
-            
-            msg = (
-                f"🚨 <b>PRICE ALERT HIT!</b>\n\n"
-                f"📦 {alert['title']}\n"
-                f"🎯 Target: $ {target:.2f}\n"
-                f"🔥 <b>Current: $ {current_price:.2f}</b>\n\n"
-                f"🔗 <a href='{url}'>BUY NOW</a>"
-            )
-            await send_message(alert['chat_id'], msg)
-            
-            await self.alert_repo.deactivate_alert(alert['alert_id'])
\ No newline at end of file
+    async def _evaluate_alert(self, alert: dict, current_price: float) -> bool:
+        """
+        Whether the alert's target is reached. Registering the observation usually fires it
+        already through the alert index; firing again here is a no-op in that case.
+        """
+        target = float(alert['target_price'])
+
+        if current_price > target:
+            return False
+
+        await self.notifier.fire(alert['alert_id'], alert['chat_id'], target, current_price, alert['title'], alert['url'])
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "leader": self.leader.is_leader if self.leader else None,
+            "last_cycle": self.last_report.as_dict() if self.last_report else None
+        }
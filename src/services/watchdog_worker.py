@@ -0,0 +1,71 @@
+import asyncio
+import signal
+
+
+from src.core.database import db_manager
+from src.core.settings import settings
+from src.core.logger import logger
+from src.services.fetch_service import fetch_service
+from src.services.parse_pool import parse_pool
+from src.services.price_fetcher import price_fetcher
+from src.services.scrapper_service import strategy_registry
+from src.services.watchdog_service import WatchdogService
+from src.services.alert_notifier import alert_notifier
+
+
+class WatchdogWorker:
+    """
+    Standalone watchdog process. Any number of these (plus web workers in leader mode)
+    can run side by side: due products are leased in batches, so each one is checked by
+    exactly one worker per due period.
+    """
+    def __init__(self, watchdog: WatchdogService = None):
+        self.watchdog = watchdog or WatchdogService(price_fetcher=price_fetcher)
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        logger.info(f"🐕 Watchdog worker {self.watchdog.worker_id} started (Tick: {settings.watchdog_tick_seconds}s).")
+        await fetch_service.start()
+        try:
+            await strategy_registry.load()
+        except Exception as e:
+            logger.warning(f"Could not restore extraction stats: {e}")
+
+        try:
+            while not self._stopping.is_set():
+                try:
+                    await alert_notifier.refresh()
+                    report = await self.watchdog.run_cycle()
+                except Exception as e:
+                    logger.error(f"Watchdog cycle failed: {e}")
+                    report = None
+
+                if report is not None and report.products >= settings.watchdog_batch_size:
+                    continue
+
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=settings.watchdog_tick_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await fetch_service.aclose()
+            parse_pool.shutdown()
+            await db_manager.close()
+            logger.info(f"🐕 Watchdog worker {self.watchdog.worker_id} stopped.")
+
+
+async def main():
+    worker = WatchdogWorker()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    await worker.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,7 @@
 from fastapi import FastAPI
-import httpx
+import asyncio
+import time
+from datetime import datetime
 from contextlib import asynccontextmanager
 
 from psycopg import AsyncConnection
@@ -14,7 +16,16 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from src.agent.workflow import build_agent_graph
 from src.core.settings import settings
 from src.core.logger import logger
-from src.services.watchdog_service import WatchdogService
+from src.services.watchdog_service import WatchdogService, WatchdogLeader
+from src.services.warmup_service import WarmupService
+from src.core.database import db_manager
+from src.services.parse_pool import parse_pool
+from src.services.fetch_service import fetch_service
+from src.services.price_fetcher import price_fetcher
+from src.services.alert_notifier import alert_notifier
+from src.services.history_maintenance_service import history_maintenance
+from src.services.vector_mirror import vector_mirror
+from src.services.embedding_service import embedding_service
 
 
 scheduler = AsyncIOScheduler()
@@ -23,6 +34,20 @@ scheduler = AsyncIOScheduler()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Initializing dependencies...")
+    timings = {}
+    mark = time.perf_counter()
+
+    def phase_done(name: str):
+        nonlocal mark
+        now = time.perf_counter()
+        timings[name] = now - mark
+        mark = now
+
+    await fetch_service.start()
+
+    warmup = WarmupService()
+    app.state.warmup = warmup
+    warmup_task = asyncio.create_task(warmup.run())
 
     llm_instance = ChatGroq(
         model="openai/gpt-oss-20b",
@@ -31,6 +56,7 @@ async def lifespan(app: FastAPI):
         max_retries=2
     )
     logger.info("LLM initialized.")
+    phase_done("llm")
 
     connection_string = f"postgresql://{settings.pg_user}:{settings.pg_pass}@{settings.pg_host}:{settings.pg_port}/{settings.pg_db}"
     
@@ -42,6 +68,7 @@ async def lifespan(app: FastAPI):
             logger.info("Database Setup Complete.")
     except Exception as e:
         logger.critical(f"Database Setup Failed: {e}")
+    phase_done("migrations")
     
     async with AsyncConnectionPool(conninfo=connection_string, max_size=20) as pool:
         checkpointer = AsyncPostgresSaver(pool)
@@ -52,32 +79,61 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.critical(f"Failed to build Agent Graph: {e}")
             raise e
+        phase_done("agent_graph")
         
-        watchdog = WatchdogService()
-        
-        scheduler.add_job(watchdog.run_cycle, 'interval', minutes=30)
+        leader = None
+        if settings.watchdog_mode == "leader":
+            leader = WatchdogLeader()
+            watchdog = WatchdogService(price_fetcher=price_fetcher, leader=leader)
+            app.state.watchdog = watchdog
+
+            scheduler.add_job(watchdog.run_cycle, 'interval', seconds=settings.watchdog_tick_seconds)
+            logger.info(f"🕰️ Watchdog Scheduler started (Tick: {settings.watchdog_tick_seconds}s, leader election via advisory lock).")
+        else:
+            logger.info("🕰️ In-process watchdog disabled (WATCHDOG_MODE=off); run the standalone watchdog worker.")
+
+        scheduler.add_job(alert_notifier.refresh, 'interval', seconds=settings.alert_index_refresh_seconds)
+        scheduler.add_job(history_maintenance.run, 'interval', hours=settings.price_history_maintenance_hours, next_run_time=datetime.now())
+        if settings.ann_mirror_enabled:
+            scheduler.add_job(vector_mirror.ensure_listening, 'interval', seconds=30)
         scheduler.start()
-        logger.info("🕰️ Watchdog Scheduler started (Interval: 30min).")
+        phase_done("scheduler")
 
         webhook_url = f"{settings.ngrok_url}/webhook"
         logger.info(f"Setting webhook URL to: {webhook_url}")
     
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(f"https://api.telegram.org/bot{settings.token_telegram}/setWebhook?url={webhook_url}")
-                if response.status_code != 200:
-                    logger.error(f"Failed to set webhook: {response.text}")
-                else:
-                    logger.info("Webhook set successfully.")
+            response = await fetch_service.get(f"https://api.telegram.org/bot{settings.token_telegram}/setWebhook?url={webhook_url}", timeout=30.0)
+            if response.status_code != 200:
+                logger.error(f"Failed to set webhook: {response.text}")
+            else:
+                logger.info("Webhook set successfully.")
         except Exception as e:
             logger.error(f"Network Error setting webhook: {e}")
+        phase_done("webhook")
+
+        breakdown = " | ".join(f"{name}: {seconds:.3f}s" for name, seconds in timings.items())
+        logger.info(f"Startup finished, warmup continues in background | {breakdown}")
         
         yield
+
+        if not warmup_task.done():
+            warmup_task.cancel()
+
+        if scheduler.running:
+            scheduler.shutdown(wait=False)
+        if leader is not None:
+            await leader.release()
         
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            await client.get(f"https://api.telegram.org/bot{settings.token_telegram}/deleteWebhook")
+        await fetch_service.get(f"https://api.telegram.org/bot{settings.token_telegram}/deleteWebhook", timeout=10.0)
     except Exception:
         pass
+
+    await vector_mirror.close()
+    await fetch_service.aclose()
+    parse_pool.shutdown()
+    await asyncio.to_thread(embedding_service.close)
+    await db_manager.close()
     
     logger.info("Shutdown complete.")
\ No newline at end of file
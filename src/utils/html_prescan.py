@@ -0,0 +1,109 @@
+from typing import List, Optional, Dict, Tuple
+import html
+import re
+
+
+_RAW_ELEMENTS = re.compile(
+    r'<!--.*?-->'
+    r'|<script\b(?P<script_attrs>[^>]*)>(?P<script_body>.*?)</script\s*>'
+    r'|<meta\b(?P<meta_attrs>[^>]*)>',
+    re.IGNORECASE | re.DOTALL
+)
+
+_ATTRIBUTE = re.compile(
+    r'''([^\s"'<>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?'''
+)
+
+_ELEMENT_START = re.compile(r'<(?:!--|script\b|meta\b)', re.IGNORECASE)
+_LONGEST_START = len("<script")
+
+_TITLE = re.compile(r'<title\b[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r'<[^>]+>')
+
+
+def parse_attributes(raw: str) -> Dict[str, str]:
+    """
+    Parses a raw attribute string the way html.parser does: lowercased names,
+    entity-decoded values, a repeated attribute overwrites the earlier one.
+    """
+    attrs = {}
+    for match in _ATTRIBUTE.finditer(raw):
+        name = match.group(1).lower()
+        value = next((g for g in match.groups()[1:] if g is not None), "")
+        attrs[name] = html.unescape(value)
+    return attrs
+
+
+def find_json_ld_blocks(page: str) -> List[str]:
+    """
+    Returns the bodies of every <script type="application/ld+json"> block, in document order,
+    without building a DOM. Commented-out markup is skipped.
+    """
+    blocks = []
+    for match in _RAW_ELEMENTS.finditer(page):
+        attrs = match.group("script_attrs")
+        if attrs is None:
+            continue
+        if parse_attributes(attrs).get("type") == "application/ld+json":
+            blocks.append(match.group("script_body"))
+    return blocks
+
+
+def find_meta_content(page: str, property_name: str) -> Optional[str]:
+    """
+    Returns the content attribute of the first <meta property="..."> tag with the given property.
+    """
+    for match in _RAW_ELEMENTS.finditer(page):
+        attrs = match.group("meta_attrs")
+        if attrs is None:
+            continue
+        parsed = parse_attributes(attrs)
+        if parsed.get("property") == property_name:
+            return parsed.get("content")
+    return None
+
+
+def extract_title(page: str) -> str:
+    """
+    Returns the text of the first <title> element, or an empty string.
+    """
+    match = _TITLE.search(page)
+    if not match:
+        return ""
+    return html.unescape(_TAG.sub("", match.group(1)))
+
+
+class IncrementalPrescan:
+    """
+    Streaming counterpart of find_json_ld_blocks/find_meta_content. Decoded chunks are fed in
+    as they arrive and every <script> or <meta> element is returned once it is complete,
+    as (kind, attributes, raw element). Unterminated comments or scripts hold the scan
+    until more data arrives, so nothing inside a comment is ever reported.
+    """
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[Tuple[str, Dict[str, str], str]]:
+        self._buffer += text
+        elements = []
+        pos = 0
+
+        while True:
+            start = _ELEMENT_START.search(self._buffer, pos)
+            if start is None:
+                pos = max(pos, len(self._buffer) - _LONGEST_START)
+                break
+
+            match = _RAW_ELEMENTS.match(self._buffer, start.start())
+            if match is None:
+                pos = start.start()
+                break
+
+            if match.group("script_attrs") is not None:
+                elements.append(("script", parse_attributes(match.group("script_attrs")), match.group(0)))
+            elif match.group("meta_attrs") is not None:
+                elements.append(("meta", parse_attributes(match.group("meta_attrs")), match.group(0)))
+            pos = match.end()
+
+        self._buffer = self._buffer[pos:]
+        return elements
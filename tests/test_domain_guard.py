@@ -0,0 +1,81 @@
+"""
+DomainGuard records the outcome of the whole guarded block: failures after the headers
+(a body read timing out, a reset mid-stream) and slow bodies feed the AIMD rate and the
+circuit breaker like any other failed or slow request.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src.services import domain_guard as domain_guard_module
+from src.services.domain_guard import DomainGuard, CircuitOpenError, OPEN
+
+
+URL = "https://www.loja.example/p/1"
+DOMAIN = "www.loja.example"
+
+
+@pytest.fixture
+def guard(monkeypatch):
+    monkeypatch.setattr(domain_guard_module, "settings", SimpleNamespace(
+        domain_rate_initial=4.0,
+        domain_rate_min=0.5,
+        domain_rate_max=100.0,
+        domain_rate_step=0.5,
+        domain_slow_seconds=0.05,
+        circuit_failure_threshold=2,
+        circuit_cooldown_seconds=60.0,
+    ))
+    return DomainGuard()
+
+
+async def read_body_until_timeout(guard: DomainGuard):
+    async with guard.request(URL) as call:
+        call.observe(200)
+        raise httpx.ReadTimeout("timed out reading the body")
+
+
+def test_timeout_after_headers_counts_as_failure(guard):
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(read_body_until_timeout(guard))
+
+    stats = guard.stats()[DOMAIN]
+    assert stats["failures"] == 1
+    assert stats["consecutive_failures"] == 1
+    assert stats["rate_per_s"] == 2.0
+
+
+def test_timeouts_after_headers_open_the_circuit(guard):
+    for _ in range(2):
+        with pytest.raises(httpx.ReadTimeout):
+            asyncio.run(read_body_until_timeout(guard))
+
+    assert guard.stats()[DOMAIN]["circuit"] == OPEN
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(read_body_until_timeout(guard))
+
+
+def test_slow_body_counts_as_slow(guard):
+    async def run():
+        async with guard.request(URL) as call:
+            call.observe(200)
+            await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+
+    stats = guard.stats()[DOMAIN]
+    assert stats["failures"] == 0
+    assert stats["rate_per_s"] == 2.0
+    assert stats["latency_ewma_ms"] >= 100.0
+
+
+def test_fast_success_raises_the_rate(guard):
+    async def run():
+        async with guard.request(URL) as call:
+            call.observe(200)
+
+    asyncio.run(run())
+
+    assert guard.stats()[DOMAIN]["rate_per_s"] == 4.5
@@ -0,0 +1,44 @@
+"""
+Closing the embedding cache must not release the disk store while its writer thread
+is still writing to it.
+"""
+import threading
+
+import pytest
+
+from src.services.embedding_cache import EmbeddingCache, DiskVectorStore
+
+
+DIM = 8
+
+
+def test_close_writes_pending_vectors(tmp_path):
+    cache = EmbeddingCache("model", DIM, memory_size=1, disk_path=str(tmp_path), disk_size=16, flush_interval=60.0)
+    cache.put_many(["a", "b"], [[1.0] * DIM, [2.0] * DIM])
+    cache.close()
+
+    reopened = EmbeddingCache("model", DIM, memory_size=4, disk_path=str(tmp_path), disk_size=16)
+    assert reopened.get_many(["a", "b"]) == [[1.0] * DIM, [2.0] * DIM]
+    reopened.close()
+
+
+def test_close_keeps_store_locked_while_writer_is_busy(tmp_path, monkeypatch):
+    release = threading.Event()
+    put = DiskVectorStore.put
+
+    def blocking_put(self, key, vector):
+        release.wait(5.0)
+        put(self, key, vector)
+
+    monkeypatch.setattr(DiskVectorStore, "put", blocking_put)
+    cache = EmbeddingCache("model", DIM, memory_size=4, disk_path=str(tmp_path), disk_size=16)
+    writer = cache._writer
+    cache.put_many(["a"], [[1.0] * DIM])
+
+    cache.close(timeout=0.05)
+    with pytest.raises(RuntimeError):
+        DiskVectorStore(str(tmp_path), "model", DIM, 16)
+
+    release.set()
+    writer.join(5.0)
+    assert not writer.is_alive()
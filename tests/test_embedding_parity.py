@@ -0,0 +1,83 @@
+"""
+Parity of the int8 ONNX backend with the full-precision torch backend on a fixture corpus.
+EMBEDDING_BACKEND=onnx must not be enabled for a model that fails these checks.
+Needs both backends installed (sentence-transformers and the 'onnx' extra) and access to the model.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+
+from src.services.embedding_backends import TorchEmbeddingBackend, OnnxEmbeddingBackend, EMBEDDING_DIM
+
+
+MODEL = os.environ.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+CORPUS = Path(__file__).parent / "fixtures" / "embedding_corpus.txt"
+
+MIN_COSINE = 0.97
+MEAN_COSINE = 0.99
+MIN_NEIGHBOUR_OVERLAP = 0.8
+NEIGHBOURS = 5
+
+
+def unit(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def neighbours(vectors: np.ndarray, k: int) -> np.ndarray:
+    similarities = vectors @ vectors.T
+    np.fill_diagonal(similarities, -np.inf)
+    return np.argsort(-similarities, axis=1)[:, :k]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    lines = CORPUS.read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+@pytest.fixture(scope="module")
+def onnx_backend(tmp_path_factory):
+    return OnnxEmbeddingBackend(MODEL, str(tmp_path_factory.mktemp("onnx")))
+
+
+@pytest.fixture(scope="module")
+def vectors(corpus, onnx_backend):
+    reference = unit(TorchEmbeddingBackend(MODEL).encode(corpus))
+    quantized = unit(onnx_backend.encode(corpus))
+    return reference, quantized
+
+
+def test_dimensions(vectors):
+    reference, quantized = vectors
+    assert reference.shape[1] == quantized.shape[1] == EMBEDDING_DIM
+
+
+def test_cosine_similarity_to_torch(vectors, corpus):
+    reference, quantized = vectors
+    cosine = np.sum(reference * quantized, axis=1)
+
+    worst = int(np.argmin(cosine))
+    assert cosine.mean() >= MEAN_COSINE, f"mean cosine {cosine.mean():.4f}"
+    assert cosine[worst] >= MIN_COSINE, f"cosine {cosine[worst]:.4f} for {corpus[worst]!r}"
+
+
+def test_nearest_neighbours_agree(vectors):
+    reference, quantized = vectors
+    expected, actual = neighbours(reference, NEIGHBOURS), neighbours(quantized, NEIGHBOURS)
+
+    overlap = np.mean([len(set(e) & set(a)) / NEIGHBOURS for e, a in zip(expected, actual)])
+    assert overlap >= MIN_NEIGHBOUR_OVERLAP, f"top-{NEIGHBOURS} overlap {overlap:.3f}"
+
+
+def test_padding_does_not_change_vectors(corpus, onnx_backend):
+    batched = unit(onnx_backend.encode(corpus[:8]))
+    single = unit([onnx_backend.encode([text])[0] for text in corpus[:8]])
+
+    assert np.min(np.sum(batched * single, axis=1)) >= 0.9999
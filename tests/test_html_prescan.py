@@ -0,0 +1,94 @@
+"""
+The DOM-free fast paths (html_prescan) must extract exactly what the BeautifulSoup strategies
+extract, on a corpus of product pages covering the markup that trips up regex scanning:
+commented-out blocks, markup inside scripts, attribute order/quoting/case, entities, <noscript>,
+repeated attributes. html.parser is the reference; lxml keeps the first of a repeated attribute
+where html.parser keeps the last, so that page is an expected divergence under lxml.
+"""
+import json
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.interface.scrapping_interface import JsonLdStrategy, OpenGraphStrategy
+from src.services.scrapper_service import EarlyStopScanner, ScraperEngine
+from src.utils.html_prescan import IncrementalPrescan, find_json_ld_blocks
+
+
+PAGES = Path(__file__).parent / "fixtures" / "pages"
+EXPECTED = json.loads((PAGES / "expected.json").read_text(encoding="utf-8"))
+STRATEGIES = [JsonLdStrategy(), OpenGraphStrategy()]
+
+try:
+    import lxml  # noqa: F401
+    PARSERS = ["html.parser", "lxml"]
+except ImportError:
+    PARSERS = ["html.parser"]
+
+
+def page(name: str) -> str:
+    return (PAGES / name).read_text(encoding="utf-8")
+
+
+def test_corpus_is_complete():
+    assert sorted(EXPECTED) == sorted(path.name for path in PAGES.glob("*.html"))
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize("strategy", STRATEGIES, ids=lambda s: s.name)
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_fast_path_matches_dom(name, strategy, parser, request):
+    if parser == "lxml" and name == "duplicate_attributes.html":
+        request.applymarker(pytest.mark.xfail(strict=True, reason="lxml keeps the first of a repeated attribute"))
+    html = page(name)
+    assert strategy.extract_fast(html) == strategy.extract(BeautifulSoup(html, parser))
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES, ids=lambda s: s.name)
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_fast_path_expected_price(name, strategy):
+    assert strategy.extract_fast(page(name)).current_price == EXPECTED[name][strategy.name]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 4096])
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_incremental_prescan_matches_full_scan(name, chunk_size):
+    html = page(name)
+    prescan = IncrementalPrescan()
+    elements = []
+    for offset in range(0, len(html), chunk_size):
+        elements.extend(prescan.feed(html[offset:offset + chunk_size]))
+
+    blocks = [raw for kind, attrs, raw in elements if kind == "script" and attrs.get("type") == "application/ld+json"]
+    assert [JsonLdStrategy().extract_fast(raw) for raw in blocks] == [JsonLdStrategy().extract_fast(f"<script type=\"application/ld+json\">{body}</script>") for body in find_json_ld_blocks(html)]
+
+
+@pytest.mark.parametrize("order", [["JSON_LD", "OPEN_GRAPH"], ["OPEN_GRAPH", "JSON_LD"]])
+@pytest.mark.parametrize("chunk_size", [1, 64, 1024])
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_early_stop_does_not_change_result(name, chunk_size, order):
+    engine = ScraperEngine()
+    payload = page(name).encode("utf-8")
+    scanner = EarlyStopScanner([engine._by_name[strategy] for strategy in order], "utf-8")
+
+    read = len(payload)
+    for offset in range(0, len(payload), chunk_size):
+        if scanner.feed(payload[offset:offset + chunk_size]):
+            read = offset + chunk_size
+            break
+
+    prefix = payload[:read].decode("utf-8", errors="replace")
+    full = payload.decode("utf-8")
+    assert engine.extract_price(prefix, "https://www.loja.example/p", order) == engine.extract_price(full, "https://www.loja.example/p", order)
+
+
+def test_lower_priority_match_does_not_stop_download():
+    engine = ScraperEngine()
+    scanner = EarlyStopScanner([engine._by_name["JSON_LD"], engine._by_name["OPEN_GRAPH"]], "utf-8")
+    html = page("og_head_jsonld_body.html")
+    head = html[:html.index("<body>")].encode("utf-8")
+
+    assert not scanner.feed(head)
+    assert scanner.feed(html[html.index("<body>"):].encode("utf-8"))
+    assert scanner.stopped_by == "JSON_LD"
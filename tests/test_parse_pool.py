@@ -0,0 +1,70 @@
+"""
+A page that kills its parse pool worker is retried once on a fresh pool and then fails;
+it is never parsed in the calling process, and the pool keeps serving later pages.
+"""
+import asyncio
+import multiprocessing
+import os
+
+import pytest
+
+from src.domain.product import PriceExtractionResult
+from src.services import parse_pool as parse_pool_module
+from src.services.parse_pool import ParsePool, PageParseError
+
+
+CRASH_URL = "https://www.loja.example/crash"
+parsed_in_parent = []
+
+
+def crashing_extract(payload, encoding, url, order=None):
+    """
+    Stands in for extract_in_worker: kills the worker process on CRASH_URL.
+    """
+    if multiprocessing.parent_process() is None:
+        parsed_in_parent.append(url)
+    elif url == CRASH_URL:
+        os._exit(1)
+    return PriceExtractionResult(current_price=10.0, source="TEST").model_dump(), 0.0
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(parse_pool_module, "extract_in_worker", crashing_extract)
+    parsed_in_parent.clear()
+    pool = ParsePool(workers=1, max_pending=4)
+    yield pool
+    pool.shutdown()
+
+
+def test_crashing_page_fails_without_running_in_parent(pool):
+    async def run():
+        with pytest.raises(PageParseError):
+            await pool.extract(b"<html></html>", "utf-8", CRASH_URL)
+        return await pool.extract(b"<html></html>", "utf-8", "https://www.loja.example/ok")
+
+    result = asyncio.run(run())
+
+    assert parsed_in_parent == []
+    assert pool.restarts == 2
+    assert pool.failures == 1
+    assert result.current_price == 10.0
+
+
+def test_pages_in_flight_with_a_crash_stay_out_of_parent(pool):
+    async def run():
+        results = await asyncio.gather(
+            pool.extract(b"<html></html>", "utf-8", CRASH_URL),
+            pool.extract(b"<html></html>", "utf-8", "https://www.loja.example/a"),
+            pool.extract(b"<html></html>", "utf-8", "https://www.loja.example/b"),
+            return_exceptions=True
+        )
+        after = await pool.extract(b"<html></html>", "utf-8", "https://www.loja.example/after")
+        return results, after
+
+    (crashed, *others), after = asyncio.run(run())
+
+    assert isinstance(crashed, PageParseError)
+    assert all(isinstance(r, (PriceExtractionResult, PageParseError)) for r in others)
+    assert parsed_in_parent == []
+    assert after.current_price == 10.0